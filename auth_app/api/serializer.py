@@ -1,6 +1,7 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from auth_app.emails import normalize_email, users_by_email
 
 
 """
@@ -23,13 +24,13 @@ class RegistrationSerializer(serializers.ModelSerializer):
         if pw != repeated_pw:
             raise serializers.ValidationError({'error':'password dont match'})   
                
-        account = User(email=self.validated_data['email'], username=self.validated_data['fullname'])
+        account = User(email=normalize_email(self.validated_data['email']), username=self.validated_data['fullname'])
         account.set_password(pw)
         account.save()
         return account
         
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if users_by_email(value).exists():
             raise serializers.ValidationError('Email already exists')
         return value
     
@@ -42,17 +43,9 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        email = data.get('email')
-        password = data.get('password')
-
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            raise serializers.ValidationError({'error': 'Invalid credentials.'})
-                
-        user = authenticate(username=user.username, password=password)
+        user = authenticate(self.context.get('request'), email=data.get('email'), password=data.get('password'))
 
         if user is None:
             raise serializers.ValidationError({'error': 'Invalid credentials.'})
         data['user'] = user
-        return data
\ No newline at end of file
+        return data
@@ -1,10 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import IntegrityError, transaction
 from .serializer import RegistrationSerializer
 from rest_framework.permissions import AllowAny
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from auth_app.emails import users_by_email
+from auth_app.tokens import issue_token
 from .serializer import RegistrationSerializer, LoginSerializer
 
 
@@ -12,7 +15,9 @@ from .serializer import RegistrationSerializer, LoginSerializer
 API endpoint for user registration.
 Allows any user (AllowAny) to register by providing email, password and full name.
 Upon successful registration, an authentication token is generated and returned
-along with the user's data.
+along with the user's data. User and token are created in one transaction;
+a concurrent registration of the same email that wins the race on the unique
+email index gets the same 400 as the serializer's check.
 """
 class RegistrationView(APIView):
     permission_classes = [AllowAny]
@@ -21,8 +26,14 @@ class RegistrationView(APIView):
         serializer = RegistrationSerializer(data=request.data)
         
         if serializer.is_valid():
-            saved_account = serializer.save()
-            token, created = Token.objects.get_or_create(user=saved_account)
+            try:
+                with transaction.atomic():
+                    saved_account = serializer.save()
+                    token = Token.objects.create(user=saved_account)
+            except IntegrityError:
+                if not users_by_email(serializer.validated_data['email']).exists():
+                    raise
+                return Response({'email': ['Email already exists']}, status=status.HTTP_400_BAD_REQUEST)
             data = {
                 'token': token.key,
                 'fullname': saved_account.username,
@@ -37,17 +48,18 @@ class RegistrationView(APIView):
 """
 API endpoint for user login via email and password.
 Accepts user credentials and returns a valid token and user data upon successful authentication.
+An expired token is replaced by a new one (always, with AUTH_TOKEN_ROTATE_ON_LOGIN).
 """
 class LoginView(ObtainAuthToken):
     permission_classes = [AllowAny]
     serializer_class = LoginSerializer 
 
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(data=request.data, context={'request': request})
 
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            token, created = Token.objects.get_or_create(user=user)
+            token = issue_token(user)
             data = {
                 'token': token.key,
                 'fullname': user.username,
@@ -0,0 +1,22 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from auth_app.emails import users_by_email
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates with email and password using a single user lookup through
+    the lower-case email index. Username logins (e.g. the admin) fall through
+    to the next backend.
+    """
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        user = users_by_email(email).first()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
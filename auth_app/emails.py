@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+
+
+def normalize_email(email):
+    """
+    Canonical form used for storing and looking up emails.
+    """
+    return (email or '').strip().lower()
+
+
+def users_by_email(email, queryset=None):
+    """
+    Case-insensitive email lookup that compares LOWER(email), so the
+    `auth_user_email_lower_uniq` expression index is used instead of a scan.
+    The exclude mirrors the partial index condition so the planner may use it.
+    """
+    queryset = User.objects.all() if queryset is None else queryset
+    return (
+        queryset.alias(email_lower=Lower('email'))
+        .filter(email_lower=normalize_email(email))
+        .exclude(email='')
+    )
+
+
+def users_by_emails(emails, queryset=None):
+    """
+    Batch variant of `users_by_email`: one `LOWER(email) IN (...)` query on the same index.
+    """
+    queryset = User.objects.all() if queryset is None else queryset
+    normalized = {normalize_email(email) for email in emails} - {''}
+    return (
+        queryset.alias(email_lower=Lower('email'))
+        .filter(email_lower__in=normalized)
+        .exclude(email='')
+    )
+
+
+def users_by_email_prefix(prefix, queryset=None):
+    """
+    Users whose email starts with `prefix` (case-insensitive), ordered by email.
+    Written as a range on LOWER(email) rather than LIKE, because SQLite only
+    uses an index for LIKE on NOCASE columns; the range works on every backend.
+    """
+    queryset = User.objects.all() if queryset is None else queryset
+    prefix = normalize_email(prefix)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (
+        queryset.alias(email_lower=Lower('email'))
+        .filter(email_lower__gte=prefix, email_lower__lt=upper)
+        .exclude(email='')
+        .order_by('email_lower')
+    )
@@ -0,0 +1,49 @@
+import json
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.benchmark import run_wsgi, summarize
+
+PASSWORD = 'benchmark-login-pass'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures login throughput by posting concurrent logins for temporary users "
+        "through the WSGI application. Compare PASSWORD_HASHER_PROFILE=default and fast."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help="Temporary users to log in as (round robin).")
+        parser.add_argument('--requests', type=int, default=200, help="Login requests to send.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight at the same time.")
+
+    def handle(self, *args, **options):
+        emails = [f'benchmark-login-{i}@example.com' for i in range(options['users'])]
+        user = User()
+        user.set_password(PASSWORD)
+        hashed = user.password
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=f'benchmark-login-{i}', email=email, password=hashed) for i, email in enumerate(emails)]
+            )
+        try:
+            from core.wsgi import application
+
+            headers = {'Content-Type': 'application/json'}
+            requests = [
+                ('POST', '/api/login/', headers, json.dumps({'email': emails[i % len(emails)], 'password': PASSWORD}).encode())
+                for i in range(options['requests'])
+            ]
+            started = time.perf_counter()
+            results = run_wsgi(application, requests, options['concurrency'])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"profile {settings.PASSWORD_HASHER_PROFILE} ({get_hasher().algorithm}), "
+                f"{options['requests']} logins, concurrency {options['concurrency']}: {summarize(results, elapsed)}"
+            )
+        finally:
+            User.objects.filter(email__in=emails).delete()
@@ -0,0 +1,50 @@
+from django.db import IntegrityError, migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Emails used to be unique only as typed. Stops with a list of the
+    accounts sharing an email in different case, to be merged or changed
+    by hand, instead of failing on the index with no hint.
+    """
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values(email_lower=Lower('email'))
+        .annotate(count=Count('id')).filter(count__gt=1).values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        users = User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=duplicates)
+        lines = [f'  {email}: user ids {sorted(ids)}' for email, ids in _group(users.values_list('email_lower', 'id'))]
+        raise IntegrityError(
+            'Emails that differ only in case must be resolved before the unique email index '
+            'is created:\n' + '\n'.join(lines)
+        )
+
+
+def _group(pairs):
+    groups = {}
+    for key, value in pairs:
+        groups.setdefault(key, []).append(value)
+    return sorted(groups.items())
+
+
+class Migration(migrations.Migration):
+    """
+    auth.User belongs to django.contrib.auth, so the case-insensitive unique
+    email index is created with raw SQL instead of Meta.indexes.
+    Empty emails (e.g. superusers created without one) are excluded.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX auth_user_email_lower_uniq ON auth_user (LOWER(email)) WHERE NOT (email = '');",
+            reverse_sql="DROP INDEX auth_user_email_lower_uniq;",
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from auth_app.tokens import invalidate_tokens
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """
+    Cached token entries carry `is_active`, so any change (deactivation above all)
+    drops them and the next request reloads the user.
+    """
+    if not created:
+        invalidate_tokens(Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -1,3 +1,221 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+from django.apps import apps
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase
+from auth_app import tokens
+from auth_app.emails import users_by_email, users_by_email_prefix, users_by_emails
+from auth_app.tokens import CachedTokenAuthentication
 
-# Create your tests here.
+
+class EmailLookupTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='Jane Doe', email='jane@example.com', password='secret-pass')
+
+    def test_lookup_uses_lower_email_index(self):
+        plan = users_by_email('JANE@example.com').explain()
+
+        self.assertIn('USING INDEX auth_user_email_lower_uniq', plan)
+
+    def test_batch_and_prefix_lookups_use_lower_email_index(self):
+        for queryset in [users_by_emails(['JANE@example.com', 'x@example.com']), users_by_email_prefix('Ja')]:
+            self.assertIn('USING INDEX auth_user_email_lower_uniq', queryset.explain())
+        self.assertEqual(list(users_by_email_prefix('JA')), [self.user])
+        self.assertEqual(list(users_by_email_prefix('jb')), [])
+
+    def test_email_is_unique_ignoring_case(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(username='Other', email='Jane@Example.com')
+
+    def test_empty_emails_are_not_unique(self):
+        User.objects.create_user(username='admin1', email='')
+        User.objects.create_user(username='admin2', email='')
+
+    def test_login_ignores_email_case(self):
+        response = self.client.post(reverse('login'), {'email': 'JANE@example.com', 'password': 'secret-pass'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user_id'], self.user.id)
+
+    def test_registration_rejects_duplicate_email_in_other_case(self):
+        response = self.client.post(reverse('registration'), {
+            'fullname': 'Jane Two', 'email': 'Jane@Example.com',
+            'password': 'secret-pass', 'repeated_password': 'secret-pass',
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.data)
+
+    def test_registration_losing_a_race_on_the_email_index(self):
+        data = {'fullname': 'Jane Two', 'email': 'Jane@Example.com', 'password': 'secret-pass', 'repeated_password': 'secret-pass'}
+        # The other registration commits between the serializer's check and the insert.
+        with mock.patch('auth_app.api.serializer.RegistrationSerializer.validate_email', side_effect=lambda value: value):
+            response = self.client.post(reverse('registration'), data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'email': ['Email already exists']})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_migration_reports_emails_differing_in_case(self):
+        check = import_module('auth_app.migrations.0001_user_email_lower_index').check_duplicate_emails
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX auth_user_email_lower_uniq')
+        other = User.objects.create_user(username='Jane Two', email='Jane@Example.com')
+
+        with self.assertRaisesMessage(IntegrityError, f'jane@example.com: user ids {sorted([self.user.id, other.id])}'):
+            check(apps, None)
+        other.delete()
+        check(apps, None)
+
+
+class TokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        # A file cache stands in for a shared backend such as Redis.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+        }})
+        shared.enable()
+        self.addCleanup(shared.disable)
+        cache.clear()
+        tokens.local_cache.clear()
+        self.user = User.objects.create_user(username='Jane Doe', email='jane@example.com', password='secret-pass')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_resolved_token_needs_no_query(self):
+        self.auth.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+        tokens.local_cache.clear()
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_cache_holds_no_credentials(self):
+        self.auth.authenticate_credentials(self.token.key)
+
+        entry = cache.get(tokens._cache_key(self.token.key))
+        self.assertEqual(set(entry), {'user_id', 'is_active', 'created'})
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user.get_deferred_fields(), {f.attname for f in User._meta.concrete_fields} - {'id', 'is_active'})
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'jane@example.com')
+
+    def test_local_memory_cache_is_not_used_as_shared_tier(self):
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertIsNone(tokens.shared_cache())
+            self.auth.authenticate_credentials(self.token.key)
+            self.assertIsNone(cache.get(tokens._cache_key(self.token.key)))
+            tokens.local_cache.clear()
+            with self.assertNumQueries(1):
+                self.auth.authenticate_credentials(self.token.key)
+
+    def test_deleted_token_is_rejected(self):
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deactivated_user_is_rejected(self):
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_entries_cached_before_commit_are_dropped(self):
+        entry = tokens.resolve_token(self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # A concurrent request still reading the committed user.
+            cache.set(tokens._cache_key(self.token.key), entry)
+            tokens.local_cache.set(self.token.key, entry)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_expired_token_is_rejected_and_replaced_on_login(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(days=2))
+
+        with self.settings(AUTH_TOKEN_TTL=60 * 60 * 24):
+            with self.assertRaisesMessage(AuthenticationFailed, 'Token has expired.'):
+                self.auth.authenticate_credentials(self.token.key)
+            response = self.client.post(reverse('login'), {'email': 'jane@example.com', 'password': 'secret-pass'})
+            self.assertNotEqual(response.data['token'], self.token.key)
+            self.auth.authenticate_credentials(response.data['token'])
+
+    def test_login_keeps_valid_token_unless_rotation_is_enabled(self):
+        credentials = {'email': 'jane@example.com', 'password': 'secret-pass'}
+
+        self.assertEqual(self.client.post(reverse('login'), credentials).data['token'], self.token.key)
+
+        self.auth.authenticate_credentials(self.token.key)
+        with self.settings(AUTH_TOKEN_ROTATE_ON_LOGIN=True):
+            new_key = self.client.post(reverse('login'), credentials).data['token']
+        self.assertNotEqual(new_key, self.token.key)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_api_requests_use_the_cache(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.client.get(reverse('tasks-assigned-to-me'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks-assigned-to-me'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if 'authtoken_token' in q['sql']])
+
+
+class LoginPathTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Jane Doe', email='jane@example.com', password='secret-pass')
+
+    def test_login_fetches_the_user_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {'email': 'Jane@Example.com', 'password': 'secret-pass'})
+
+        self.assertEqual(response.status_code, 200)
+        user_queries = [q for q in queries if q['sql'].startswith('SELECT') and 'FROM "auth_user"' in q['sql']]
+        self.assertEqual(len(user_queries), 1)
+
+    def test_wrong_password_and_unknown_email_are_rejected(self):
+        for email, password in [('jane@example.com', 'wrong'), ('nobody@example.com', 'secret-pass')]:
+            response = self.client.post(reverse('login'), {'email': email, 'password': password})
+            self.assertEqual(response.status_code, 400)
+
+    def test_username_login_still_works(self):
+        self.assertEqual(authenticate(username='Jane Doe', password='secret-pass'), self.user)
+
+    def test_registration_creates_user_and_token_together(self):
+        data = {'fullname': 'John', 'email': 'john@example.com', 'password': 'pw-12345', 'repeated_password': 'pw-12345'}
+
+        with mock.patch.object(Token.objects, 'create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.client.post(reverse('registration'), data)
+        self.assertFalse(User.objects.filter(email='john@example.com').exists())
+
+        response = self.client.post(reverse('registration'), data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Token.objects.get(user_id=response.data['user_id']).key, response.data['token'])
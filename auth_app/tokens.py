@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+CACHE_KEY = 'auth:token:v2:{key}'
+
+stats = Counter()
+
+class LocalTokenCache:
+    """
+    Small per-process LRU in front of the shared cache. Entries live at most
+    `timeout` seconds, which bounds how long another process may keep using a
+    token that was revoked elsewhere (the shared entry is deleted at once).
+    """
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires = item
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        timeout = getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_TIMEOUT', 10)
+        size = getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_SIZE', 1024)
+        if not timeout or not size:
+            return
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+local_cache = LocalTokenCache()
+
+def _cache_key(key):
+    return CACHE_KEY.format(key=key)
+
+def shared_cache():
+    """
+    The default cache if all processes share it, None for a per-process
+    local-memory cache: its entries could not be invalidated in the other
+    processes, so tokens are then only cached in the LRU.
+    """
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    return None if isinstance(cache, LocMemCache) else cache
+
+def _cache_timeout():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 300)
+
+def _lookup(key):
+    # Only what authentication needs, so no password hash or permission flags are cached.
+    return Token.objects.filter(key=key).values('user_id', 'created', is_active=F('user__is_active'))
+
+def entry_user(entry):
+    """
+    The user of a token entry as a model instance with only `id` and
+    `is_active` loaded; other fields are read from the database on first access.
+    """
+    return get_user_model().from_db(DEFAULT_DB_ALIAS, ['id', 'is_active'], [entry['user_id'], entry['is_active']])
+
+def resolve_token(key):
+    """
+    Returns `{'user_id', 'is_active', 'created'}` for the token key or None if it does not exist.
+    Looks in the process LRU, then the shared cache (see `shared_cache`), then the database.
+    """
+    entry = local_cache.get(key)
+    if entry is not None:
+        stats['local_hits'] += 1
+        return entry
+    cache = shared_cache()
+    entry = cache.get(_cache_key(key)) if cache else None
+    if entry is not None:
+        stats['shared_hits'] += 1
+    else:
+        stats['misses'] += 1
+        entry = _lookup(key).first()
+        if entry is None:
+            return None
+        if cache:
+            cache.set(_cache_key(key), entry, _cache_timeout())
+    local_cache.set(key, entry)
+    return entry
+
+async def aresolve_token(key):
+    """
+    Async variant of `resolve_token` sharing the same cache entries.
+    """
+    entry = local_cache.get(key)
+    if entry is not None:
+        stats['local_hits'] += 1
+        return entry
+    cache = shared_cache()
+    entry = await cache.aget(_cache_key(key)) if cache else None
+    if entry is not None:
+        stats['shared_hits'] += 1
+    else:
+        stats['misses'] += 1
+        entry = await _lookup(key).afirst()
+        if entry is None:
+            return None
+        if cache:
+            await cache.aset(_cache_key(key), entry, _cache_timeout())
+    local_cache.set(key, entry)
+    return entry
+
+def invalidate_tokens(keys):
+    """
+    Drops the cached entries of the given token keys, now and again once the
+    current transaction commits, so an entry cached by a concurrent request
+    from the not yet committed rows does not outlive the change.
+    """
+    keys = {key for key in keys if key}
+    if keys:
+        _drop_tokens(keys)
+        transaction.on_commit(lambda: _drop_tokens(keys))
+
+def _drop_tokens(keys):
+    local_cache.delete(keys)
+    cache = shared_cache()
+    if cache:
+        cache.delete_many([_cache_key(key) for key in keys])
+
+def token_expires_at(created):
+    """
+    When a token created at `created` expires, or None if `AUTH_TOKEN_TTL` is unset.
+    """
+    ttl = getattr(settings, 'AUTH_TOKEN_TTL', None)
+    if ttl is None:
+        return None
+    return created + timedelta(seconds=ttl)
+
+def is_token_expired(created):
+    expires_at = token_expires_at(created)
+    return expires_at is not None and expires_at <= timezone.now()
+
+def check_token(entry):
+    """
+    Returns the user of a resolved token entry or raises AuthenticationFailed.
+    """
+    if entry is None:
+        raise exceptions.AuthenticationFailed('Invalid token.')
+    if is_token_expired(entry['created']):
+        raise exceptions.AuthenticationFailed('Token has expired.')
+    if not entry['is_active']:
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+    return entry_user(entry)
+
+def rotate_token(user):
+    """
+    Replaces the user's token with a new one. The old key stops working at once
+    in this process and within `AUTH_TOKEN_LOCAL_CACHE_TIMEOUT` seconds in the
+    others, as their LRU entries expire.
+    """
+    with transaction.atomic():
+        Token.objects.filter(user=user).delete()
+        return Token.objects.create(user=user)
+
+def issue_token(user):
+    """
+    Returns the user's current token, rotating it first if it has expired
+    or `AUTH_TOKEN_ROTATE_ON_LOGIN` is set.
+    """
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and (getattr(settings, 'AUTH_TOKEN_ROTATE_ON_LOGIN', False) or is_token_expired(token.created)):
+        token = rotate_token(user)
+    return token
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that resolves `key -> user` through `resolve_token`
+    instead of joining authtoken_token to auth_user on every request.
+    Tokens expire after `AUTH_TOKEN_TTL` seconds.
+    """
+    def authenticate_credentials(self, key):
+        entry = resolve_token(key)
+        user = check_token(entry)
+        return (user, Token(key=key, user=user, created=entry['created']))
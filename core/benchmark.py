@@ -0,0 +1,186 @@
+"""
+In-process load drivers for the benchmark management commands. Requests go
+straight into the WSGI/ASGI application objects, so no server is needed and
+the numbers reflect the Django stack only.
+"""
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+HOST = 'localhost'
+
+def wsgi_request(application, method, path, headers=None, body=b''):
+    """
+    Sends one request through the WSGI application.
+    Returns `(status, response_headers, content, seconds)`.
+    """
+    url = urlsplit(path)
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in (headers or {}).items():
+        name = name.upper().replace('-', '_')
+        environ[name if name == 'CONTENT_TYPE' else f'HTTP_{name}'] = value
+    started_response = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, response_headers, exc_info=None: started_response.append((status, response_headers)))
+    try:
+        content = b''.join(response)
+    finally:
+        response.close()
+    elapsed = time.perf_counter() - started
+    status, response_headers = started_response[0]
+    return int(status.split()[0]), dict(response_headers), content, elapsed
+
+def run_wsgi(application, requests, concurrency):
+    """
+    Sends `requests` (an iterable of `(method, path, headers, body)`) through
+    the WSGI application from a pool of `concurrency` threads.
+    Returns `(status, seconds)` per request.
+    """
+    def one(request):
+        status, _, _, elapsed = wsgi_request(application, *request)
+        return status, elapsed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, requests))
+
+def run_asgi(application, requests, concurrency):
+    """
+    Sends the same kind of requests through the ASGI application as
+    coroutines, at most `concurrency` at a time.
+    """
+    async def one(semaphore, request):
+        method, path, headers, body = request
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'root_path': '',
+            'headers': [
+                (b'host', HOST.encode()),
+                (b'content-length', str(len(body)).encode()),
+                *((name.lower().encode(), value.encode()) for name, value in headers.items()),
+            ],
+            'server': (HOST, 80),
+            'client': ('127.0.0.1', 0),
+        }
+        received = False
+        status = []
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            # The client never disconnects; Django cancels this wait when it is done.
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        async with semaphore:
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            return status[0], time.perf_counter() - started
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(semaphore, request) for request in requests))
+
+    return asyncio.run(main())
+
+def asgi_first_chunk(application, path, headers=None):
+    """
+    Opens a streaming GET through the ASGI application and disconnects after
+    the first body chunk. Returns `(status, response_headers, seconds to first chunk)`.
+    """
+    url = urlsplit(path)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': url.path,
+        'raw_path': url.path.encode(),
+        'query_string': url.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', HOST.encode()), *((name.lower().encode(), value.encode()) for name, value in (headers or {}).items())],
+        'server': (HOST, 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+    async def main():
+        disconnect = asyncio.Event()
+        first_chunk = asyncio.Event()
+        start = {}
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                start.update(message)
+            elif message['type'] == 'http.response.body':
+                first_chunk.set()
+
+        started = time.perf_counter()
+        app = asyncio.ensure_future(application(scope, receive, send))
+        waiter = asyncio.ensure_future(first_chunk.wait())
+        await asyncio.wait([app, waiter], return_when=asyncio.FIRST_COMPLETED)
+        elapsed = time.perf_counter() - started
+        disconnect.set()
+        waiter.cancel()
+        try:
+            await asyncio.wait_for(app, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        response_headers = {name.decode(): value.decode() for name, value in start.get('headers', [])}
+        return start.get('status'), response_headers, elapsed
+
+    return asyncio.run(main())
+
+def summarize(results, elapsed):
+    """
+    One line with throughput, median and 95th percentile latency and failures.
+    """
+    latencies = sorted(latency for _, latency in results)
+    failed = sum(1 for status, _ in results if not 200 <= status < 300)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    return (
+        f"{len(results) / elapsed:.1f} req/s, "
+        f"p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+        f"{failed} failed"
+    )
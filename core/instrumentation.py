@@ -0,0 +1,232 @@
+"""
+Per-request profiling: SQL query count and time, time spent in the view
+outside SQL (serialization, mostly), render time and response size. Results
+go into a `Server-Timing` header, a structured log line and an in-process
+aggregate per URL name. Repeated SQL shapes are flagged as likely N+1s.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('kanmind.requests')
+
+_current = ContextVar('request_metrics', default=None)
+
+_PARAM_GROUP = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_REPEATED_GROUPS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+def sql_shape(sql):
+    """
+    The query with parameter lists collapsed, so `IN (%s, %s)` and
+    `IN (%s, %s, %s)` count as the same statement.
+    """
+    return _REPEATED_GROUPS.sub('(...)', _PARAM_GROUP.sub('(...)', sql))
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+        self.view_started = None
+        self.view_db_time = 0.0
+        self.render_started = None
+        self.render_db_time = 0.0
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self.shapes[sql_shape(sql)] += 1
+
+    def mark_view(self):
+        self.view_started = time.perf_counter()
+        self.view_db_time = self.db_time
+
+    def mark_render(self):
+        self.render_started = time.perf_counter()
+        self.render_db_time = self.db_time
+
+    def n_plus_one(self):
+        threshold = getattr(settings, 'REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', 5)
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def timings(self):
+        """
+        Milliseconds per phase. `serialize` is the view's time outside SQL,
+        which for these API views is almost entirely serializer work.
+        """
+        finished = time.perf_counter()
+        view_end = self.render_started or finished
+        view_db_end = self.render_db_time if self.render_started else self.db_time
+        timings = {'db': self.db_time * 1000, 'total': (finished - self.started) * 1000}
+        if self.view_started is not None:
+            view = view_end - self.view_started
+            timings['serialize'] = max(0.0, view - (view_db_end - self.view_db_time)) * 1000
+        if self.render_started is not None:
+            timings['render'] = max(0.0, (finished - self.render_started) - (self.db_time - self.render_db_time)) * 1000
+        return timings
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+def _install_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+def install():
+    """
+    Hooks `record_query` into every database connection. Queries are attributed
+    through a context variable, so async views whose ORM calls run in a worker
+    thread are counted too.
+    """
+    connection_created.connect(_install_wrapper, dispatch_uid='kanmind-request-metrics')
+    for connection in connections.all(initialized_only=True):
+        _install_wrapper(connection)
+
+class MetricsStore:
+    """
+    In-process aggregate of request metrics per URL name.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = defaultdict(lambda: {
+            'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'serialize_ms': 0.0,
+            'queries': 0, 'max_queries': 0, 'bytes': 0, 'n_plus_one': 0,
+        })
+
+    def record(self, name, timings, queries, size, n_plus_one):
+        with self._lock:
+            route = self._routes[name]
+            route['requests'] += 1
+            route['total_ms'] += timings['total']
+            route['max_ms'] = max(route['max_ms'], timings['total'])
+            route['db_ms'] += timings['db']
+            route['serialize_ms'] += timings.get('serialize', 0.0)
+            route['queries'] += queries
+            route['max_queries'] = max(route['max_queries'], queries)
+            route['bytes'] += size or 0
+            route['n_plus_one'] += bool(n_plus_one)
+
+    def snapshot(self):
+        """
+        Averages and maxima per URL name, slowest average first.
+        """
+        with self._lock:
+            routes = {name: dict(route) for name, route in self._routes.items()}
+        result = []
+        for name, route in routes.items():
+            count = route['requests']
+            result.append({
+                'name': name,
+                'requests': count,
+                'avg_ms': round(route['total_ms'] / count, 2),
+                'max_ms': round(route['max_ms'], 2),
+                'avg_db_ms': round(route['db_ms'] / count, 2),
+                'avg_serialize_ms': round(route['serialize_ms'] / count, 2),
+                'avg_queries': round(route['queries'] / count, 2),
+                'max_queries': route['max_queries'],
+                'avg_bytes': round(route['bytes'] / count),
+                'n_plus_one_requests': route['n_plus_one'],
+            })
+        return sorted(result, key=lambda route: route['avg_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+store = MetricsStore()
+
+def _route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name if match.url_name else match.route
+
+class RequestMetricsMiddleware:
+    """
+    Collects `RequestMetrics` for every request. Put it first in MIDDLEWARE so
+    the queries of the other middleware (authentication, sessions) count too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.mark_view()
+
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.mark_render()
+        return response
+
+    def finish(self, request, response, metrics):
+        timings = metrics.timings()
+        size = None if response.streaming else len(response.content)
+        n_plus_one = metrics.n_plus_one()
+        name = _route_name(request)
+
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True):
+            parts = [f'db;dur={timings["db"]:.1f};desc="{metrics.queries} queries"']
+            parts += [f'{phase};dur={timings[phase]:.1f}' for phase in ('serialize', 'render', 'total') if phase in timings]
+            response['Server-Timing'] = ', '.join(parts)
+
+        logger.info(json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'name': name,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            **{f'{phase}_ms': round(duration, 2) for phase, duration in timings.items()},
+            'bytes': size,
+            'n_plus_one': len(n_plus_one),
+        }))
+        for shape, count in n_plus_one:
+            logger.warning(json.dumps({'event': 'n_plus_one', 'name': name, 'count': count, 'sql': shape}))
+
+        store.record(name, timings, metrics.queries, size, n_plus_one)
+        return response
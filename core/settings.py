@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,7 +48,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'auth_app.tokens.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -55,6 +57,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'core.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -96,6 +99,105 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Local memory is per process. Use a shared backend (Redis, memcached) in
+# production: resolved tokens are then cached across processes, which a
+# local-memory cache cannot do (auth_app.tokens.shared_cache).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'kanmind',
+    }
+}
+
+# Request instrumentation (core.instrumentation): whether responses carry a
+# Server-Timing header, and how often one SQL shape may repeat in a request
+# before it is logged as a likely N+1.
+REQUEST_METRICS_SERVER_TIMING = True
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = 5
+
+# Token authentication: lifetime of a token in seconds (None = never expires),
+# whether every login issues a new token, seconds a resolved token stays in the
+# shared cache (unused with a local-memory CACHES backend), and size/lifetime of
+# the per-process LRU in front of it.
+AUTH_TOKEN_TTL = 60 * 60 * 24 * 30
+AUTH_TOKEN_ROTATE_ON_LOGIN = False
+AUTH_TOKEN_CACHE_TIMEOUT = 300
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 1024
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = 10
+
+# Seconds a user's set of accessible board ids stays cached.
+KANBAN_BOARD_ACCESS_CACHE_TIMEOUT = 300
+
+# Default and maximum page size of the cursor paginated list endpoints.
+KANBAN_PAGE_SIZE = 50
+KANBAN_MAX_PAGE_SIZE = 500
+
+# Rows fetched and rendered per chunk when a list is streamed with ?stream=1.
+KANBAN_STREAM_CHUNK_SIZE = 2000
+
+# Maximum number of items (creates + updates + deletes) in one bulk task request.
+KANBAN_BULK_MAX_ITEMS = 500
+
+# Maximum number of comments in one bulk comment request and rows per INSERT batch.
+KANBAN_BULK_COMMENT_MAX_ITEMS = 5000
+KANBAN_BULK_BATCH_SIZE = 500
+
+# Email lookups for the member picker: most emails per batch check, minimum
+# prefix length, result limit and seconds results are cached for autocomplete.
+KANBAN_EMAIL_CHECK_MAX_EMAILS = 200
+KANBAN_EMAIL_SEARCH_MIN_LENGTH = 3
+KANBAN_EMAIL_SEARCH_LIMIT = 10
+KANBAN_EMAIL_SEARCH_CACHE_TIMEOUT = 30
+
+# Full-text search (GET /api/search/): default and maximum result count, most
+# words per query, and up to how many boards are filtered inside the index.
+# KANBAN_SEARCH_BACKEND (class path) defaults to the FTS5 backend on SQLite and
+# the ORM backend elsewhere, see kanban_app.search.get_search_backend.
+KANBAN_SEARCH_LIMIT = 20
+KANBAN_SEARCH_MAX_LIMIT = 100
+KANBAN_SEARCH_MAX_TERMS = 8
+KANBAN_SEARCH_SCOPE_MAX_BOARDS = 200
+
+# Admin changelists: table size above which unfiltered lists show an estimated
+# count instead of COUNT(*), and most index hits an admin search filters on.
+KANBAN_ADMIN_EXACT_COUNT_LIMIT = 10000
+KANBAN_ADMIN_SEARCH_LIMIT = 1000
+
+# Rows per chunk when boards are exported/imported as NDJSON.
+KANBAN_TRANSFER_BATCH_SIZE = 2000
+
+# Change feed (GET /api/boards/<id>/events/): pub/sub backend, per-client queue
+# size and seconds between keepalive comments on idle streams.
+KANBAN_EVENT_BACKEND = 'kanban_app.events.InProcessBroker'
+KANBAN_EVENT_QUEUE_SIZE = 1000
+KANBAN_EVENT_KEEPALIVE = 15
+
+# Incremental board sync (GET /api/boards/<id>/?since=<cursor>): days change log
+# entries are kept by compact_changes and the most entries one sync may cover.
+# KANBAN_SYNC_OVERLAP (seconds cursors stay behind the newest changes) defaults
+# to 0 on SQLite and 10 elsewhere, see kanban_app.changes.sync_overlap.
+KANBAN_SYNC_RETENTION_DAYS = 30
+KANBAN_SYNC_MAX_CHANGES = 5000
+
+# Background jobs (run_jobs worker): attempts before a job fails, base retry
+# delay in seconds (doubled per attempt) and seconds after which a running job
+# counts as abandoned. Due-date reminders cover tasks due within
+# KANBAN_DUE_SOON_DAYS, are written in batches and kept for the retention period.
+KANBAN_JOB_MAX_ATTEMPTS = 3
+KANBAN_JOB_RETRY_DELAY = 60
+KANBAN_JOB_TIMEOUT = 3600
+KANBAN_DUE_SOON_DAYS = 2
+KANBAN_REMINDER_BATCH_SIZE = 1000
+KANBAN_REMINDER_RETENTION_DAYS = 30
+
+# Serve GET on the board list/detail, my-tasks and comment list endpoints with
+# async views (worth it under ASGI only; writes always use the DRF views).
+KANBAN_ASYNC_VIEWS = False
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -114,6 +216,43 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Email logins are checked by EmailBackend with a single user query; the
+# ModelBackend keeps username logins (admin) working.
+AUTHENTICATION_BACKENDS = [
+    'auth_app.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Password hashing profile, chosen with the PASSWORD_HASHER_PROFILE environment
+# variable. 'fast' hashes with MD5 to keep tests and load tests off the CPU and
+# must never be used in production: logins would rehash existing passwords to
+# MD5, so it is refused unless DEBUG is on. New hashes use the first hasher of
+# the profile; the others can still verify existing ones.
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+
+PASSWORD_HASHER_PROFILES = {
+    'default': [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+    'fast': [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    ],
+}
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'default')
+if PASSWORD_HASHER_PROFILE not in PASSWORD_HASHER_PROFILES:
+    raise ImproperlyConfigured(
+        f"Unknown PASSWORD_HASHER_PROFILE {PASSWORD_HASHER_PROFILE!r}; expected one of {', '.join(PASSWORD_HASHER_PROFILES)}."
+    )
+if PASSWORD_HASHER_PROFILE == 'fast' and not DEBUG:
+    raise ImproperlyConfigured("PASSWORD_HASHER_PROFILE=fast (MD5) is only allowed with DEBUG = True.")
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -16,9 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.views import JobMetricsView, RequestMetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('auth_app.api.urls')),
     path('api/', include('kanban_app.api.urls')),
+    path('api/metrics/requests/', RequestMetricsView.as_view(), name='request-metrics'),
+    path('api/metrics/jobs/', JobMetricsView.as_view(), name='job-metrics'),
 ]
@@ -0,0 +1,31 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.instrumentation import store
+from kanban_app.jobs import job_stats
+
+
+class RequestMetricsView(APIView):
+    """
+    Aggregated request metrics of this process per URL name (admins only).
+    DELETE resets them.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(store.snapshot(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class JobMetricsView(APIView):
+    """
+    Background job counts per status and run durations per job name (admins only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(job_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,56 @@
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from kanban_app.models import Board
+
+CACHE_KEY = 'kanban:board-access:{user_id}'
+
+stats = Counter()
+
+def _cache_key(user_id):
+    return CACHE_KEY.format(user_id=user_id)
+
+def _cache_timeout():
+    return getattr(settings, 'KANBAN_BOARD_ACCESS_CACHE_TIMEOUT', 300)
+
+def accessible_board_ids(user):
+    """
+    Returns the ids of all boards the user owns or is a member of.
+    The set is cached per user and invalidated by the signals in
+    `kanban_app.signals` whenever ownership or membership changes.
+    """
+    key = _cache_key(user.id)
+    board_ids = cache.get(key)
+    if board_ids is not None:
+        stats['hits'] += 1
+        return board_ids
+    stats['misses'] += 1
+    board_ids = frozenset(Board.objects.for_user(user).values_list('id', flat=True))
+    cache.set(key, board_ids, _cache_timeout())
+    return board_ids
+
+async def aaccessible_board_ids(user):
+    """
+    Async variant of `accessible_board_ids` sharing the same cache entries.
+    """
+    key = _cache_key(user.id)
+    board_ids = await cache.aget(key)
+    if board_ids is not None:
+        stats['hits'] += 1
+        return board_ids
+    stats['misses'] += 1
+    board_ids = frozenset([board_id async for board_id in Board.objects.for_user(user).values_list('id', flat=True)])
+    await cache.aset(key, board_ids, _cache_timeout())
+    return board_ids
+
+def invalidate_board_access(user_ids):
+    """
+    Drops the cached board ids of the given users, now and again once the
+    current transaction commits: a request reading in between still sees the
+    old membership and may have cached it.
+    """
+    keys = [_cache_key(uid) for uid in set(user_ids) if uid is not None]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,27 +1,134 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from auth_app.emails import users_by_email_prefix
 from .models import Board, Task, Comment
+from .search import get_search_backend, search_terms
+
+def estimated_row_count(model):
+    """
+    Approximate number of rows of the model's table, read from metadata
+    instead of a COUNT(*) scan; None where the database offers no estimate.
+    On SQLite this is MAX(rowid), which only overestimates after deletes.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'SELECT MAX(rowid) FROM {table}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return max(row[0] or 0, 0) if row else None
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the table estimate as the count of an unfiltered changelist once the
+    table holds more than KANBAN_ADMIN_EXACT_COUNT_LIMIT rows. Filtered and
+    smaller lists are counted exactly.
+    """
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate > getattr(settings, 'KANBAN_ADMIN_EXACT_COUNT_LIMIT', 10000):
+                return estimate
+        return super().count
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Related-object filter with a select2 search box instead of a link per
+    object, so the sidebar never loads the whole related table. Only the
+    selected object is read; choosing another one reloads the list through
+    `kanban_app/autocomplete_filter.js`. The related model's admin needs
+    `search_fields`.
+    """
+    template = 'admin/kanban_app/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def render_widget(self):
+        widget = AutocompleteSelect(self.field, self.admin_site, attrs={'class': 'autocomplete-filter'})
+        widget.choices = forms.ModelChoiceField(self.field.remote_field.model._default_manager.all(), required=False).choices
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return widget.render(self.lookup_kwarg, value)
+
+class ChangelistAdmin(admin.ModelAdmin):
+    """
+    Base for the changelists of tables that grow large: estimated counts,
+    no second COUNT(*) for "show all", and the media of AutocompleteFilter.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        if any(isinstance(entry, tuple) and entry[1] is AutocompleteFilter for entry in self.list_filter):
+            media += AutocompleteSelect(None, self.admin_site).media
+            media += forms.Media(js=['kanban_app/autocomplete_filter.js'])
+        return media
+
+class IndexedSearchMixin:
+    """
+    Admin search through the full-text index (`object_ids` of the search
+    backend) instead of LIKE scans, plus an email prefix match on the
+    `email_search_fields` user relations. `search_fields` only enables the
+    search box.
+    """
+    search_kind = None
+    email_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        limit = getattr(settings, 'KANBAN_ADMIN_SEARCH_LIMIT', 1000)
+        condition = Q(id__in=get_search_backend().object_ids(self.search_kind, search_terms(search_term), limit))
+        users = users_by_email_prefix(search_term).values('id')
+        for field in self.email_search_fields:
+            condition |= Q(**{f'{field}__in': users})
+        return queryset.filter(condition), False
 
 @admin.register(Board)
-class BoardAdmin(admin.ModelAdmin):
-    list_display = ['id', 'title', 'owner', 'member_count']
+class BoardAdmin(ChangelistAdmin):
+    list_display = ['id', 'title', 'owner', 'member_count', 'ticket_count']
+    list_select_related = ['owner']
     search_fields = ['title', 'owner__email']
-    list_filter = ['owner']
-    
-    def member_count(self, obj):
-        return obj.members.count()
+    list_filter = [('owner', AutocompleteFilter)]
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(IndexedSearchMixin, ChangelistAdmin):
     list_display = ['id', 'title', 'board', 'status', 'priority', 'assignee', 'reviewer', 'due_date']
-    search_fields = ['title', 'assignee__email', 'reviewer__email']
-    list_filter = ['board', 'status', 'priority']
-    date_hierarchy = 'due_date'
+    list_select_related = ['board', 'assignee', 'reviewer']
+    search_fields = ['title', 'description']
+    search_kind = 'task'
+    email_search_fields = ['assignee', 'reviewer']
+    list_filter = [('board', AutocompleteFilter), 'status', 'priority', 'due_date']
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchMixin, ChangelistAdmin):
     list_display = ['id', 'task', 'author', 'created_at', 'short_content']
-    search_fields = ['author__email', 'content']
-    list_filter = ['created_at', 'author']
+    list_select_related = ['task', 'author']
+    search_fields = ['content']
+    search_kind = 'comment'
+    email_search_fields = ['author']
+    list_filter = ['created_at', ('author', AutocompleteFilter)]
 
     def short_content(self, obj):
-        return (obj.content[:30] + '...') if len(obj.content) > 30 else obj.content
\ No newline at end of file
+        return (obj.content[:30] + '...') if len(obj.content) > 30 else obj.content
@@ -0,0 +1,122 @@
+"""
+Async GET handlers for the read-heavy endpoints (see `read_view`).
+
+They are plain Django views, not DRF views. Authentication still goes
+through DRF's DEFAULT_AUTHENTICATION_CLASSES (`streams.authenticate`), but
+permission classes and throttles are not applied: each view checks access
+itself, mirroring the permission classes of the DRF view it stands in for.
+When those permissions change or throttling is configured, update these
+views too (or leave KANBAN_ASYNC_VIEWS off).
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from kanban_app.access import aaccessible_board_ids
+from kanban_app.models import Board, Task
+from .conditional import etag_matches, make_etag
+from .membership import ais_board_member
+from .pagination import BoardCursorPagination, CommentCursorPagination, TaskCursorPagination
+from .serializers import BoardSerializer, BoardDetailSerializer, TaskSerializer, CommentSerializer
+from .streaming import ordering_fields, streaming_json_response, wants_stream
+from .streams import authenticate
+from .views import with_board_detail
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    """
+    Renders like the DRF views do for JSON clients, so payloads stay byte-identical.
+    """
+    return HttpResponse(
+        JSONRenderer().render(data), status=status_code, content_type='application/json', headers=headers
+    )
+
+def error(detail, status_code, headers=None):
+    return render({'detail': detail}, status_code, headers)
+
+def not_authenticated():
+    return error('Authentication credentials were not provided.', status.HTTP_401_UNAUTHORIZED, {'WWW-Authenticate': 'Token'})
+
+def not_found(model):
+    return error(f'No {model._meta.object_name} matches the given query.', status.HTTP_404_NOT_FOUND)
+
+def forbidden():
+    return error('You do not have permission to perform this action.', status.HTTP_403_FORBIDDEN)
+
+async def paginated(paginator, queryset, serializer_class, request, streamable=False):
+    if streamable and wants_stream(request):
+        queryset = queryset.order_by(*ordering_fields(paginator.ordering))
+        return streaming_json_response(request, queryset, serializer_class)
+    drf_request = Request(request)
+    page = await paginator.apaginate_queryset(queryset, drf_request)
+    return render(paginator.get_paginated_response(serializer_class(page, many=True).data).data)
+
+async def board_list(request):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    board_ids = await aaccessible_board_ids(user)
+    return await paginated(BoardCursorPagination(), Board.objects.filter(id__in=board_ids), BoardSerializer, request)
+
+async def board_detail(request, board_id):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    if board_id not in await aaccessible_board_ids(user):
+        return not_found(Board)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        version = await Board.objects.filter(pk=board_id).values_list('version', flat=True).afirst()
+        etag = make_etag('board-', board_id, version)
+        if version is not None and etag_matches(if_none_match, etag):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    board = await with_board_detail(Board.objects.filter(pk=board_id)).afirst()
+    if board is None:
+        return not_found(Board)
+    if not await ais_board_member(board, user):
+        return forbidden()
+    headers = {'ETag': make_etag('board-', board_id, board.version), 'X-Sync-Cursor': str(board.sync_cursor)}
+    return render(BoardDetailSerializer(board).data, headers=headers)
+
+async def tasks_assigned_to_me(request):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    tasks = Task.objects.filter(assignee=user).select_related('assignee', 'reviewer')
+    return await paginated(TaskCursorPagination(), tasks, TaskSerializer, request, streamable=True)
+
+async def tasks_reviewing(request):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    tasks = Task.objects.filter(reviewer=user).select_related('assignee', 'reviewer')
+    return await paginated(TaskCursorPagination(), tasks, TaskSerializer, request, streamable=True)
+
+async def task_comments(request, task_id):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    task = await Task.objects.select_related('board').filter(id=task_id).afirst()
+    if task is None:
+        return not_found(Task)
+    if not await ais_board_member(task.board, user):
+        return forbidden()
+    comments = task.comments.select_related('author')
+    return await paginated(CommentCursorPagination(), comments, CommentSerializer, request, streamable=True)
+
+def read_view(async_get, sync_view, sync_params=()):
+    """
+    Serves GET with the async implementation and hands every other method
+    (and GETs using any of `sync_params`) to the existing sync DRF view.
+    """
+    sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET' and not any(param in request.GET for param in sync_params):
+            return await async_get(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    return csrf_exempt(view)
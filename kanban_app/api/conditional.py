@@ -0,0 +1,103 @@
+from django.db import transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from kanban_app.models import Board
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has been modified since it was fetched.'
+    default_code = 'precondition_failed'
+
+def make_etag(prefix, pk, version):
+    return f'"{prefix}{pk}-{version}"'
+
+def etag_matches(header, etag):
+    """
+    True if the If-Match / If-None-Match header value lists the given ETag (or '*').
+    """
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or etag in candidates
+
+class BoardVersionETagMixin:
+    """
+    Conditional requests for detail views whose state is covered by a board version.
+
+    - GET with If-None-Match returns 304 after one version lookup, without serializing.
+    - PATCH/PUT/DELETE with If-Match fail with 412 when the version has moved on.
+      The check is a conditional UPDATE of the board version in the same
+      transaction as the write, so of two writes sent with the same ETag only
+      the first succeeds.
+    - Successful GET/PATCH/PUT responses carry the current ETag.
+
+    Views implement `get_current_version()` (None if missing or inaccessible),
+    `get_object_version(obj)` and `get_object_board_id(obj)`, and save through
+    `perform_update` / `perform_destroy`.
+    """
+    etag_prefix = ''
+
+    def make_etag(self, version):
+        return make_etag(self.etag_prefix, self.kwargs[self.lookup_url_kwarg], version)
+
+    def current_etag(self):
+        version = self.get_current_version()
+        return None if version is None else self.make_etag(version)
+
+    def etag_version(self, etag):
+        """
+        The version an ETag of this resource stands for, or None.
+        """
+        prefix = self.make_etag('')[:-1]
+        if not etag.startswith(prefix) or not etag.endswith('"'):
+            return None
+        try:
+            return int(etag[len(prefix):-1])
+        except ValueError:
+            return None
+
+    def claim_version(self, obj):
+        """
+        Checks If-Match against the board version and bumps the version in the
+        same UPDATE. A concurrent write holding the same ETag waits for the row
+        lock and then matches no row.
+        """
+        if_match = self.request.headers.get('If-Match')
+        if not if_match:
+            return
+        candidates = [value.strip() for value in if_match.split(',')]
+        if '*' in candidates:
+            return
+        versions = {self.etag_version(candidate) for candidate in candidates} - {None}
+        board = Board.objects.filter(pk=self.get_object_board_id(obj), version__in=versions)
+        if not versions or not board.update(version=F('version') + 1):
+            raise PreconditionFailed()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            self.claim_version(serializer.instance)
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.claim_version(instance)
+            super().perform_destroy(instance)
+
+    def retrieve(self, request, *args, **kwargs):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            etag = self.current_etag()
+            if etag is not None and etag_matches(if_none_match, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': self.make_etag(self.get_object_version(instance))})
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('PUT', 'PATCH') and status.is_success(response.status_code):
+            etag = self.current_etag()
+            if etag is not None:
+                response['ETag'] = etag
+        return response
@@ -0,0 +1,84 @@
+from kanban_app.models import Board
+
+CACHE_ATTR = '_board_membership_cache'
+
+def _request_cache(request):
+    """
+    Returns the membership memo stored on the request, creating it if needed.
+    Without a request a throwaway dict is used, so nothing is memoized.
+    """
+    if request is None:
+        return {}
+    cache = getattr(request, CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(request, CACHE_ATTR, cache)
+    return cache
+
+def board_members_among(request, board_id, user_ids):
+    """
+    Returns the subset of `user_ids` that are members of the board.
+    Unknown ids are resolved in one query against the membership table
+    and memoized on the request.
+    """
+    user_ids = {uid for uid in user_ids if uid is not None}
+    cache = _request_cache(request)
+    missing = [uid for uid in user_ids if (board_id, uid) not in cache]
+    if missing:
+        found = set(
+            Board.members.through.objects
+            .filter(board_id=board_id, user_id__in=missing)
+            .values_list('user_id', flat=True)
+        )
+        for uid in missing:
+            cache[(board_id, uid)] = uid in found
+    return {uid for uid in user_ids if cache[(board_id, uid)]}
+
+def is_board_member(request, board, user):
+    """
+    True if the user owns the board or is one of its members.
+    """
+    if board.owner_id == user.id:
+        return True
+    return bool(board_members_among(request, board.id, [user.id]))
+
+async def ais_board_member(board, user):
+    """
+    Async variant of `is_board_member` for the async views (not memoized).
+    """
+    if board.owner_id == user.id:
+        return True
+    return await Board.members.through.objects.filter(board_id=board.id, user_id=user.id).aexists()
+
+def validate_board_members(request, board, user, user_ids):
+    """
+    Checks in a single query that `user` may act on the board and that every
+    id in `user_ids` is a board member. Returns the ids that are not members
+    (the acting user's id is included when they have no access).
+    """
+    check = set(user_ids)
+    if board.owner_id != user.id:
+        check.add(user.id)
+    members = board_members_among(request, board.id, check)
+    return {uid for uid in check if uid is not None and uid not in members}
+
+def memberships_among(request, pairs):
+    """
+    Returns the (board_id, user_id) pairs that are actual memberships.
+    All unknown pairs are resolved in one query and memoized on the request.
+    """
+    pairs = {(board_id, uid) for board_id, uid in pairs if uid is not None}
+    cache = _request_cache(request)
+    missing = [pair for pair in pairs if pair not in cache]
+    if missing:
+        found = set(
+            Board.members.through.objects
+            .filter(
+                board_id__in={board_id for board_id, _ in missing},
+                user_id__in={uid for _, uid in missing},
+            )
+            .values_list('board_id', 'user_id')
+        )
+        for pair in missing:
+            cache[pair] = pair in found
+    return {pair for pair in pairs if cache[pair]}
@@ -0,0 +1,161 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+def reverse_ordering(ordering):
+    """
+    The ordering tuple with every field's direction flipped.
+    """
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+class KanbanCursorPagination(CursorPagination):
+    """
+    Keyset pagination on a stable ordering. Deep pages cost the same as the
+    first one as long as the ordering is covered by an index.
+
+    `paginate_queryset` is split into building the page query and processing
+    its rows, so the async views can fetch the same page with the async ORM.
+    The two halves follow DRF 3.16's `CursorPagination.paginate_queryset`
+    and use its public cursor state; CursorPaginationTests compares pages
+    and links with DRF's own implementation to catch upgrades that diverge.
+    """
+    page_size = getattr(settings, 'KANBAN_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'KANBAN_MAX_PAGE_SIZE', 500)
+    ordering = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.build_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.build_page([obj async for obj in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Same query as DRF's CursorPagination: ordered, filtered by the cursor
+        position and sliced to one page plus one row.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (self.offset, self.reverse, self.current_position) = (0, False, None)
+        else:
+            (self.offset, self.reverse, self.current_position) = self.cursor
+
+        if self.reverse:
+            queryset = queryset.order_by(*reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            queryset = self.filter_position(queryset)
+
+        return queryset[self.offset:self.offset + self.page_size + 1]
+
+    def position_lookup(self):
+        """
+        `lt` or `gt`: how rows after the cursor compare to its position.
+        """
+        is_reversed = self.ordering[0].startswith('-')
+        return 'lt' if self.cursor.reverse != is_reversed else 'gt'
+
+    def position_value(self, queryset, attr, value):
+        """
+        A cursor position value converted to the type of the ordering field or
+        annotation. Tampered cursors give 404 like undecodable ones, not a 500.
+        """
+        annotation = queryset.query.annotations.get(attr)
+        if annotation is not None:
+            field = annotation.output_field
+        else:
+            field = queryset.model._meta.pk if attr == 'pk' else queryset.model._meta.get_field(attr)
+        try:
+            return field.to_python(value)
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def filter_position(self, queryset):
+        order_attr = self.ordering[0].lstrip('-')
+        position = self.position_value(queryset, order_attr, self.current_position)
+        return queryset.filter(**{f'{order_attr}__{self.position_lookup()}': position})
+
+    def build_page(self, results):
+        """
+        Turns the fetched rows into the page and next/previous positions.
+        """
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (self.current_position is not None) or (self.offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = self.current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (self.current_position is not None) or (self.offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = self.current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+class BoardCursorPagination(KanbanCursorPagination):
+    ordering = 'id'
+
+class TaskCursorPagination(KanbanCursorPagination):
+    ordering = 'id'
+
+class ReminderCursorPagination(KanbanCursorPagination):
+    ordering = 'id'
+
+class CommentCursorPagination(KanbanCursorPagination):
+    ordering = ('created_at', 'id')
+
+class TaskQueryPagination(KanbanCursorPagination):
+    """
+    Keyset pagination on the ordering chosen by the task query (`sort key, id`).
+    The position holds both values, so pages stay cheap even when many rows
+    share the same sort key (e.g. thousands of `medium` priority tasks).
+    """
+    def get_ordering(self, request, queryset, view):
+        return view.task_query.ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        return f'{getattr(instance, ordering[0].lstrip("-"))}|{instance.pk}'
+
+    def filter_position(self, queryset):
+        order_attr = self.ordering[0].lstrip('-')
+        key, _, pk = self.current_position.rpartition('|')
+        key = self.position_value(queryset, order_attr, key)
+        pk = self.position_value(queryset, 'pk', pk)
+        lookup = self.position_lookup()
+        return queryset.filter(Q(**{f'{order_attr}__{lookup}': key}) | Q(**{order_attr: key, f'pk__{lookup}': pk}))
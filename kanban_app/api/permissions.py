@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission
+from .membership import is_board_member
 
 class IsAuthenticatedAndBoardMember(BasePermission):
     """
@@ -16,7 +17,7 @@ class IsBoardOwnerOrMember(BasePermission):
     Typically used for board-related objects.
     """
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user or request.user in obj.members.all()
+        return is_board_member(request, obj, request.user)
 
 class IsBoardOwner(BasePermission):
     """
@@ -34,7 +35,7 @@ class IsTaskBoardMember(BasePermission):
     Used for task-related actions.
     """
     def has_object_permission(self, request, view, obj):
-        return obj.board.owner == request.user or request.user in obj.board.members.all()
+        return is_board_member(request, obj.board, request.user)
 
 class IsCommentAuthor(BasePermission):
     """
@@ -1,17 +1,23 @@
+from collections import Counter
 from rest_framework import serializers
-from kanban_app.models import Board, Task, Comment
+from kanban_app.access import accessible_board_ids
+from kanban_app.changes import record_changes
+from kanban_app.counters import apply_comment_changes, apply_task_changes
+from kanban_app.events import publish_event
+from kanban_app.models import Board, Task, Comment, Reminder
+from kanban_app.versions import bump_board_versions, bump_versions_for_tasks
+from django.conf import settings
 from django.contrib.auth import get_user_model 
+from django.db import transaction
+from django.utils import timezone
+from .membership import memberships_among, validate_board_members
 User = get_user_model()
 
 class BoardSerializer(serializers.ModelSerializer):
     """
     Serializer for creating and listing boards
     """
-    owner_id = serializers.IntegerField(source='owner.id', read_only=True)
-    member_count = serializers.SerializerMethodField()
-    ticket_count = serializers.SerializerMethodField()
-    tasks_to_do_count = serializers.SerializerMethodField()
-    tasks_high_prio_count = serializers.SerializerMethodField()
+    owner_id = serializers.IntegerField(read_only=True)
     members = serializers.ListField(write_only=True, child=serializers.IntegerField(), required=False)
     class Meta:
         model = Board
@@ -25,19 +31,8 @@ class BoardSerializer(serializers.ModelSerializer):
             'tasks_high_prio_count',
             'members'
         ]
+        read_only_fields = ['member_count', 'ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count']
 
-    def get_member_count(self, obj):
-        return obj.members.count()
-
-    def get_ticket_count(self, obj):
-        return 0
-
-    def get_tasks_to_do_count(self, obj):
-        return 0
-
-    def get_tasks_high_prio_count(self, obj):
-        return 0
-    
     def create(self, validated_data):
         request = self.context.get('request')
         user = request.user
@@ -66,7 +61,7 @@ class BoardDetailSerializer(serializers.ModelSerializer):
     """
     Detailed serializer for board view: includes tasks and full member info.
     """
-    owner_id = serializers.IntegerField(source='owner.id')
+    owner_id = serializers.IntegerField(read_only=True)
     members = MemberSerializer(many=True)
     tasks = serializers.SerializerMethodField()
     class Meta:
@@ -74,7 +69,7 @@ class BoardDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'owner_id', 'members', 'tasks']
 
     def get_tasks(self, obj):
-        return []
+        return BoardTaskSerializer(obj.tasks.all(), many=True).data
 
 class BoardUpdateSerializer(serializers.ModelSerializer):
     """
@@ -119,7 +114,7 @@ class TaskSerializer(serializers.ModelSerializer):
     """
     assignee = TaskUserSerializer(read_only=True)
     reviewer = TaskUserSerializer(read_only=True)
-    comments_count = serializers.SerializerMethodField()
+    comments_count = serializers.IntegerField(read_only=True)
     class Meta:
         model = Task
         fields = [
@@ -135,8 +130,26 @@ class TaskSerializer(serializers.ModelSerializer):
             'comments_count'
         ]
 
-    def get_comments_count(self, obj):
-        return Comment.objects.filter(task=obj).count()
+class ReminderTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'board', 'title', 'status', 'priority', 'due_date']
+
+class ReminderSerializer(serializers.ModelSerializer):
+    """
+    A precomputed due-date reminder with the task it is about.
+    """
+    task = ReminderTaskSerializer(read_only=True)
+    class Meta:
+        model = Reminder
+        fields = ['id', 'kind', 'day', 'task']
+
+class BoardTaskSerializer(TaskSerializer):
+    """
+    Task representation nested in the board detail view (without board id).
+    """
+    class Meta(TaskSerializer.Meta):
+        fields = [field for field in TaskSerializer.Meta.fields if field != 'board']
 
 class TaskCreateSerializer(serializers.ModelSerializer):
     """
@@ -153,16 +166,17 @@ class TaskCreateSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         board = data["board"]
-        user = self.context["request"].user
+        request = self.context["request"]
+        user = request.user
 
-        if user != board.owner and user not in board.members.all():
+        user_ids = [data.get(field) for field in ["assignee_id", "reviewer_id"]]
+        not_members = validate_board_members(request, board, user, user_ids)
+        if user.id != board.owner_id and user.id in not_members:
             raise serializers.ValidationError("You are not a member of this board.")
 
-        for field in ["assignee_id", "reviewer_id"]:
-            uid = data.get(field)
-            if uid is not None:
-                if not board.members.filter(id=uid).exists():
-                    raise serializers.ValidationError(f"User with id {uid} is not a board member.")
+        for uid in user_ids:
+            if uid in not_members:
+                raise serializers.ValidationError(f"User with id {uid} is not a board member.")
         return data
 
     def create(self, validated_data):
@@ -193,16 +207,17 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
     def validate(self, data):
         task = self.instance
         board = task.board
-        user = self.context["request"].user
+        request = self.context["request"]
+        user = request.user
 
-        if user != board.owner and user not in board.members.all():
+        user_ids = [data.get(field) for field in ["assignee_id", "reviewer_id"]]
+        not_members = validate_board_members(request, board, user, user_ids)
+        if user.id != board.owner_id and user.id in not_members:
             raise serializers.ValidationError("You are not a member of this board.")
 
-        for field in ["assignee_id", "reviewer_id"]:
-            uid = data.get(field)
-            if uid is not None:
-                if not board.members.filter(id=uid).exists():
-                    raise serializers.ValidationError(f"User {uid} is not a board member.")
+        for uid in user_ids:
+            if uid in not_members:
+                raise serializers.ValidationError(f"User {uid} is not a board member.")
         return data
 
     def update(self, instance, validated_data):
@@ -216,6 +231,155 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
+class TaskBulkCreateItemSerializer(serializers.ModelSerializer):
+    """
+    One task to create in a bulk request. The board is taken as a plain id
+    so validating many items does not look up each board separately.
+    """
+    board = serializers.IntegerField(source='board_id')
+    assignee_id = serializers.IntegerField(required=False, allow_null=True)
+    reviewer_id = serializers.IntegerField(required=False, allow_null=True)
+    class Meta:
+        model = Task
+        fields = [
+            "board", "title", "description", "status", "priority",
+            "assignee_id", "reviewer_id", "due_date"
+        ]
+
+class TaskBulkUpdateItemSerializer(serializers.ModelSerializer):
+    """
+    One task change (move, reprioritize, reassign, ...) in a bulk request.
+    """
+    id = serializers.IntegerField()
+    assignee_id = serializers.IntegerField(required=False, allow_null=True)
+    reviewer_id = serializers.IntegerField(required=False, allow_null=True)
+    class Meta:
+        model = Task
+        fields = [
+            "id", "title", "description", "status", "priority",
+            "assignee_id", "reviewer_id", "due_date"
+        ]
+        extra_kwargs = {
+            "title": {"required": False},
+            "status": {"required": False},
+            "priority": {"required": False},
+        }
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Creates, updates and deletes many tasks at once. Access and membership
+    of every item are validated with set-based queries; nothing is written
+    unless all items are valid.
+    """
+    create = TaskBulkCreateItemSerializer(many=True, required=False)
+    update = TaskBulkUpdateItemSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, data):
+        request = self.context["request"]
+        creates = data.get("create", [])
+        updates = data.get("update", [])
+        deletes = data.get("delete", [])
+
+        max_items = getattr(settings, "KANBAN_BULK_MAX_ITEMS", 500)
+        if len(creates) + len(updates) + len(deletes) > max_items:
+            raise serializers.ValidationError(f"A bulk request may contain at most {max_items} items.")
+
+        board_ids = accessible_board_ids(request.user)
+        task_ids = {item["id"] for item in updates} | set(deletes)
+        tasks = Task.objects.filter(id__in=task_ids, board_id__in=board_ids).in_bulk()
+
+        pairs = set()
+        for item in creates:
+            pairs.update((item["board_id"], item.get(field)) for field in ["assignee_id", "reviewer_id"])
+        for item in updates:
+            task = tasks.get(item["id"])
+            if task is not None:
+                pairs.update((task.board_id, item.get(field)) for field in ["assignee_id", "reviewer_id"])
+        memberships = memberships_among(request, pairs)
+
+        def member_errors(board_id, item):
+            errors = {}
+            for field in ["assignee_id", "reviewer_id"]:
+                uid = item.get(field)
+                if uid is not None and (board_id, uid) not in memberships:
+                    errors[field] = [f"User {uid} is not a board member."]
+            return errors
+
+        create_errors = []
+        for item in creates:
+            if item["board_id"] not in board_ids:
+                create_errors.append({"board": ["You are not a member of this board."]})
+            else:
+                create_errors.append(member_errors(item["board_id"], item))
+
+        update_errors = []
+        for item in updates:
+            task = tasks.get(item["id"])
+            if task is None:
+                update_errors.append({"id": ["Task not found."]})
+            else:
+                update_errors.append(member_errors(task.board_id, item))
+
+        delete_errors = [{} if tid in tasks else {"id": ["Task not found."]} for tid in deletes]
+
+        errors = {
+            name: item_errors
+            for name, item_errors in [("create", create_errors), ("update", update_errors), ("delete", delete_errors)]
+            if any(item_errors)
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        data["tasks"] = tasks
+        return data
+
+    def save(self):
+        # `create`/`update` are field names here, so the writes live in save()
+        # instead of overriding the serializer's create()/update() hooks.
+        validated_data = self.validated_data
+        tasks = validated_data["tasks"]
+        updates = validated_data.get("update", [])
+        deletes = validated_data.get("delete", [])
+
+        with transaction.atomic():
+            created = Task.objects.bulk_create(
+                [Task(**item) for item in validated_data.get("create", [])]
+            )
+            counter_rows = [(task.board_id, task.status, task.priority, 1) for task in created]
+
+            changed, fields, now = [], {"updated_at"}, timezone.now()
+            for item in updates:
+                task = tasks[item["id"]]
+                counter_rows.append((task.board_id, task.status, task.priority, -1))
+                for field, value in item.items():
+                    if field != "id":
+                        setattr(task, field, value)
+                        fields.add(field)
+                task.updated_at = now
+                counter_rows.append((task.board_id, task.status, task.priority, 1))
+                changed.append(task)
+            if changed:
+                Task.objects.bulk_update(changed, sorted(fields))
+
+            # bulk_create/bulk_update send no signals, so counters, versions
+            # and the change log are maintained here
+            apply_task_changes(counter_rows)
+            bump_board_versions(board_id for board_id, *_ in counter_rows)
+            record_changes((task.board_id, "task", task.id, "upsert") for task in created + changed)
+            for task in created:
+                publish_event(task.board_id, "task.created", id=task.id)
+            for task in changed:
+                publish_event(task.board_id, "task.updated", id=task.id)
+
+            if deletes:
+                Task.objects.filter(id__in=deletes).delete()
+
+        return {
+            "created": [task.id for task in created],
+            "updated": [item["id"] for item in updates if item["id"] not in deletes],
+            "deleted": deletes,
+        }
+
 class CommentSerializer(serializers.ModelSerializer):
     """
     Serializer for listing and creating task comments.
@@ -226,4 +390,68 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'created_at', 'author', 'content']
 
     def get_author(self, obj):
-        return obj.author.get_full_name()
\ No newline at end of file
+        return obj.author.get_full_name()
+
+class CommentBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One comment to add in a bulk request, addressed by task id.
+    """
+    task = serializers.IntegerField(source='task_id')
+    class Meta:
+        model = Comment
+        fields = ['task', 'content']
+
+class CommentBulkSerializer(serializers.Serializer):
+    """
+    Adds many comments (across many tasks) for the current user with
+    chunked bulk inserts. Task access is validated with one query.
+    """
+    comments = CommentBulkItemSerializer(many=True)
+
+    def validate_comments(self, items):
+        max_items = getattr(settings, "KANBAN_BULK_COMMENT_MAX_ITEMS", 5000)
+        if len(items) > max_items:
+            raise serializers.ValidationError(f"A bulk request may contain at most {max_items} comments.")
+
+        board_ids = accessible_board_ids(self.context["request"].user)
+        self.task_boards = dict(
+            Task.objects.filter(id__in={item["task_id"] for item in items}, board_id__in=board_ids)
+            .values_list("id", "board_id")
+        )
+        errors = [{} if item["task_id"] in self.task_boards else {"task": ["Task not found."]} for item in items]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def save(self):
+        author = self.context["request"].user
+        batch_size = getattr(settings, "KANBAN_BULK_BATCH_SIZE", 500)
+        with transaction.atomic():
+            comments = Comment.objects.bulk_create(
+                [Comment(author=author, **item) for item in self.validated_data["comments"]],
+                batch_size=batch_size,
+            )
+            task_deltas = Counter(comment.task_id for comment in comments)
+            apply_comment_changes(task_deltas)
+            bump_versions_for_tasks(task_deltas)
+            record_changes(
+                (self.task_boards[comment.task_id], "comment", comment.id, "upsert") for comment in comments
+            )
+            for comment in comments:
+                publish_event(self.task_boards[comment.task_id], "comment.created", id=comment.id, task=comment.task_id)
+        return comments
+
+class SyncTaskSerializer(BoardTaskSerializer):
+    """
+    Task as sent in incremental board sync responses.
+    """
+    class Meta(BoardTaskSerializer.Meta):
+        fields = BoardTaskSerializer.Meta.fields + ['updated_at']
+
+class SyncCommentSerializer(CommentSerializer):
+    """
+    Comment as sent in incremental board sync responses (with its task id).
+    """
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['task', 'updated_at']
+
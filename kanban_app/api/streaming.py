@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+STREAM_PARAM = 'stream'
+
+def wants_stream(request):
+    """
+    True for `?stream=1` / `?stream=true`: the client wants the full list, unpaginated.
+    """
+    return request.GET.get(STREAM_PARAM, '').lower() in ('1', 'true')
+
+def _chunk_size():
+    return getattr(settings, 'KANBAN_STREAM_CHUNK_SIZE', 2000)
+
+def _render_rows(serializer, renderer, rows):
+    return b','.join(renderer.render(serializer.to_representation(row)) for row in rows)
+
+def _json_array(queryset, serializer_class, chunk_size):
+    """
+    Renders the queryset as a JSON array chunk by chunk. Each row is rendered
+    with the same JSONRenderer, so the joined output is byte-identical to
+    rendering the whole serialized list at once.
+    """
+    serializer, renderer = serializer_class(), JSONRenderer()
+    yield b'['
+    rows, first = [], True
+    for row in queryset.iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield (b'' if first else b',') + _render_rows(serializer, renderer, rows)
+            rows, first = [], False
+    if rows:
+        yield (b'' if first else b',') + _render_rows(serializer, renderer, rows)
+    yield b']'
+
+async def _ajson_array(queryset, serializer_class, chunk_size):
+    """
+    Async variant of `_json_array` for ASGI, where a sync iterator would be
+    read completely into memory before the first byte is sent.
+    """
+    serializer, renderer = serializer_class(), JSONRenderer()
+    yield b'['
+    rows, first = [], True
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield (b'' if first else b',') + _render_rows(serializer, renderer, rows)
+            rows, first = [], False
+    if rows:
+        yield (b'' if first else b',') + _render_rows(serializer, renderer, rows)
+    yield b']'
+
+def streaming_json_response(request, queryset, serializer_class):
+    """
+    Streams the serialized queryset as a JSON array, holding at most
+    `KANBAN_STREAM_CHUNK_SIZE` rows in memory at a time.
+    """
+    request = getattr(request, '_request', request)
+    stream = _ajson_array if isinstance(request, ASGIRequest) else _json_array
+    return StreamingHttpResponse(stream(queryset, serializer_class, _chunk_size()), content_type='application/json')
+
+def ordering_fields(ordering):
+    """
+    A paginator's `ordering` ('id' or ('created_at', 'id')) as a tuple for `order_by`.
+    """
+    return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+class StreamingListMixin:
+    """
+    List views answer `?stream=1` with the whole list as a streamed JSON
+    array, in the order of their paginator.
+    """
+    def list(self, request, *args, **kwargs):
+        if wants_stream(request):
+            queryset = self.filter_queryset(self.get_queryset()).order_by(*ordering_fields(self.pagination_class.ordering))
+            return streaming_json_response(request, queryset, self.get_serializer_class())
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from auth_app.tokens import CachedTokenAuthentication, aresolve_token, check_token
+from kanban_app.access import aaccessible_board_ids
+from kanban_app.events import get_broker
+
+async def _token_user(request, query_token):
+    header = request.headers.get('Authorization', '')
+    key = header[len('Token '):].strip() if header.startswith('Token ') else None
+    if key is None and query_token:
+        key = request.GET.get('token')
+    if not key:
+        return None
+    return check_token(await aresolve_token(key))
+
+async def authenticate(request, query_token=False):
+    """
+    Resolves the user through DRF's DEFAULT_AUTHENTICATION_CLASSES, in order.
+    Cached token authentication runs on the async cache and ORM; any other
+    class runs its `authenticate` in a thread. Only the event stream passes
+    `query_token=True` to also accept `?token=` (EventSource cannot send
+    headers); elsewhere tokens stay out of URLs, access logs and Referer headers.
+    """
+    drf_request = None
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            if issubclass(authentication_class, CachedTokenAuthentication):
+                user = await _token_user(request, query_token)
+            else:
+                drf_request = drf_request or Request(request)
+                result = await sync_to_async(authentication_class().authenticate)(drf_request)
+                user = result[0] if result else None
+        except AuthenticationFailed:
+            return None
+        if user is not None:
+            return user
+    return None
+
+def _message(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+async def _event_stream(broker, board_id, allowed):
+    """
+    `allowed()` is awaited before every event and keepalive; once it fails
+    (membership removed, token deleted or rotated) the stream ends.
+    """
+    keepalive = getattr(settings, 'KANBAN_EVENT_KEEPALIVE', 15)
+    subscription = broker.subscribe(board_id)
+    try:
+        yield ': connected\n\n'
+        while True:
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield _message('resync', {'type': 'resync', 'board': board_id})
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                event = None
+            if not await allowed():
+                return
+            yield ': keepalive\n\n' if event is None else _message(event['type'], event)
+    finally:
+        broker.unsubscribe(subscription)
+
+async def board_events(request, board_id):
+    """
+    Server-sent events with task, comment and membership changes of a board.
+    Each client is a coroutine waiting on its queue, so idle connections cost
+    no thread. Needs an ASGI server; under WSGI the stream would block a worker.
+    Access is checked again for every event, through the token and board
+    access caches, so revoked users stop receiving events.
+    """
+    user = await authenticate(request, query_token=True)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if board_id not in await aaccessible_board_ids(user):
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    async def allowed():
+        current = await authenticate(request, query_token=True)
+        return current is not None and current.id == user.id and board_id in await aaccessible_board_ids(current)
+
+    response = StreamingHttpResponse(_event_stream(get_broker(), board_id, allowed), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,158 @@
+from datetime import date, timedelta
+from django.db.models import Case, Count, DateField, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+STATUSES = ('to-do', 'in-progress', 'review', 'done')
+PRIORITIES = ('low', 'medium', 'high')
+DUE_FILTERS = ('overdue', 'today', 'this-week', 'none')
+
+# Public ordering names and the sort key they stand for. Tasks without a due
+# date sort after all others.
+ORDERINGS = {
+    'id': ('id', None),
+    'due_date': ('due_sort', Coalesce('due_date', Value(date.max), output_field=DateField())),
+    'priority': ('priority_rank', Case(
+        *(When(priority=priority, then=Value(rank)) for rank, priority in enumerate(PRIORITIES)),
+        output_field=IntegerField(),
+    )),
+    'updated_at': ('updated_at', None),
+}
+
+class InvalidQuery(ValueError):
+    pass
+
+def _split(params, name):
+    return [value for raw in params.getlist(name) for value in raw.split(',') if value]
+
+def _choices(params, name, allowed):
+    values = _split(params, name)
+    invalid = [value for value in values if value not in allowed]
+    if invalid:
+        raise InvalidQuery(f"Invalid {name} {', '.join(invalid)}; expected {', '.join(allowed)}.")
+    return values
+
+def _date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidQuery(f"{name} must be a date (YYYY-MM-DD).")
+
+class TaskQuery:
+    """
+    The filters and ordering of `GET /api/tasks/query/`, parsed from the query
+    parameters. Every filter maps to an indexed column; the board filter is
+    always applied, so the planner can start from the (board, ...) indexes.
+
+    Facet counts ignore the facet's own filter (selecting `status=done` still
+    shows how many tasks each other status has) and are computed as
+    conditional aggregates in a single query.
+    """
+    def __init__(self, params, user, board_ids):
+        self.user = user
+        self.board_ids = set(board_ids)
+        requested_boards = _split(params, 'board')
+        if requested_boards:
+            try:
+                self.board_ids &= {int(board_id) for board_id in requested_boards}
+            except ValueError:
+                raise InvalidQuery("board must be a list of ids.")
+        self.statuses = _choices(params, 'status', STATUSES)
+        self.priorities = _choices(params, 'priority', PRIORITIES)
+        self.assignee = self.parse_user(params, 'assignee')
+        self.reviewer = self.parse_user(params, 'reviewer')
+        self.due = params.get('due') or None
+        if self.due is not None and self.due not in DUE_FILTERS:
+            raise InvalidQuery(f"due must be one of {', '.join(DUE_FILTERS)}.")
+        self.due_after = _date(params, 'due_after')
+        self.due_before = _date(params, 'due_before')
+
+        ordering = params.get('ordering') or 'id'
+        descending = ordering.startswith('-')
+        if ordering.lstrip('-') not in ORDERINGS:
+            raise InvalidQuery(f"ordering must be one of {', '.join(ORDERINGS)} (prefix - for descending).")
+        self.sort_key, self.sort_expression = ORDERINGS[ordering.lstrip('-')]
+        prefix = '-' if descending else ''
+        self.ordering = (f'{prefix}{self.sort_key}',) if self.sort_key == 'id' else (f'{prefix}{self.sort_key}', f'{prefix}id')
+
+    def parse_user(self, params, name):
+        """
+        `<id>[,<id>...]`, `me` or `none` (unassigned); None if not filtered.
+        """
+        values = _split(params, name)
+        if not values:
+            return None
+        if values == ['none']:
+            return 'none'
+        try:
+            return [self.user.id if value == 'me' else int(value) for value in values]
+        except ValueError:
+            raise InvalidQuery(f"{name} must be user ids, 'me' or 'none'.")
+
+    def user_filter(self, field, value):
+        if value is None:
+            return Q()
+        if value == 'none':
+            return Q(**{f'{field}__isnull': True})
+        return Q(**{f'{field}_id__in': value})
+
+    def due_filter(self):
+        today = timezone.localdate()
+        condition = Q()
+        if self.due == 'overdue':
+            condition &= Q(due_date__lt=today) & ~Q(status='done')
+        elif self.due == 'today':
+            condition &= Q(due_date=today)
+        elif self.due == 'this-week':
+            monday = today - timedelta(days=today.weekday())
+            condition &= Q(due_date__gte=monday, due_date__lte=monday + timedelta(days=6))
+        elif self.due == 'none':
+            condition &= Q(due_date__isnull=True)
+        if self.due_after:
+            condition &= Q(due_date__gte=self.due_after)
+        if self.due_before:
+            condition &= Q(due_date__lte=self.due_before)
+        return condition
+
+    def status_filter(self):
+        return Q(status__in=self.statuses) if self.statuses else Q()
+
+    def priority_filter(self):
+        return Q(priority__in=self.priorities) if self.priorities else Q()
+
+    def base_filter(self):
+        """
+        Every filter except status and priority, which are the facets.
+        """
+        return (
+            Q(board_id__in=self.board_ids)
+            & self.user_filter('assignee', self.assignee)
+            & self.user_filter('reviewer', self.reviewer)
+            & self.due_filter()
+        )
+
+    def apply(self, queryset):
+        queryset = queryset.filter(self.base_filter() & self.status_filter() & self.priority_filter())
+        if self.sort_expression is not None:
+            queryset = queryset.annotate(**{self.sort_key: self.sort_expression})
+        return queryset
+
+    def facets(self, queryset):
+        """
+        `{"total": n, "status": {status: n}, "priority": {priority: n}}` from one aggregate query.
+        """
+        status_filter, priority_filter = self.status_filter(), self.priority_filter()
+        aggregates = {'total': Count('id', filter=status_filter & priority_filter)}
+        for i, status in enumerate(STATUSES):
+            aggregates[f'status_{i}'] = Count('id', filter=Q(status=status) & priority_filter)
+        for i, priority in enumerate(PRIORITIES):
+            aggregates[f'priority_{i}'] = Count('id', filter=Q(priority=priority) & status_filter)
+        counts = queryset.filter(self.base_filter()).aggregate(**aggregates)
+        return {
+            'total': counts['total'],
+            'status': {status: counts[f'status_{i}'] for i, status in enumerate(STATUSES)},
+            'priority': {priority: counts[f'priority_{i}'] for i, priority in enumerate(PRIORITIES)},
+        }
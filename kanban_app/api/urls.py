@@ -1,14 +1,41 @@
+from django.conf import settings
 from django.urls import path
-from .views import BoardListView, BoardDetailView, EmailCheckView, TasksAssignedToMeView, TasksReviewingView, TaskCreateView, TaskDetailView, TaskCommentsView
+from . import async_views
+from .streams import board_events
+from .views import BoardListView, BoardDetailView, EmailCheckView, EmailCheckBatchView, EmailSearchView, TasksAssignedToMeView, TasksReviewingView, TaskCreateView, TaskDetailView, TaskBulkView, TaskCommentsView, CommentBulkView, SearchView, TaskQueryView, ReminderListView, BoardExportView, BoardImportView
+
+board_list = BoardListView.as_view()
+board_detail = BoardDetailView.as_view()
+tasks_assigned_to_me = TasksAssignedToMeView.as_view()
+tasks_reviewing = TasksReviewingView.as_view()
+task_comments = TaskCommentsView.as_view()
+
+if getattr(settings, 'KANBAN_ASYNC_VIEWS', False):
+    # Async GET handlers for the read-heavy endpoints; writes still go to the DRF views.
+    board_list = async_views.read_view(async_views.board_list, board_list)
+    board_detail = async_views.read_view(async_views.board_detail, board_detail, sync_params=('since',))
+    tasks_assigned_to_me = async_views.read_view(async_views.tasks_assigned_to_me, tasks_assigned_to_me)
+    tasks_reviewing = async_views.read_view(async_views.tasks_reviewing, tasks_reviewing)
+    task_comments = async_views.read_view(async_views.task_comments, task_comments)
 
 urlpatterns = [
-    path('boards/', BoardListView.as_view(), name='board-list'),
-    path('boards/<int:board_id>/', BoardDetailView.as_view(), name='board-detail'),
+    path('boards/', board_list, name='board-list'),
+    path('boards/<int:board_id>/', board_detail, name='board-detail'),
+    path('boards/import/', BoardImportView.as_view(), name='board-import'),
+    path('boards/<int:board_id>/export/', BoardExportView.as_view(), name='board-export'),
+    path('boards/<int:board_id>/events/', board_events, name='board-events'),
     path('email-check/', EmailCheckView.as_view(), name='email-check'),
-    path('tasks/assigned-to-me/', TasksAssignedToMeView.as_view(), name='tasks-assigned-to-me'),
-    path("tasks/reviewing/", TasksReviewingView.as_view(), name="tasks-reviewing"),
+    path('email-check/batch/', EmailCheckBatchView.as_view(), name='email-check-batch'),
+    path('email-check/search/', EmailSearchView.as_view(), name='email-search'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('tasks/assigned-to-me/', tasks_assigned_to_me, name='tasks-assigned-to-me'),
+    path("tasks/reviewing/", tasks_reviewing, name="tasks-reviewing"),
+    path("tasks/query/", TaskQueryView.as_view(), name="task-query"),
     path("tasks/", TaskCreateView.as_view(), name="task-create"),
+    path("tasks/bulk/", TaskBulkView.as_view(), name="task-bulk"),
     path("tasks/<int:task_id>/", TaskDetailView.as_view(), name="task-detail"),
-    path('tasks/<int:task_id>/comments/', TaskCommentsView.as_view()),
+    path('tasks/<int:task_id>/comments/', task_comments),
     path('tasks/<int:task_id>/comments/<int:comment_id>/', TaskCommentsView.as_view()),
+    path('reminders/', ReminderListView.as_view(), name='reminder-list'),
+    path('comments/bulk/', CommentBulkView.as_view(), name='comment-bulk'),
 ]
@@ -1,16 +1,44 @@
+from datetime import date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, CreateAPIView, ListAPIView
-from kanban_app.models import Board, Comment, Task
-from .serializers import BoardSerializer, BoardDetailSerializer, BoardUpdateSerializer, TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer, CommentSerializer
+from kanban_app.changes import latest_changes, next_cursor, settled_changes
+from kanban_app.models import Board, BoardChange, Comment, Reminder, Task
+from .serializers import BoardSerializer, BoardDetailSerializer, BoardUpdateSerializer, TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer, TaskBulkSerializer, CommentSerializer, CommentBulkSerializer, MemberSerializer, ReminderSerializer, SyncTaskSerializer, SyncCommentSerializer
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.conf import settings
+from django.utils import timezone
+from django.db.models import BigIntegerField, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from auth_app.emails import normalize_email, users_by_email, users_by_email_prefix, users_by_emails
+from kanban_app.access import accessible_board_ids
+from kanban_app.search import KINDS, get_search_backend, search_terms
+from kanban_app.transfer import BoardImportError, aexport_board, export_board, import_board
+from .conditional import BoardVersionETagMixin
+from .pagination import BoardCursorPagination, CommentCursorPagination, TaskCursorPagination, TaskQueryPagination, ReminderCursorPagination
+from .task_query import InvalidQuery, TaskQuery
+from .streaming import StreamingListMixin, streaming_json_response, wants_stream
 from .permissions import IsBoardOwnerOrMember, IsBoardOwner, IsTaskBoardMember, IsCommentAuthor
 
 User = get_user_model()
+
+def with_board_detail(queryset):
+    """
+    Prefetches everything the board detail payload needs (members, tasks with
+    their users) and annotates the current sync cursor.
+    """
+    tasks = Task.objects.select_related('assignee', 'reviewer').order_by('id')
+    latest_change = settled_changes(BoardChange.objects.filter(board=OuterRef('pk'))).order_by('-id').values('id')[:1]
+    return queryset.prefetch_related('members', Prefetch('tasks', queryset=tasks)).annotate(
+        sync_cursor=Coalesce(Subquery(latest_change), F('sync_floor'), output_field=BigIntegerField())
+    )
+
 class BoardListView(ListCreateAPIView):
     """
     Lists boards the user owns or is member of.
@@ -18,32 +46,141 @@ class BoardListView(ListCreateAPIView):
     """
     serializer_class = BoardSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BoardCursorPagination
 
     def get_queryset(self):
-        user = self.request.user
-        return Board.objects.filter(Q(owner=user) | Q(members=user)).distinct()
+        board_ids = accessible_board_ids(self.request.user)
+        return Board.objects.filter(id__in=board_ids)
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
-class BoardDetailView(RetrieveUpdateDestroyAPIView):
+class BoardDetailView(BoardVersionETagMixin, RetrieveUpdateDestroyAPIView):
     """
     Get, update or delete a specific board.
     Access limited to board owner or members.
+    Supports conditional requests through the board version ETag.
     """
     serializer_class = BoardDetailSerializer
     permission_classes = [IsAuthenticated, IsBoardOwnerOrMember]
     lookup_url_kwarg = "board_id"
+    etag_prefix = "board-"
+
+    def get_current_version(self):
+        board_id = self.kwargs["board_id"]
+        if board_id not in accessible_board_ids(self.request.user):
+            return None
+        return Board.objects.filter(pk=board_id).values_list('version', flat=True).first()
+
+    def get_object_version(self, obj):
+        return obj.version
+
+    def get_object_board_id(self, obj):
+        return obj.pk
 
     def get_queryset(self):
-        user = self.request.user
-        return Board.objects.filter(Q(owner=user) | Q(members=user)).distinct()
+        queryset = Board.objects.filter(id__in=accessible_board_ids(self.request.user))
+        if self.request.method == 'GET':
+            queryset = with_board_detail(queryset)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'since' in request.query_params:
+            return self.retrieve_changes(request)
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['X-Sync-Cursor'] = str(self.object.sync_cursor)
+        return response
+
+    def get_object(self):
+        self.object = super().get_object()
+        return self.object
+
+    def retrieve_changes(self, request):
+        """
+        Returns what changed on the board after the client's sync cursor
+        (`?since=<X-Sync-Cursor>`): upserted tasks, comments and members plus
+        tombstones for deleted ones. Answers 410 if the cursor is too old.
+        """
+        try:
+            since = int(request.query_params['since'])
+        except ValueError:
+            return Response({'error': 'since must be an integer cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        board = get_object_or_404(Board.objects.filter(id__in=accessible_board_ids(request.user)), pk=self.kwargs['board_id'])
+        self.check_object_permissions(request, board)
+        max_changes = getattr(settings, 'KANBAN_SYNC_MAX_CHANGES', 5000)
+        changes = list(board.changes.filter(id__gt=since).order_by('id')[:max_changes + 1])
+        if since < board.sync_floor or len(changes) > max_changes:
+            return Response({'error': 'Sync cursor expired, reload the board.'}, status=status.HTTP_410_GONE)
+
+        latest = latest_changes(changes)
+        def upserted(kind):
+            return [oid for (k, oid), action in latest.items() if k == kind and action == 'upsert']
+
+        tasks = board.tasks.filter(id__in=upserted('task')).select_related('assignee', 'reviewer').order_by('id')
+        comments = Comment.objects.filter(task__board=board, id__in=upserted('comment')).select_related('author').order_by('id')
+        members = board.members.filter(id__in=upserted('member')).order_by('id')
+        payload = {
+            'cursor': next_cursor(changes, since),
+            'board': {'id': board.id, 'title': board.title, 'owner_id': board.owner_id} if ('board', board.id) in latest else None,
+            'tasks': SyncTaskSerializer(tasks, many=True).data,
+            'comments': SyncCommentSerializer(comments, many=True).data,
+            'members': MemberSerializer(members, many=True).data,
+        }
+
+        found = {
+            'task': {task['id'] for task in payload['tasks']},
+            'comment': {comment['id'] for comment in payload['comments']},
+            'member': {member['id'] for member in payload['members']},
+        }
+        payload['deleted'] = {
+            f'{kind}s': sorted(oid for (k, oid) in latest if k == kind and oid not in ids)
+            for kind, ids in found.items()
+        }
+        return Response(payload, status=status.HTTP_200_OK)
 
     def get_serializer_class(self):
         if self.request.method in ['PATCH', 'PUT']:
             return BoardUpdateSerializer
         return BoardDetailSerializer
 
+class BoardExportView(APIView):
+    """
+    Streams a board with its members, tasks and comments as NDJSON.
+    Access limited to board owner or members.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, board_id):
+        board = get_object_or_404(Board.objects.filter(id__in=accessible_board_ids(request.user)), pk=board_id)
+        lines = aexport_board(board) if isinstance(request._request, ASGIRequest) else export_board(board)
+        response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="board-{board.id}.ndjson"'
+        return response
+
+class BoardImportView(APIView):
+    """
+    Creates a new board owned by the current user from an NDJSON board export
+    sent as the request body. The body is read line by line, never as a whole.
+    Every user in the export must already exist (matched by email).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            board, stats = import_board(request._request, owner=request.user, missing_users='reject')
+        except BoardImportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'id': board.id, 'title': board.title, **stats}, status=status.HTTP_201_CREATED)
+
+def user_summary(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'fullname': f"{user.first_name} {user.last_name}".strip(),
+    }
+
 class EmailCheckView(APIView):
     """
     Checks if a user exists for the given email.
@@ -57,37 +194,153 @@ class EmailCheckView(APIView):
             return Response({'error': 'Email parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            user = User.objects.get(email=email)
+            user = users_by_email(email).get()
         except User.DoesNotExist:
             return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
-        
-        fullname = f"{user.first_name} {user.last_name}".strip()
 
-        return Response({
-            'id': user.id,
-            'email': user.email,
-            'fullname': fullname
-        }, status=status.HTTP_200_OK)
+        return Response(user_summary(user), status=status.HTTP_200_OK)
+
+class EmailCheckBatchView(APIView):
+    """
+    Checks many emails at once (`{"emails": [...]}`) with a single query.
+    Returns the matching users and the emails without a user.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        emails = request.data.get('emails')
+        if not isinstance(emails, list) or not all(isinstance(email, str) for email in emails):
+            return Response({'error': 'emails must be a list of strings.'}, status=status.HTTP_400_BAD_REQUEST)
+        max_emails = getattr(settings, 'KANBAN_EMAIL_CHECK_MAX_EMAILS', 200)
+        if len(emails) > max_emails:
+            return Response({'error': f'At most {max_emails} emails per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        users = users_by_emails(emails).only('id', 'email', 'first_name', 'last_name')
+        by_email = {normalize_email(user.email): user for user in users}
+        found, missing = [], []
+        for email in dict.fromkeys(normalize_email(email) for email in emails):
+            if email in by_email:
+                found.append(user_summary(by_email[email]))
+            elif email:
+                missing.append(email)
+        return Response({'found': found, 'missing': missing}, status=status.HTTP_200_OK)
+
+class EmailSearchView(APIView):
+    """
+    Email autocomplete: users whose email starts with `?q=` (at least
+    KANBAN_EMAIL_SEARCH_MIN_LENGTH characters). Results are cached briefly.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        prefix = normalize_email(request.query_params.get('q'))
+        min_length = getattr(settings, 'KANBAN_EMAIL_SEARCH_MIN_LENGTH', 3)
+        if len(prefix) < min_length:
+            return Response({'error': f'q must have at least {min_length} characters.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = getattr(settings, 'KANBAN_EMAIL_SEARCH_LIMIT', 10)
+        key = f'kanban:email-search:{limit}:{prefix}'
+        results = cache.get(key)
+        if results is None:
+            users = users_by_email_prefix(prefix).only('id', 'email', 'first_name', 'last_name')[:limit]
+            results = [user_summary(user) for user in users]
+            cache.set(key, results, getattr(settings, 'KANBAN_EMAIL_SEARCH_CACHE_TIMEOUT', 30))
+        return Response(results, status=status.HTTP_200_OK)
+
+class SearchView(APIView):
+    """
+    Full-text search over the tasks and comments of the user's boards.
+    `?q=` words (the last one matches as a prefix), optional `?kind=task|comment`,
+    `?limit=` (max KANBAN_SEARCH_MAX_LIMIT) and `?offset=`. Best matches first.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        terms = search_terms(request.query_params.get('q'))
+        if not terms:
+            return Response({'error': 'q must contain at least one word.'}, status=status.HTTP_400_BAD_REQUEST)
+        kind = request.query_params.get('kind') or None
+        if kind is not None and kind not in KINDS:
+            return Response({'error': f"kind must be one of {', '.join(KINDS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', getattr(settings, 'KANBAN_SEARCH_LIMIT', 20)))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, getattr(settings, 'KANBAN_SEARCH_MAX_LIMIT', 100)))
+        offset = max(0, offset)
+
+        results = get_search_backend().search(
+            terms, accessible_board_ids(request.user), kind=kind, limit=limit, offset=offset
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
 
-class TasksAssignedToMeView(ListAPIView):
+class TasksAssignedToMeView(StreamingListMixin, ListAPIView):
     """
     Returns all tasks assigned to the current user.
+    Paginated, or streamed in full with `?stream=1`.
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
 
     def get_queryset(self):
-        return Task.objects.filter(assignee=self.request.user)
+        return Task.objects.filter(assignee=self.request.user).select_related('assignee', 'reviewer')
 
-class TasksReviewingView(ListAPIView):
+class TasksReviewingView(StreamingListMixin, ListAPIView):
     """
     Returns all tasks where the current user is reviewer.
+    Paginated, or streamed in full with `?stream=1`.
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        return Task.objects.filter(reviewer=self.request.user).select_related('assignee', 'reviewer')
+
+class TaskQueryView(ListAPIView):
+    """
+    Tasks across all boards of the user, filtered by board, status, priority,
+    assignee, reviewer and due date, sorted by `?ordering=`.
+    Returns the page plus the total and facet counts per status and priority.
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TaskQueryPagination
+
+    def get_queryset(self):
+        return Task.objects.all()
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.task_query = TaskQuery(request.query_params, request.user, accessible_board_ids(request.user))
+        except InvalidQuery as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        facets = self.task_query.facets(self.get_queryset())
+        queryset = self.task_query.apply(self.get_queryset().select_related('assignee', 'reviewer'))
+        page = self.paginate_queryset(queryset)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data = {'count': facets.pop('total'), 'facets': facets, **response.data}
+        return response
+
+class ReminderListView(ListAPIView):
+    """
+    The current user's due-date reminders for today (or `?day=YYYY-MM-DD`),
+    as written by the `due-reminders` background job, on boards the user
+    can still access.
+    """
+    serializer_class = ReminderSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ReminderCursorPagination
 
     def get_queryset(self):
-        return Task.objects.filter(reviewer=self.request.user)
+        try:
+            day = date.fromisoformat(self.request.query_params['day'])
+        except (KeyError, ValueError):
+            day = timezone.localdate()
+        board_ids = accessible_board_ids(self.request.user)
+        return Reminder.objects.filter(user=self.request.user, day=day, task__board_id__in=board_ids).select_related('task')
 
 class TaskCreateView(CreateAPIView):
     """
@@ -106,20 +359,34 @@ class TaskCreateView(CreateAPIView):
         headers = self.get_success_headers(out)
         return Response(out, status=status.HTTP_201_CREATED, headers=headers)
 
-class TaskDetailView(RetrieveUpdateDestroyAPIView):
+class TaskDetailView(BoardVersionETagMixin, RetrieveUpdateDestroyAPIView):
     """
     Update or delete a task.
     Only board owner can delete.
+    Supports conditional requests through the version of the task's board.
     """
     serializer_class = TaskUpdateSerializer
     permission_classes = [IsAuthenticated, IsTaskBoardMember]
     lookup_url_kwarg = "task_id"
+    etag_prefix = "task-"
+
+    def get_current_version(self):
+        board_ids = accessible_board_ids(self.request.user)
+        return (
+            Task.objects.filter(pk=self.kwargs["task_id"], board_id__in=board_ids)
+            .values_list('board__version', flat=True)
+            .first()
+        )
+
+    def get_object_version(self, obj):
+        return obj.board.version
+
+    def get_object_board_id(self, obj):
+        return obj.board_id
 
     def get_queryset(self):
-        user = self.request.user
-        return Task.objects.filter(
-            Q(board__members=user) | Q(board__owner=user)
-        ).distinct()
+        board_ids = accessible_board_ids(self.request.user)
+        return Task.objects.filter(board_id__in=board_ids).select_related('board', 'assignee', 'reviewer')
 
     def get_serializer_class(self):
         if self.request.method in ['PATCH', 'PUT']:
@@ -131,30 +398,70 @@ class TaskDetailView(RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         in_ser = self.get_serializer(instance, data=request.data, partial=partial, context={'request': request})
         in_ser.is_valid(raise_exception=True)
-        task = in_ser.save()
+        self.perform_update(in_ser)
 
-        out = TaskSerializer(task).data
+        out = TaskSerializer(in_ser.instance).data
         out.pop("board", None)
         out.pop("comments_count", None)
         return Response(out, status=status.HTTP_200_OK)
 
+class TaskBulkView(APIView):
+    """
+    Creates, updates and deletes many tasks in one request and transaction.
+    Returns the resulting tasks per item in request order.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = TaskBulkSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+
+        tasks = (
+            Task.objects.filter(id__in=result['created'] + result['updated'])
+            .select_related('assignee', 'reviewer')
+            .in_bulk()
+        )
+        data = {
+            'created': TaskSerializer([tasks[tid] for tid in result['created']], many=True).data,
+            'updated': TaskSerializer([tasks[tid] for tid in result['updated']], many=True).data,
+            'deleted': result['deleted'],
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+class CommentBulkView(APIView):
+    """
+    Adds many comments to tasks of the user's boards in one request.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CommentBulkSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        comments = serializer.save()
+        return Response(CommentSerializer(comments, many=True).data, status=status.HTTP_201_CREATED)
+
 class TaskCommentsView(APIView):
     """
-    Lists or adds comments for a given task.
+    Lists or adds comments for a given task (`?stream=1` streams all comments).
     Access only for board members and owner.
     Delete a comment only if the current user is the author.
     """
     permission_classes = [IsAuthenticated, IsTaskBoardMember]
 
     def get(self, request, task_id):
-        task = get_object_or_404(Task, id=task_id)
+        task = get_object_or_404(Task.objects.select_related('board'), id=task_id)
         self.check_object_permissions(request, task)
-        comments = task.comments.all().order_by('created_at')
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = CommentCursorPagination()
+        comments = task.comments.select_related('author')
+        if wants_stream(request):
+            return streaming_json_response(request, comments.order_by(*paginator.ordering), CommentSerializer)
+        page = paginator.paginate_queryset(comments, request, view=self)
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request, task_id):
-        task = get_object_or_404(Task, id=task_id)
+        task = get_object_or_404(Task.objects.select_related('board'), id=task_id)
         self.check_object_permissions(request, task)
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid():
@@ -163,7 +470,7 @@ class TaskCommentsView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, task_id, comment_id=None):
-        comment = get_object_or_404(Comment, id=comment_id, task__id=task_id)
+        comment = get_object_or_404(Comment.objects.select_related('task__board'), id=comment_id, task__id=task_id)
         self.check_object_permissions(request, comment.task)
         IsCommentAuthor().has_object_permission(request, self, comment) or self.permission_denied(request, message="Not the author.")
         comment.delete()
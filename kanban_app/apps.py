@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class KanbanAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kanban_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import reminders  # noqa: F401  (registers the background jobs)
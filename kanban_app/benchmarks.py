@@ -0,0 +1,237 @@
+"""
+Benchmark suite over every URL of `auth_app.api.urls` and `kanban_app.api.urls`.
+Each scenario sends the same request repeatedly through the WSGI application
+(the change feed through ASGI) and records latency percentiles, SQL query
+count and peak Python memory. Write scenarios create their own objects and
+remove them again, so runs can be repeated on the same dataset.
+"""
+import itertools
+import json
+import re
+import statistics
+import tracemalloc
+from importlib import import_module
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from core.benchmark import asgi_first_chunk, wsgi_request
+from kanban_app.models import Board, Comment, Task
+from kanban_app.transfer import export_board
+
+URL_MODULES = ['auth_app.api.urls', 'kanban_app.api.urls']
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+def route_names():
+    """
+    Names of all benchmarked routes: the URL name, or the route for unnamed URLs.
+    """
+    return {
+        pattern.name or str(pattern.pattern)
+        for module in URL_MODULES
+        for pattern in import_module(module).urlpatterns
+    }
+
+class Context:
+    """
+    The acting user, a board and task to read from, and a counter for unique names.
+    """
+    def __init__(self, user, password):
+        self.user = user
+        self.password = password
+        self.token = Token.objects.get_or_create(user=user)[0].key
+        self.board = (
+            Board.objects.filter(members=user).annotate(tasks_total=Count('tasks')).order_by('-tasks_total', 'id').first()
+        )
+        if self.board is None:
+            raise ValueError(f"User {user.username!r} is not a member of any board.")
+        self.task = self.board.tasks.annotate(comments_total=Count('comments')).order_by('-comments_total', 'id').first()
+        if self.task is None:
+            self.task = Task.objects.create(board=self.board, title='Benchmark task', status='to-do', priority='medium')
+        self.counter = itertools.count()
+
+    @property
+    def headers(self):
+        return {'Authorization': f'Token {self.token}', 'Content-Type': 'application/json'}
+
+    def scratch_board(self):
+        board = Board.objects.create(title='Benchmark scratch', owner=self.user)
+        board.members.add(self.user)
+        return board
+
+    def scratch_task(self):
+        return Task.objects.create(board=self.board, title='Benchmark scratch', status='to-do', priority='low')
+
+def _delete(model, **filters):
+    return lambda content: model.objects.filter(**filters).delete()
+
+def _delete_created(model, key='id'):
+    return lambda content: model.objects.filter(pk=json.loads(content)[key]).delete()
+
+def _board_detail(ctx, method):
+    if method == 'GET':
+        return reverse('board-detail', args=[ctx.board.id]), None, None
+    board = ctx.scratch_board()
+    body = {'title': 'Benchmark renamed'} if method == 'PATCH' else None
+    return reverse('board-detail', args=[board.id]), body, _delete(Board, pk=board.id)
+
+def _task_detail(ctx, method):
+    if method == 'GET':
+        return reverse('task-detail', args=[ctx.task.id]), None, None
+    task = ctx.scratch_task()
+    body = {'title': 'Benchmark renamed'} if method == 'PATCH' else None
+    return reverse('task-detail', args=[task.id]), body, _delete(Task, pk=task.id)
+
+def _comment_delete(ctx):
+    comment = Comment.objects.create(task=ctx.task, author=ctx.user, content='Benchmark scratch')
+    return f'/api/tasks/{ctx.task.id}/comments/{comment.id}/', None, _delete(Comment, pk=comment.id)
+
+def _task_bulk(ctx):
+    items = [{'board': ctx.board.id, 'title': f'Benchmark bulk {i}', 'status': 'to-do', 'priority': 'low'} for i in range(20)]
+    cleanup = lambda content: Task.objects.filter(id__in=[task['id'] for task in json.loads(content)['created']]).delete()
+    return reverse('task-bulk'), {'create': items}, cleanup
+
+def _comment_bulk(ctx):
+    items = [{'task': ctx.task.id, 'content': f'Benchmark bulk {i}'} for i in range(20)]
+    cleanup = lambda content: Comment.objects.filter(id__in=[comment['id'] for comment in json.loads(content)]).delete()
+    return reverse('comment-bulk'), {'comments': items}, cleanup
+
+def _board_import(ctx):
+    board = ctx.scratch_board()
+    task = Task.objects.create(board=board, title='Benchmark scratch', status='to-do', priority='low', assignee=ctx.user)
+    Comment.objects.bulk_create(Comment(task=task, author=ctx.user, content=f'Benchmark {i}') for i in range(50))
+    body = b''.join(export_board(board))
+    board.delete()
+    return reverse('board-import'), body, _delete_created(Board)
+
+def _registration(ctx):
+    email = f'benchmark-registration-{next(ctx.counter)}@example.com'
+    body = {'fullname': email, 'email': email, 'password': 'benchmark-pass', 'repeated_password': 'benchmark-pass'}
+    return reverse('registration'), body, _delete(User, email=email)
+
+# (route, method, prepare) where prepare(ctx) returns (path, body, cleanup(content));
+# the body is sent as JSON unless it is already bytes.
+# The auth scenarios run last, since logging in may rotate the actor's token.
+SCENARIOS = [
+    ('board-list', 'GET', lambda ctx: (reverse('board-list'), None, None)),
+    ('board-list', 'POST', lambda ctx: (reverse('board-list'), {'title': 'Benchmark', 'members': []}, _delete_created(Board))),
+    ('board-detail', 'GET', lambda ctx: _board_detail(ctx, 'GET')),
+    ('board-detail', 'PATCH', lambda ctx: _board_detail(ctx, 'PATCH')),
+    ('board-detail', 'DELETE', lambda ctx: _board_detail(ctx, 'DELETE')),
+    ('board-export', 'GET', lambda ctx: (reverse('board-export', args=[ctx.board.id]), None, None)),
+    ('board-import', 'POST', _board_import),
+    ('board-events', 'GET', lambda ctx: (reverse('board-events', args=[ctx.board.id]), None, None)),
+    ('email-check', 'GET', lambda ctx: (f"{reverse('email-check')}?email={ctx.user.email}", None, None)),
+    ('email-check-batch', 'POST', lambda ctx: (
+        reverse('email-check-batch'), {'emails': [f'{ctx.user.email}', 'nobody@example.com']}, None
+    )),
+    # A new prefix per request, so the uncached lookup is measured.
+    ('email-search', 'GET', lambda ctx: (
+        f"{reverse('email-search')}?q={ctx.user.email.split('@')[0]}{next(ctx.counter)}", None, None
+    )),
+    ('search', 'GET', lambda ctx: (f"{reverse('search')}?q={ctx.task.title.split()[-1]}", None, None)),
+    ('tasks-assigned-to-me', 'GET', lambda ctx: (reverse('tasks-assigned-to-me'), None, None)),
+    ('tasks-reviewing', 'GET', lambda ctx: (reverse('tasks-reviewing'), None, None)),
+    ('task-query', 'GET', lambda ctx: (
+        f"{reverse('task-query')}?status=to-do,in-progress&due=this-week&ordering=-priority", None, None
+    )),
+    ('task-create', 'POST', lambda ctx: (
+        reverse('task-create'), {'board': ctx.board.id, 'title': 'Benchmark', 'status': 'to-do', 'priority': 'low'},
+        _delete_created(Task),
+    )),
+    ('task-bulk', 'POST', _task_bulk),
+    ('task-detail', 'GET', lambda ctx: _task_detail(ctx, 'GET')),
+    ('task-detail', 'PATCH', lambda ctx: _task_detail(ctx, 'PATCH')),
+    ('task-detail', 'DELETE', lambda ctx: _task_detail(ctx, 'DELETE')),
+    ('tasks/<int:task_id>/comments/', 'GET', lambda ctx: (f'/api/tasks/{ctx.task.id}/comments/', None, None)),
+    ('tasks/<int:task_id>/comments/', 'POST', lambda ctx: (
+        f'/api/tasks/{ctx.task.id}/comments/', {'content': 'Benchmark'}, _delete_created(Comment),
+    )),
+    ('tasks/<int:task_id>/comments/<int:comment_id>/', 'DELETE', _comment_delete),
+    ('comment-bulk', 'POST', _comment_bulk),
+    ('reminder-list', 'GET', lambda ctx: (reverse('reminder-list'), None, None)),
+    ('registration', 'POST', _registration),
+    ('login', 'POST', lambda ctx: (reverse('login'), {'email': ctx.user.email, 'password': ctx.password}, None)),
+]
+
+STREAMING = {'board-events'}
+
+def _send(ctx, route, method, prepare):
+    path, body, cleanup = prepare(ctx)
+    if route in STREAMING:
+        from core.asgi import application
+        status, headers, elapsed = asgi_first_chunk(application, path, {'Authorization': f'Token {ctx.token}'})
+        content = b''
+    else:
+        from core.wsgi import application
+        data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b''
+        status, headers, content, elapsed = wsgi_request(application, method, path, ctx.headers, data)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} answered {status}: {content[:200]!r}")
+    if cleanup is not None:
+        cleanup(content)
+    if route == 'login':
+        ctx.token = json.loads(content)['token']
+    match = _QUERIES.search(headers.get('Server-Timing', ''))
+    return elapsed, int(match.group(1)) if match else None
+
+def _percentile(sorted_values, percent):
+    index = max(0, min(len(sorted_values) - 1, round(len(sorted_values) * percent / 100) - 1))
+    return sorted_values[index]
+
+def run_suite(user, password, iterations=30, warmup=2, only=None):
+    """
+    Runs every scenario (or those whose key contains `only`) and returns
+    `{"<route> <METHOD>": {"p50_ms", "p95_ms", "p99_ms", "max_ms", "queries", "peak_kb"}}`.
+    """
+    ctx = Context(user, password)
+    results = {}
+    for route, method, prepare in SCENARIOS:
+        key = f'{route} {method}'
+        if only and only not in key:
+            continue
+        for _ in range(warmup):
+            _send(ctx, route, method, prepare)
+        latencies, queries = [], []
+        for _ in range(iterations):
+            elapsed, query_count = _send(ctx, route, method, prepare)
+            latencies.append(elapsed * 1000)
+            queries.append(query_count)
+        tracemalloc.start()
+        try:
+            _send(ctx, route, method, prepare)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        latencies.sort()
+        results[key] = {
+            'requests': iterations,
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2),
+            'queries': max(queries) if None not in queries else None,
+            'peak_kb': round(peak / 1024, 1),
+        }
+    return results
+
+def compare(results, baseline, tolerance=0.25, min_delta_ms=2.0):
+    """
+    Lists regressions against a baseline: more queries than before, or p95
+    latency / peak memory above the baseline by more than `tolerance` (latency
+    also by more than `min_delta_ms`, to ignore noise on very fast requests).
+    """
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        if base.get('queries') is not None and current['queries'] is not None and current['queries'] > base['queries']:
+            regressions.append(f"{key}: {current['queries']} queries (baseline {base['queries']})")
+        p95_limit = base['p95_ms'] * (1 + tolerance)
+        if current['p95_ms'] > p95_limit and current['p95_ms'] - base['p95_ms'] > min_delta_ms:
+            regressions.append(f"{key}: p95 {current['p95_ms']} ms (baseline {base['p95_ms']} ms)")
+        if current['peak_kb'] > base['peak_kb'] * (1 + tolerance):
+            regressions.append(f"{key}: peak {current['peak_kb']} KiB (baseline {base['peak_kb']} KiB)")
+    return regressions
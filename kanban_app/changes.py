@@ -0,0 +1,95 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Subquery
+from django.utils import timezone
+from kanban_app.models import Board, BoardChange
+
+def record_changes(entries):
+    """
+    Appends `(board_id, kind, object_id, action)` entries to the change log.
+    """
+    rows = [
+        BoardChange(board_id=board_id, kind=kind, object_id=object_id, action=action)
+        for board_id, kind, object_id, action in entries
+        if board_id is not None
+    ]
+    if rows:
+        BoardChange.objects.bulk_create(rows)
+
+def record_change(board_id, kind, object_id, action='upsert'):
+    record_changes([(board_id, kind, object_id, action)])
+
+def latest_changes(changes):
+    """
+    Collapses change entries to the last action per (kind, object_id).
+    """
+    latest = {}
+    for change in changes:
+        latest[(change.kind, change.object_id)] = change.action
+    return latest
+
+def sync_overlap():
+    """
+    Seconds a change log entry must be old before a sync cursor may pass it.
+    Ids are allocated at insert but become visible at commit; SQLite
+    serializes writes, so ids commit in order and no overlap is needed. On
+    PostgreSQL or MySQL an entry with a lower id can commit after a higher
+    one, so cursors stay behind the last KANBAN_SYNC_OVERLAP seconds (default
+    10) and recent changes are sent again. A change is only missed if its
+    transaction stays open longer than that.
+    """
+    overlap = getattr(settings, 'KANBAN_SYNC_OVERLAP', None)
+    if overlap is None:
+        overlap = 0 if connection.vendor == 'sqlite' else 10
+    return overlap
+
+def settled_changes(queryset):
+    """
+    Entries older than the sync overlap, which a cursor may move past.
+    """
+    overlap = sync_overlap()
+    if overlap:
+        queryset = queryset.filter(created_at__lte=timezone.now() - timedelta(seconds=overlap))
+    return queryset
+
+def next_cursor(changes, since):
+    """
+    The cursor after `changes` (in id order): the last id before the first
+    unsettled entry, so nothing below the cursor can still appear later.
+    """
+    overlap = sync_overlap()
+    cutoff = timezone.now() - timedelta(seconds=overlap)
+    cursor = since
+    for change in changes:
+        if overlap and change.created_at > cutoff:
+            break
+        cursor = change.id
+    return cursor
+
+def compact_changes():
+    """
+    Drops entries superseded by a newer entry for the same object. Safe for
+    every client: whatever cursor it holds, the newer entry is still after it.
+    """
+    newest = (
+        BoardChange.objects.values('board_id', 'kind', 'object_id')
+        .annotate(newest_id=Max('id'))
+        .values('newest_id')
+    )
+    deleted, _ = BoardChange.objects.exclude(id__in=Subquery(newest)).delete()
+    return deleted
+
+def expire_changes(retention_days=None):
+    """
+    Drops entries older than the retention period. Each affected board's
+    `sync_floor` is raised first, so clients with older cursors must reload.
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, 'KANBAN_SYNC_RETENTION_DAYS', 30)
+    expired = BoardChange.objects.filter(created_at__lt=timezone.now() - timedelta(days=retention_days))
+    floors = expired.values('board_id').annotate(floor=Max('id')).values_list('board_id', 'floor')
+    for board_id, floor in floors:
+        Board.objects.filter(pk=board_id, sync_floor__lt=floor).update(sync_floor=floor)
+    deleted, _ = expired.delete()
+    return deleted
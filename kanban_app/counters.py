@@ -0,0 +1,83 @@
+from collections import Counter, defaultdict
+from django.db.models import Case, F, IntegerField, Value, When
+from kanban_app.models import Board, Comment, Task, count_subquery
+
+BOARD_TASK_COUNTERS = ('ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count')
+
+def _apply_deltas(model, deltas):
+    """
+    Adds `{pk: {field: delta}}` to the stored counters with a single
+    UPDATE ... SET field = field + CASE pk WHEN ... END statement.
+    """
+    deltas = {pk: changes for pk, changes in deltas.items() if any(changes.values())}
+    if not deltas:
+        return
+    fields = {field for changes in deltas.values() for field, delta in changes.items() if delta}
+    updates = {}
+    for field in fields:
+        whens = [When(pk=pk, then=Value(changes[field])) for pk, changes in deltas.items() if changes.get(field)]
+        updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+    model.objects.filter(pk__in=deltas.keys()).update(**updates)
+
+def task_counter_deltas(status, priority, sign=1):
+    """
+    Contribution of one task with the given status/priority to its board's counters.
+    """
+    return {
+        'ticket_count': sign,
+        'tasks_to_do_count': sign if status == 'to-do' else 0,
+        'tasks_high_prio_count': sign if priority == 'high' else 0,
+    }
+
+def apply_task_changes(rows):
+    """
+    Updates board task counters for `(board_id, status, priority, sign)` rows,
+    where sign is +1 for an added task state and -1 for a removed one.
+    """
+    deltas = defaultdict(Counter)
+    for board_id, status, priority, sign in rows:
+        deltas[board_id].update(task_counter_deltas(status, priority, sign))
+    _apply_deltas(Board, deltas)
+
+def apply_comment_changes(task_deltas):
+    """
+    Updates task comment counters from a `{task_id: delta}` mapping.
+    """
+    _apply_deltas(Task, {task_id: {'comments_count': delta} for task_id, delta in task_deltas.items()})
+
+def refresh_member_counts(board_ids):
+    """
+    Recounts members of the given boards. Membership changes do not always
+    tell which rows really changed, so these are recounted instead of adjusted.
+    """
+    Board.objects.filter(pk__in=board_ids).update(
+        member_count=count_subquery(Board.members.through.objects.all(), 'board')
+    )
+
+def find_drift():
+    """
+    Returns `(boards, tasks)`: rows whose stored counters differ from a fresh count.
+    """
+    board_fields = ('member_count', *BOARD_TASK_COUNTERS)
+    boards = [
+        board for board in Board.objects.with_actual_counts()
+        if any(getattr(board, field) != getattr(board, f'actual_{field}') for field in board_fields)
+    ]
+    tasks = [
+        task for task in Task.objects.with_actual_counts().only('id', 'comments_count')
+        if task.comments_count != task.actual_comments_count
+    ]
+    return boards, tasks
+
+def recompute_all():
+    """
+    Rewrites every stored counter from scratch.
+    """
+    tasks = Task.objects.all()
+    Board.objects.update(
+        member_count=count_subquery(Board.members.through.objects.all(), 'board'),
+        ticket_count=count_subquery(tasks, 'board'),
+        tasks_to_do_count=count_subquery(tasks.filter(status='to-do'), 'board'),
+        tasks_high_prio_count=count_subquery(tasks.filter(priority='high'), 'board'),
+    )
+    Task.objects.update(comments_count=count_subquery(Comment.objects.all(), 'task'))
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+class Subscription:
+    """
+    One listener on a board's change feed, bound to the event loop it was
+    created in. Events are delivered into a bounded queue; if the listener
+    falls behind, `overflowed` is set so it can ask the client to resync.
+    """
+    def __init__(self, board_id, loop, maxsize):
+        self.board_id = board_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class InProcessBroker:
+    """
+    Fans events out to the subscriptions of the current process.
+    Publishing is thread-safe (signals fire in worker threads); delivery
+    happens on each subscriber's own event loop.
+    """
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, board_id):
+        maxsize = getattr(settings, 'KANBAN_EVENT_QUEUE_SIZE', 1000)
+        subscription = Subscription(board_id, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subscriptions[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.board_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.board_id]
+
+    def publish(self, board_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(board_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop is gone; drop the subscription.
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, board_id):
+        with self._lock:
+            return len(self._subscriptions.get(board_id, ()))
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+def get_broker():
+    """
+    Returns the broker configured by `KANBAN_EVENT_BACKEND` (one instance per class path).
+    """
+    path = getattr(settings, 'KANBAN_EVENT_BACKEND', 'kanban_app.events.InProcessBroker')
+    with _brokers_lock:
+        if path not in _brokers:
+            _brokers[path] = import_string(path)()
+        return _brokers[path]
+
+def publish_event(board_id, event_type, **data):
+    """
+    Publishes a change event for the board once the current transaction commits.
+    """
+    if board_id is None:
+        return
+    event = {'type': event_type, 'board': board_id, **data}
+    transaction.on_commit(lambda: get_broker().publish(board_id, event))
@@ -0,0 +1,143 @@
+"""
+In-process background jobs on a database queue (the `Job` model), without an
+external broker. Jobs are plain functions registered by name; the `run_jobs`
+command claims due jobs one at a time, runs them and records status, timing
+and result. Daily jobs are enqueued with a per-day dedup key, so any number
+of workers (or reruns) schedule each of them once per day.
+"""
+import json
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from kanban_app.models import Job
+
+logger = logging.getLogger('kanmind.jobs')
+
+_registry = {}
+_daily = []
+
+def register(name, daily=False):
+    """
+    Registers the decorated function as job `name`. The job payload is passed
+    as keyword arguments and the return value is stored as the job result.
+    """
+    def decorator(func):
+        _registry[name] = func
+        if daily:
+            _daily.append(name)
+        return func
+    return decorator
+
+def enqueue(name, payload=None, run_at=None, dedup_key=None):
+    """
+    Queues a job and returns `(job, created)`. With a `dedup_key` an existing
+    job with the same key is returned instead of queueing a second one.
+    """
+    if name not in _registry:
+        raise ValueError(f"Unknown job {name!r}.")
+    fields = {'name': name, 'payload': payload or {}, 'run_at': run_at or timezone.now()}
+    if dedup_key is None:
+        return Job.objects.create(**fields), True
+    try:
+        with transaction.atomic():
+            return Job.objects.create(dedup_key=dedup_key, **fields), True
+    except IntegrityError:
+        return Job.objects.get(dedup_key=dedup_key), False
+
+def schedule_daily(day=None):
+    """
+    Enqueues every daily job for `day` (default today) unless already queued.
+    Returns the number of newly queued jobs.
+    """
+    day = (day or timezone.localdate()).isoformat()
+    return sum(enqueue(name, {'day': day}, dedup_key=f'{name}:{day}')[1] for name in _daily)
+
+def requeue_stale():
+    """
+    Puts jobs back in the queue whose worker died: running for longer than KANBAN_JOB_TIMEOUT.
+    """
+    timeout = timedelta(seconds=getattr(settings, 'KANBAN_JOB_TIMEOUT', 3600))
+    return Job.objects.filter(status=Job.RUNNING, started_at__lt=timezone.now() - timeout).update(status=Job.QUEUED)
+
+def claim():
+    """
+    Takes the next due job. The conditional UPDATE makes the claim atomic, so
+    concurrent workers never run the same job.
+    """
+    while True:
+        now = timezone.now()
+        job = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'id').first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, started_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+def run_job(job):
+    """
+    Runs a claimed job and records the outcome. Failures are retried with a
+    growing delay until KANBAN_JOB_MAX_ATTEMPTS is reached.
+    """
+    started = time.perf_counter()
+    try:
+        job.result = _registry[job.name](**job.payload)
+        job.status, job.error = Job.DONE, ''
+    except Exception as exc:
+        logger.exception("Job %s #%s failed", job.name, job.pk)
+        job.error = f'{type(exc).__name__}: {exc}'
+        if job.attempts < getattr(settings, 'KANBAN_JOB_MAX_ATTEMPTS', 3):
+            delay = getattr(settings, 'KANBAN_JOB_RETRY_DELAY', 60) * 2 ** (job.attempts - 1)
+            job.status, job.run_at = Job.QUEUED, timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = Job.FAILED
+    job.duration_ms = (time.perf_counter() - started) * 1000
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'run_at', 'duration_ms', 'finished_at'])
+    logger.info(json.dumps({
+        'event': 'job',
+        'name': job.name,
+        'id': job.pk,
+        'status': job.status,
+        'attempts': job.attempts,
+        'duration_ms': round(job.duration_ms, 2),
+    }))
+    return job
+
+def run_pending(limit=None):
+    """
+    Schedules the daily jobs, then runs due jobs until none is left (or
+    `limit` jobs ran). Returns the jobs that ran.
+    """
+    requeue_stale()
+    schedule_daily()
+    ran = []
+    while limit is None or len(ran) < limit:
+        job = claim()
+        if job is None:
+            break
+        ran.append(run_job(job))
+    return ran
+
+def job_stats():
+    """
+    Per job name: jobs per status, average and maximum duration of successful
+    runs and when a run last finished.
+    """
+    return list(
+        Job.objects.values('name').annotate(
+            queued=Count('id', filter=Q(status=Job.QUEUED)),
+            running=Count('id', filter=Q(status=Job.RUNNING)),
+            done=Count('id', filter=Q(status=Job.DONE)),
+            failed=Count('id', filter=Q(status=Job.FAILED)),
+            avg_ms=Avg('duration_ms', filter=Q(status=Job.DONE)),
+            max_ms=Max('duration_ms', filter=Q(status=Job.DONE)),
+            last_finished_at=Max('finished_at'),
+        ).order_by('name')
+    )
@@ -0,0 +1,39 @@
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+from core.benchmark import run_asgi, run_wsgi, summarize
+
+class Command(BaseCommand):
+    help = (
+        "Compares throughput of the WSGI and ASGI entry points on read endpoints by "
+        "sending concurrent requests in-process. Run it with KANBAN_ASYNC_VIEWS off "
+        "and on to compare the sync and async views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username the requests authenticate as.")
+        parser.add_argument('--path', action='append', dest='paths', help="Path to request (repeatable). Defaults to /api/boards/.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per entry point and path.")
+        parser.add_argument('--concurrency', type=int, default=20, help="Requests in flight at the same time.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']!r} does not exist.")
+        token, _ = Token.objects.get_or_create(user=user)
+        headers = {'Authorization': f'Token {token.key}'}
+
+        from core.asgi import application as asgi_application
+        from core.wsgi import application as wsgi_application
+
+        self.stdout.write(f"KANBAN_ASYNC_VIEWS={getattr(settings, 'KANBAN_ASYNC_VIEWS', False)}, "
+                          f"{options['requests']} requests, concurrency {options['concurrency']}")
+        for path in options['paths'] or ['/api/boards/']:
+            requests = [('GET', path, headers, b'')] * options['requests']
+            for name, run, application in (('wsgi', run_wsgi, wsgi_application), ('asgi', run_asgi, asgi_application)):
+                started = time.perf_counter()
+                results = run(application, requests, options['concurrency'])
+                self.stdout.write(f"{name} {path}: {summarize(results, time.perf_counter() - started)}")
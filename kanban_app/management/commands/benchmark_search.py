@@ -0,0 +1,57 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from kanban_app.access import accessible_board_ids
+from kanban_app.models import Comment, Task
+from kanban_app.synthetic import VOCABULARY
+
+BACKENDS = ['kanban_app.search.SQLiteSearchBackend', 'kanban_app.search.DatabaseSearchBackend']
+
+# Query shapes over the synthetic vocabulary, whose words are Zipf-distributed
+# in rank order: very common, rare, two words, and a prefix as typed.
+QUERIES = {
+    'common': [[word] for word in VOCABULARY[:5]],
+    'rare': [[word] for word in VOCABULARY[-5:]],
+    'two words': [[VOCABULARY[i], VOCABULARY[i + 10]] for i in range(5)],
+    'prefix': [[word[:3]] for word in VOCABULARY[20:25]],
+}
+
+class Command(BaseCommand):
+    help = (
+        "Measures search latency per backend for the boards of one user. Generate a "
+        "large dataset first, e.g. `generate_data --tasks 100000 --comments 1000000`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username whose boards are searched.")
+        parser.add_argument('--backend', action='append', dest='backends', help="Backend class path (repeatable). Defaults to FTS5 and the ORM fallback.")
+        parser.add_argument('--iterations', type=int, default=20, help="Searches per query shape and backend.")
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']!r} does not exist.")
+        board_ids = accessible_board_ids(user)
+        self.stdout.write(
+            f"{Task.objects.count()} tasks, {Comment.objects.count()} comments; "
+            f"searching {len(board_ids)} board(s) of {user.username}"
+        )
+        for path in options['backends'] or BACKENDS:
+            backend = import_string(path)()
+            for shape, queries in QUERIES.items():
+                latencies, hits = [], 0
+                for i in range(options['iterations']):
+                    terms = queries[i % len(queries)]
+                    started = time.perf_counter()
+                    hits += len(backend.search(terms, board_ids, limit=options['limit']))
+                    latencies.append((time.perf_counter() - started) * 1000)
+                latencies.sort()
+                self.stdout.write(
+                    f"{path.rsplit('.', 1)[-1]} {shape}: p50 {statistics.median(latencies):.2f} ms, "
+                    f"p95 {latencies[max(0, round(len(latencies) * 0.95) - 1)]:.2f} ms, "
+                    f"{hits / len(latencies):.1f} hits per search"
+                )
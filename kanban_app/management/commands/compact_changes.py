@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from kanban_app.changes import compact_changes, expire_changes
+
+
+class Command(BaseCommand):
+    help = "Compacts the board change log and drops entries past the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=None,
+            help="Override KANBAN_SYNC_RETENTION_DAYS.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            compacted = compact_changes()
+            expired = expire_changes(options['retention_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {compacted} superseded and {expired} expired change log entries."
+        ))
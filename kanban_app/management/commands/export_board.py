@@ -0,0 +1,28 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from kanban_app.models import Board
+from kanban_app.transfer import export_board
+
+
+class Command(BaseCommand):
+    help = "Writes a board with its members, tasks and comments as NDJSON (see import_board)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_id', type=int)
+        parser.add_argument('--output', '-o', default='-', help="File to write, '-' for stdout (default).")
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.get(pk=options['board_id'])
+        except Board.DoesNotExist:
+            raise CommandError(f"Board {options['board_id']} does not exist.")
+        if options['output'] == '-':
+            self.write(board, sys.stdout.buffer)
+            return
+        with open(options['output'], 'wb') as output:
+            self.write(board, output)
+        self.stderr.write(self.style.SUCCESS(f"Board {board.id} exported to {options['output']}."))
+
+    def write(self, board, output):
+        for line in export_board(board):
+            output.write(line)
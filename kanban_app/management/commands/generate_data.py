@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from kanban_app.synthetic import PASSWORD, generate
+
+
+class Command(BaseCommand):
+    help = "Generates a synthetic dataset (users, boards, memberships, tasks, comments) with skewed distributions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--boards', type=int, default=100)
+        parser.add_argument('--members-per-board', type=int, default=5, help="Average board size; sizes are long-tailed.")
+        parser.add_argument('--tasks', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent for hot boards, tasks and power users (0 = uniform).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same dataset.")
+        parser.add_argument('--prefix', default='synthetic-', help="Username/email prefix of the generated users.")
+        parser.add_argument('--password', default=PASSWORD, help="Password of every generated user.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("At least one user is needed.")
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Users starting with {options['prefix']!r} already exist; choose another --prefix.")
+
+        generate(
+            users=options['users'],
+            boards=options['boards'],
+            members_per_board=options['members_per_board'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            skew=options['skew'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            password=options['password'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['users']} users, {options['boards']} boards, {options['tasks']} tasks "
+            f"and {options['comments']} comments (prefix {options['prefix']!r}, seed {options['seed']})."
+        ))
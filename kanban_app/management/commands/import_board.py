@@ -0,0 +1,39 @@
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from kanban_app.transfer import BoardImportError, import_board
+
+
+class Command(BaseCommand):
+    help = "Creates a new board from an NDJSON board export (see export_board)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Export file to read, '-' for stdin.")
+        parser.add_argument('--owner', help="Username of the new board's owner. Defaults to the owner in the export.")
+        parser.add_argument(
+            '--missing-users',
+            choices=['create', 'reject'],
+            default='create',
+            help="Users not found by email are created inactive and without password (default), or fail the import.",
+        )
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            try:
+                owner = get_user_model().objects.get(username=options['owner'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['owner']!r} does not exist.")
+        try:
+            if options['path'] == '-':
+                board, stats = import_board(sys.stdin.buffer, owner=owner, missing_users=options['missing_users'])
+            else:
+                with open(options['path'], 'rb') as lines:
+                    board, stats = import_board(lines, owner=owner, missing_users=options['missing_users'])
+        except BoardImportError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported board {board.id} ({board.title!r}): {stats['members']} members, "
+            f"{stats.get('tasks', 0)} tasks, {stats.get('comments', 0)} comments, "
+            f"{stats.get('users_created', 0)} users created."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from kanban_app.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index from the tasks and comments tables."
+
+    def handle(self, *args, **options):
+        rows = get_search_backend().rebuild()
+        if rows is None:
+            self.stdout.write("The configured search backend keeps no index; nothing to rebuild.")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt with {rows} rows."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from kanban_app.counters import BOARD_TASK_COUNTERS, find_drift, recompute_all
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized board and task counters and reports any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report drift, do not rewrite counters. Exits with status 1 if drift is found.",
+        )
+
+    def handle(self, *args, **options):
+        boards, tasks = find_drift()
+        for board in boards:
+            changes = ', '.join(
+                f"{field} {getattr(board, field)} -> {getattr(board, f'actual_{field}')}"
+                for field in ('member_count', *BOARD_TASK_COUNTERS)
+                if getattr(board, field) != getattr(board, f'actual_{field}')
+            )
+            self.stdout.write(f"Board {board.pk}: {changes}")
+        for task in tasks:
+            self.stdout.write(f"Task {task.pk}: comments_count {task.comments_count} -> {task.actual_comments_count}")
+        summary = f"Drift found on {len(boards)} board(s) and {len(tasks)} task(s)."
+
+        if options['check']:
+            if boards or tasks:
+                raise CommandError(summary, returncode=1)
+            self.stdout.write(summary)
+            return
+        self.stdout.write(summary)
+
+        with transaction.atomic():
+            recompute_all()
+        self.stdout.write(self.style.SUCCESS("Counters recomputed."))
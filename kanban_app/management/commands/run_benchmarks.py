@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from kanban_app.benchmarks import SCENARIOS, compare, route_names, run_suite
+from kanban_app.synthetic import PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every API URL against the current database (see generate_data), "
+        "writes latency percentiles, query counts and peak memory to JSON and fails "
+        "if results regress against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username to act as. Defaults to the user in the most boards.")
+        parser.add_argument('--password', default=PASSWORD, help="Password of that user (for the login scenario).")
+        parser.add_argument('--iterations', type=int, default=30, help="Measured requests per scenario.")
+        parser.add_argument('--only', help="Only run scenarios whose '<route> <METHOD>' contains this text.")
+        parser.add_argument('--output', default='benchmark-results.json', help="Where to write the results.")
+        parser.add_argument('--baseline', help="Baseline JSON to compare against; regressions exit with status 1.")
+        parser.add_argument('--update-baseline', action='store_true', help="Write the results to --baseline instead of comparing.")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative increase of p95 latency and peak memory.")
+
+    def handle(self, *args, **options):
+        missing = route_names() - {route for route, _, _ in SCENARIOS}
+        if missing:
+            raise CommandError(f"No benchmark scenario for: {', '.join(sorted(missing))}")
+
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.annotate(boards_total=Count('boards')).order_by('-boards_total', 'id').first()
+        if user is None:
+            raise CommandError("No user to benchmark with; run generate_data first or pass --user.")
+
+        try:
+            results = run_suite(user, options['password'], iterations=options['iterations'], only=options['only'])
+        except (ValueError, RuntimeError) as error:
+            raise CommandError(str(error))
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'user': user.username,
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        for key, result in results.items():
+            self.stdout.write(
+                f"{key:<55} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                f"{result['queries']} queries  peak {result['peak_kb']} KiB"
+            )
+        self.stdout.write(f"Results written to {options['output']}.")
+
+        if not options['baseline']:
+            return
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            baseline_path.write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Baseline {baseline_path} updated."))
+            return
+        if not baseline_path.exists():
+            raise CommandError(f"Baseline {baseline_path} does not exist; create it with --update-baseline.")
+        regressions = compare(results, json.loads(baseline_path.read_text())['results'], tolerance=options['tolerance'])
+        for regression in regressions:
+            self.stderr.write(self.style.ERROR(f"REGRESSION {regression}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}."))
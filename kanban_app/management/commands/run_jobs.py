@@ -0,0 +1,40 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from kanban_app.jobs import enqueue, job_stats, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Background job worker: schedules the daily jobs (due-date reminders, change log "
+        "compaction) and runs due jobs from the database queue. Loops until interrupted "
+        "unless --once is given, so it can also run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the due jobs once and exit.")
+        parser.add_argument('--interval', type=float, default=30, help="Seconds between polls of the queue.")
+        parser.add_argument('--enqueue', metavar='NAME', help="Queue job NAME to run now (e.g. due-reminders), then work as usual.")
+        parser.add_argument('--stats', action='store_true', help="Print job counts and durations and exit.")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for row in job_stats():
+                avg_ms = f"{row['avg_ms']:.1f}" if row['avg_ms'] is not None else '-'
+                max_ms = f"{row['max_ms']:.1f}" if row['max_ms'] is not None else '-'
+                self.stdout.write(
+                    f"{row['name']}: {row['done']} done, {row['failed']} failed, {row['queued']} queued, "
+                    f"{row['running']} running; avg {avg_ms} ms, max {max_ms} ms"
+                )
+            return
+        if options['enqueue']:
+            try:
+                enqueue(options['enqueue'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        while True:
+            for job in run_pending():
+                self.stdout.write(f"{job.name} #{job.pk}: {job.status} in {job.duration_ms:.1f} ms {job.result or job.error}")
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,106 @@
+from django.db import migrations
+
+# Full-text index over task titles/descriptions and comment contents, kept in
+# sync by triggers so bulk_create, queryset updates and cascading deletes are
+# covered too. Rowids are `task.id * 2` and `comment.id * 2 + 1`, so every
+# trigger touches a single row by rowid. `scope` holds a `b<board_id>` token,
+# which lets a search be narrowed to the user's boards inside the index.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE kanban_search USING fts5(
+        title, body, scope,
+        kind UNINDEXED, object_id UNINDEXED, task_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_insert AFTER INSERT ON kanban_app_task BEGIN
+        INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+        VALUES (new.id * 2, new.title, new.description, 'b' || new.board_id, 'task', new.id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_update AFTER UPDATE OF title, description, board_id ON kanban_app_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.board_id IS NOT new.board_id
+    BEGIN
+        DELETE FROM kanban_search WHERE rowid = old.id * 2;
+        INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+        VALUES (new.id * 2, new.title, new.description, 'b' || new.board_id, 'task', new.id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_move AFTER UPDATE OF board_id ON kanban_app_task
+    WHEN old.board_id IS NOT new.board_id
+    BEGIN
+        UPDATE kanban_search SET scope = 'b' || new.board_id
+        WHERE rowid IN (SELECT id * 2 + 1 FROM kanban_app_comment WHERE task_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_task_delete AFTER DELETE ON kanban_app_task BEGIN
+        DELETE FROM kanban_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_insert AFTER INSERT ON kanban_app_comment BEGIN
+        INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+        VALUES (new.id * 2 + 1, '', new.content,
+                (SELECT 'b' || board_id FROM kanban_app_task WHERE id = new.task_id), 'comment', new.id, new.task_id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_update AFTER UPDATE OF content, task_id ON kanban_app_comment
+    WHEN old.content IS NOT new.content OR old.task_id IS NOT new.task_id
+    BEGIN
+        DELETE FROM kanban_search WHERE rowid = old.id * 2 + 1;
+        INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+        VALUES (new.id * 2 + 1, '', new.content,
+                (SELECT 'b' || board_id FROM kanban_app_task WHERE id = new.task_id), 'comment', new.id, new.task_id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_search_comment_delete AFTER DELETE ON kanban_app_comment BEGIN
+        DELETE FROM kanban_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+    SELECT id * 2, title, description, 'b' || board_id, 'task', id, id FROM kanban_app_task
+    """,
+    """
+    INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+    SELECT c.id * 2 + 1, '', c.content, 'b' || t.board_id, 'comment', c.id, c.task_id
+    FROM kanban_app_comment c JOIN kanban_app_task t ON t.id = c.task_id
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS kanban_search_task_insert',
+    'DROP TRIGGER IF EXISTS kanban_search_task_update',
+    'DROP TRIGGER IF EXISTS kanban_search_task_move',
+    'DROP TRIGGER IF EXISTS kanban_search_task_delete',
+    'DROP TRIGGER IF EXISTS kanban_search_comment_insert',
+    'DROP TRIGGER IF EXISTS kanban_search_comment_update',
+    'DROP TRIGGER IF EXISTS kanban_search_comment_delete',
+    'DROP TABLE IF EXISTS kanban_search',
+]
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 is SQLite only; other databases use the ORM search backend.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0009_sync_change_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -1,7 +1,80 @@
-from django.db import models
+from django.db import DatabaseError, models, router, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 
-class Board(models.Model):
+def count_subquery(queryset, outer_field):
+    """
+    Wraps a queryset into a correlated COUNT subquery on `outer_field`,
+    so counts can be annotated without joining (and multiplying) rows.
+    """
+    counted = (
+        queryset.filter(**{outer_field: OuterRef('pk')})
+        .order_by()
+        .values(outer_field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+class BoardQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """
+        Boards the user owns or is a member of.
+        """
+        return self.filter(Q(owner=user) | Q(members=user)).distinct()
+
+    def with_actual_counts(self):
+        """
+        Annotates the counters computed from scratch as `actual_<counter>`,
+        for comparing against the stored (denormalized) values.
+        """
+        members = Board.members.through.objects.all()
+        tasks = Task.objects.all()
+        return self.annotate(
+            actual_member_count=count_subquery(members, 'board'),
+            actual_ticket_count=count_subquery(tasks, 'board'),
+            actual_tasks_to_do_count=count_subquery(tasks.filter(status='to-do'), 'board'),
+            actual_tasks_high_prio_count=count_subquery(tasks.filter(priority='high'), 'board'),
+        )
+
+class TaskQuerySet(models.QuerySet):
+    def with_actual_counts(self):
+        """
+        Annotates the comment count computed from scratch as `actual_comments_count`.
+        """
+        return self.annotate(actual_comments_count=count_subquery(Comment.objects.all(), 'task'))
+
+class CounterFieldsMixin:
+    """
+    Counter fields are maintained with F() updates (see kanban_app.counters),
+    so a plain save() of a loaded instance must not write them back: it
+    saves the other loaded fields through `update_fields`. If the row is gone,
+    save() inserts the instance as Model.save() does; instances with deferred
+    fields raise instead, as they do in Model.save().
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+            return super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        update_fields = [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+        ]
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            # A savepoint, so a failed update leaves the outer transaction usable.
+            with transaction.atomic(using=using):
+                super().save(*args, update_fields=update_fields, **kwargs)
+        except DatabaseError:
+            if deferred or kwargs.get('force_update') or type(self)._base_manager.using(using).filter(pk=self.pk).exists():
+                raise
+            super().save(*args, force_insert=True, **kwargs)
+
+class Board(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=50)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -12,11 +85,22 @@ class Board(models.Model):
         settings.AUTH_USER_MODEL,
         related_name='boards'
     )
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    ticket_count = models.PositiveIntegerField(default=0, editable=False)
+    tasks_to_do_count = models.PositiveIntegerField(default=0, editable=False)
+    tasks_high_prio_count = models.PositiveIntegerField(default=0, editable=False)
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    sync_floor = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = BoardQuerySet.as_manager()
+    counter_fields = (
+        'member_count', 'ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count', 'version', 'sync_floor'
+    )
 
     def __str__(self):
         return self.title
 
-class Task(models.Model):
+class Task(CounterFieldsMixin, models.Model):
     board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='tasks')
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -25,19 +109,107 @@ class Task(models.Model):
     assignee = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, related_name='assigned_tasks', on_delete=models.SET_NULL) 
     reviewer = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, related_name='reviewed_tasks', on_delete=models.SET_NULL) 
     due_date = models.DateField(null=True, blank=True)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
+    counter_fields = ('comments_count',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['assignee', 'id'], name='task_assignee_id_idx'),
+            models.Index(fields=['reviewer', 'id'], name='task_reviewer_id_idx'),
+            models.Index(fields=['board', 'status'], name='task_board_status_idx'),
+            models.Index(fields=['board', 'priority'], name='task_board_priority_idx'),
+            models.Index(fields=['board', 'due_date'], name='task_board_due_idx'),
+            models.Index(fields=['due_date'], condition=~Q(status='done'), name='task_open_due_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def comments_count(self):
-        return 0
-
 class Comment(models.Model):
     task = models.ForeignKey("Task", on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE) 
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.author} - {self.content[:20]}"
+
+class BoardChange(models.Model):
+    """
+    Change log entry used for incremental board sync. The id is the sync cursor;
+    deletions are kept as tombstones until compacted away (see compact_changes).
+    """
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='changes')
+    kind = models.CharField(max_length=10, choices=[('board','Board'),('task','Task'),('comment','Comment'),('member','Member')])
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=[('upsert','Upsert'),('delete','Delete')])
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'id'], name='change_board_id_idx'),
+            models.Index(fields=['created_at'], name='change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.board_id} {self.kind} {self.object_id} {self.action}"
+
+class Job(models.Model):
+    """
+    Background job queue entry, run by the `run_jobs` worker (see kanban_app.jobs).
+    A `dedup_key` makes enqueueing idempotent, e.g. one reminder run per day.
+    """
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+    name = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, default=QUEUED, choices=[(QUEUED,'Queued'),(RUNNING,'Running'),(DONE,'Done'),(FAILED,'Failed')])
+    dedup_key = models.CharField(max_length=100, null=True, blank=True, unique=True)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class Reminder(models.Model):
+    """
+    A due-date reminder for one user, task and day, written in bulk by the
+    `due-reminders` job. Unique per (user, task, kind, day), so reruns add nothing.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reminders')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    kind = models.CharField(max_length=10, choices=[('overdue','Overdue'),('due-soon','Due soon')])
+    day = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task', 'kind', 'day'], name='reminder_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day', 'id'], name='reminder_user_day_idx'),
+            models.Index(fields=['day'], name='reminder_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.kind} {self.task_id} {self.day}"
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Q, When
+from django.utils import timezone
+from kanban_app.changes import compact_changes, expire_changes
+from kanban_app.jobs import register
+from kanban_app.models import Board, Reminder, Task
+
+def _batch_size():
+    return getattr(settings, 'KANBAN_REMINDER_BATCH_SIZE', 1000)
+
+def _with_board_access(user_field):
+    """
+    The task's `<user_field>_id` if that user owns or is a member of the
+    task's board, else NULL: users who left the board get no reminders.
+    """
+    user_id = f'{user_field}_id'
+    membership = Board.members.through.objects.filter(board_id=OuterRef('board_id'), user_id=OuterRef(user_id))
+    return Case(
+        When(Q(Exists(membership)) | Q(board__owner_id=F(user_id)), then=F(user_id)),
+        default=None,
+        output_field=IntegerField(),
+    )
+
+def due_tasks(day):
+    """
+    `(task_id, assignee_id, reviewer_id, due_date)` of every open task that is
+    overdue or due within KANBAN_DUE_SOON_DAYS of `day`, for all users at
+    once. Assignees and reviewers without access to the board are NULL.
+    Runs on the partial `task_open_due_idx` index.
+    """
+    soon = day + timedelta(days=getattr(settings, 'KANBAN_DUE_SOON_DAYS', 2))
+    return (
+        Task.objects.filter(due_date__lte=soon)
+        .exclude(status='done')
+        .filter(Q(assignee__isnull=False) | Q(reviewer__isnull=False))
+        .annotate(assignee_to=_with_board_access('assignee'), reviewer_to=_with_board_access('reviewer'))
+        .order_by()
+        .values_list('id', 'assignee_to', 'reviewer_to', 'due_date')
+    )
+
+@register('due-reminders', daily=True)
+def due_reminders(day=None):
+    """
+    Writes the `Reminder` rows for `day` (ISO date, default today) to the
+    assignee and reviewer of each due task, in bulk. Rows that already exist
+    are skipped, so rerunning the job for the same day changes nothing.
+    Reminders older than KANBAN_REMINDER_RETENTION_DAYS are removed.
+
+    Tasks are read in keyset batches and each batch commits on its own, so
+    the database write lock is never held for the whole run; a run that
+    stops halfway is completed by the next one.
+    """
+    day = date.fromisoformat(day) if day else timezone.localdate()
+    batch_size = _batch_size()
+    tasks, last_id = 0, 0
+    while True:
+        rows = list(due_tasks(day).filter(id__gt=last_id).order_by('id')[:batch_size])
+        batch = []
+        for task_id, assignee_id, reviewer_id, due_date in rows:
+            kind = 'overdue' if due_date < day else 'due-soon'
+            for user_id in {assignee_id, reviewer_id} - {None}:
+                batch.append(Reminder(user_id=user_id, task_id=task_id, kind=kind, day=day))
+        with transaction.atomic():
+            Reminder.objects.bulk_create(batch, ignore_conflicts=True)
+        tasks += len(rows)
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1][0]
+    retention = getattr(settings, 'KANBAN_REMINDER_RETENTION_DAYS', 30)
+    expired, _ = Reminder.objects.filter(day__lt=day - timedelta(days=retention)).delete()
+    return {
+        'day': day.isoformat(),
+        'tasks': tasks,
+        'reminders': Reminder.objects.filter(day=day).count(),
+        'expired': expired,
+    }
+
+@register('compact-changes', daily=True)
+def compact_change_log(day=None):
+    """
+    The `compact_changes` command as a daily job.
+    """
+    with transaction.atomic():
+        return {'compacted': compact_changes(), 'expired': expire_changes()}
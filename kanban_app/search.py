@@ -0,0 +1,238 @@
+"""
+Full-text search over tasks and comments. The backend is configured with
+`KANBAN_SEARCH_BACKEND`: `SQLiteSearchBackend` queries the FTS5 table of
+migration 0010 (ranked by bm25, with highlighted snippets) and is the default
+on SQLite, `DatabaseSearchBackend` is a plain ORM fallback and the default on
+other databases, where that table does not exist.
+"""
+import html
+import re
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from kanban_app.models import Comment, Task
+
+KINDS = ('task', 'comment')
+
+# Match markers put around hits by the database; the text is escaped before
+# they are replaced by <mark> tags.
+_START, _END = '\x02', '\x03'
+_WORD = re.compile(r'\w+')
+
+def search_terms(query):
+    """
+    The words of a user query, at most KANBAN_SEARCH_MAX_TERMS of them.
+    Operators and punctuation are dropped, so any input is a valid query.
+    """
+    return _WORD.findall(query or '')[:getattr(settings, 'KANBAN_SEARCH_MAX_TERMS', 8)]
+
+def mark(text):
+    return html.escape(text).replace(_START, '<mark>').replace(_END, '</mark>')
+
+class SearchBackend:
+    """
+    Interface of a search backend. `search` returns one dict per hit:
+    `{"kind", "id", "task", "board", "title", "snippet", "score"}`, best first,
+    with the matched words of `title` and `snippet` wrapped in `<mark>`.
+    """
+    def search(self, terms, board_ids, kind=None, limit=20, offset=0):
+        raise NotImplementedError
+
+    def object_ids(self, kind, terms, limit):
+        """
+        Ids of up to `limit` tasks or comments matching all terms on any
+        board, newest first (used by the admin search).
+        """
+        raise NotImplementedError
+
+    def rebuild(self):
+        """
+        Rebuilds the index from the tasks and comments tables and returns the
+        number of indexed rows (None if the backend keeps no index).
+        """
+        return None
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 search. Terms are ANDed and the last one matches as a prefix, for
+    search-as-you-type. For up to KANBAN_SEARCH_SCOPE_MAX_BOARDS boards the
+    board filter is part of the match expression (`scope` column), so hits on
+    other boards are never ranked; larger sets are filtered through the task.
+    Highlights and snippets are only built for the returned page.
+    """
+    title_weight = 5.0
+    snippet_tokens = 16
+
+    def scoped(self, board_ids):
+        return len(board_ids) <= getattr(settings, 'KANBAN_SEARCH_SCOPE_MAX_BOARDS', 200)
+
+    def match_expression(self, terms, board_ids):
+        words = [f'"{term}"' for term in terms]
+        words[-1] += '*'
+        expression = '{title body} : (' + ' AND '.join(words) + ')'
+        if self.scoped(board_ids):
+            expression = 'scope : (' + ' OR '.join(f'b{board_id}' for board_id in board_ids) + f') AND {expression}'
+        return expression
+
+    def search(self, terms, board_ids, kind=None, limit=20, offset=0):
+        if not terms or not board_ids:
+            return []
+        board_ids = sorted(board_ids)
+        match = self.match_expression(terms, board_ids)
+        board_filter = f"t.board_id IN ({', '.join(['%s'] * len(board_ids))})"
+        top_join, top_params = '', [match]
+        if not self.scoped(board_ids):
+            top_join = f'JOIN kanban_app_task t ON t.id = kanban_search.task_id AND {board_filter}'
+            top_params = [*board_ids, match]
+        kind_filter = ''
+        if kind is not None:
+            kind_filter = 'AND kanban_search.kind = %s'
+            top_params.append(kind)
+        sql = f"""
+            WITH top AS (
+                SELECT kanban_search.rowid AS id, bm25(kanban_search, {self.title_weight}, 1.0, 0.0) AS score
+                FROM kanban_search {top_join}
+                WHERE kanban_search MATCH %s {kind_filter}
+                ORDER BY score LIMIT %s OFFSET %s
+            )
+            SELECT kanban_search.kind, kanban_search.object_id, kanban_search.task_id, t.board_id, t.title,
+                   highlight(kanban_search, 0, char(2), char(3)),
+                   snippet(kanban_search, 1, char(2), char(3), '…', {self.snippet_tokens}),
+                   top.score
+            FROM top
+            JOIN kanban_search ON kanban_search.rowid = top.id
+            JOIN kanban_app_task t ON t.id = kanban_search.task_id
+            WHERE kanban_search MATCH %s AND {board_filter}
+            ORDER BY top.score
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*top_params, limit, offset, match, *board_ids])
+            rows = cursor.fetchall()
+        return [
+            {
+                'kind': row_kind,
+                'id': object_id,
+                'task': task_id,
+                'board': board_id,
+                'title': mark(highlighted) if row_kind == 'task' else html.escape(task_title),
+                'snippet': mark(snippet),
+                'score': -score,
+            }
+            for row_kind, object_id, task_id, board_id, task_title, highlighted, snippet, score in rows
+        ]
+
+    def object_ids(self, kind, terms, limit):
+        if not terms:
+            return []
+        words = [f'"{term}"' for term in terms]
+        words[-1] += '*'
+        with connection.cursor() as cursor:
+            # rowid order follows the object id within a kind, and needs no ranking
+            cursor.execute(
+                "SELECT object_id FROM kanban_search WHERE kanban_search MATCH %s AND kind = %s ORDER BY rowid DESC LIMIT %s",
+                ['{title body} : (' + ' AND '.join(words) + ')', kind, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('DELETE FROM kanban_search')
+            cursor.execute("""
+                INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+                SELECT id * 2, title, description, 'b' || board_id, 'task', id, id FROM kanban_app_task
+            """)
+            cursor.execute("""
+                INSERT INTO kanban_search (rowid, title, body, scope, kind, object_id, task_id)
+                SELECT c.id * 2 + 1, '', c.content, 'b' || t.board_id, 'comment', c.id, c.task_id
+                FROM kanban_app_comment c JOIN kanban_app_task t ON t.id = c.task_id
+            """)
+            cursor.execute("INSERT INTO kanban_search (kanban_search) VALUES ('optimize')")
+            cursor.execute('SELECT COUNT(*) FROM kanban_search')
+            return cursor.fetchone()[0]
+
+def _excerpt(text, terms, tokens):
+    """
+    Roughly what FTS5's snippet() returns: about `tokens` words around the
+    first hit, with the hits marked.
+    """
+    words = text.split()
+    lowered = [term.lower() for term in terms]
+    hit = lambda word: any(word.lower().startswith(term) for term in lowered)
+    first = next((i for i, word in enumerate(words) if hit(word)), 0)
+    start = max(0, first - tokens // 2)
+    excerpt = [f'{_START}{word}{_END}' if hit(word) else word for word in words[start:start + tokens]]
+    prefix = '…' if start else ''
+    suffix = '…' if start + tokens < len(words) else ''
+    return prefix + ' '.join(excerpt) + suffix
+
+class DatabaseSearchBackend(SearchBackend):
+    """
+    Case-insensitive substring search through the ORM, for databases without
+    FTS5. Every term must occur; hits are ordered by last update, newest
+    first, tasks and comments merged, unranked.
+    """
+    snippet_tokens = 16
+
+    def search(self, terms, board_ids, kind=None, limit=20, offset=0):
+        if not terms or not board_ids:
+            return []
+        hits = []
+        if kind in (None, 'task'):
+            tasks = Task.objects.filter(board_id__in=board_ids)
+            for term in terms:
+                tasks = tasks.filter(Q(title__icontains=term) | Q(description__icontains=term))
+            tasks = tasks.only('id', 'board_id', 'title', 'description', 'updated_at')
+            for task in tasks.order_by('-updated_at', '-id')[:offset + limit]:
+                hits.append(((task.updated_at, 'task', task.id), {
+                    'kind': 'task', 'id': task.id, 'task': task.id, 'board': task.board_id,
+                    'title': mark(_excerpt(task.title, terms, len(task.title.split()) or 1)),
+                    'snippet': mark(_excerpt(task.description, terms, self.snippet_tokens)),
+                    'score': None,
+                }))
+        if kind in (None, 'comment'):
+            comments = Comment.objects.filter(task__board_id__in=board_ids)
+            for term in terms:
+                comments = comments.filter(content__icontains=term)
+            comments = comments.select_related('task').only('id', 'content', 'updated_at', 'task__id', 'task__board_id', 'task__title')
+            for comment in comments.order_by('-updated_at', '-id')[:offset + limit]:
+                hits.append(((comment.updated_at, 'comment', comment.id), {
+                    'kind': 'comment', 'id': comment.id, 'task': comment.task_id, 'board': comment.task.board_id,
+                    'title': html.escape(comment.task.title),
+                    'snippet': mark(_excerpt(comment.content, terms, self.snippet_tokens)),
+                    'score': None,
+                }))
+        # Each kind holds its newest offset + limit hits, so the merged page is exact.
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [hit for _, hit in hits[offset:offset + limit]]
+
+    def object_ids(self, kind, terms, limit):
+        if kind == 'task':
+            queryset = Task.objects.all()
+            for term in terms:
+                queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        else:
+            queryset = Comment.objects.all()
+            for term in terms:
+                queryset = queryset.filter(content__icontains=term)
+        return list(queryset.order_by('-id').values_list('id', flat=True)[:limit]) if terms else []
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_search_backend():
+    """
+    Returns the backend configured by `KANBAN_SEARCH_BACKEND` (one instance per class path).
+    Without the setting that is `SQLiteSearchBackend` on SQLite, whose FTS5
+    table migration 0010 creates, and `DatabaseSearchBackend` elsewhere.
+    """
+    path = getattr(settings, 'KANBAN_SEARCH_BACKEND', None)
+    if path is None:
+        backend = 'SQLiteSearchBackend' if connection.vendor == 'sqlite' else 'DatabaseSearchBackend'
+        path = f'kanban_app.search.{backend}'
+
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.db.models import QuerySet
+from django.dispatch import receiver
+from kanban_app.access import invalidate_board_access
+from kanban_app.changes import record_change, record_changes
+from kanban_app.counters import apply_comment_changes, apply_task_changes, refresh_member_counts
+from kanban_app.events import publish_event
+from kanban_app.models import Board, Comment, Task
+from kanban_app.versions import bump_board_versions, bump_versions_for_tasks
+
+@receiver(post_init, sender=Board)
+def remember_board_owner(sender, instance, **kwargs):
+    """
+    Keeps the owner loaded from the database so owner changes can be detected on save.
+    """
+    instance._loaded_owner_id = instance.owner_id
+
+@receiver(post_save, sender=Board)
+def board_saved(sender, instance, created, **kwargs):
+    previous_owner_id = instance._loaded_owner_id
+    if created or previous_owner_id != instance.owner_id:
+        invalidate_board_access([previous_owner_id, instance.owner_id])
+    if not created:
+        bump_board_versions([instance.pk])
+        record_change(instance.pk, 'board', instance.pk)
+        publish_event(instance.pk, 'board.updated')
+    instance._loaded_owner_id = instance.owner_id
+
+@receiver(pre_delete, sender=Board)
+def collect_board_users(sender, instance, origin=None, **kwargs):
+    """
+    Membership rows are removed by cascade without m2m signals,
+    so the affected users are collected before the delete happens.
+    The board is also noted on the delete's origin (e.g. its owner), so
+    cascaded task and comment deletes record no changes for it.
+    """
+    instance._affected_user_ids = [instance.owner_id, *instance.members.values_list('id', flat=True)]
+    if origin is not None:
+        origin._deleted_board_ids = {*getattr(origin, '_deleted_board_ids', ()), instance.pk}
+
+@receiver(post_delete, sender=Board)
+def board_deleted(sender, instance, **kwargs):
+    invalidate_board_access(getattr(instance, '_affected_user_ids', [instance.owner_id]))
+    publish_event(instance.pk, 'board.deleted')
+
+@receiver(m2m_changed, sender=Board.members.through)
+def board_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action == 'pre_clear':
+            instance._cleared_board_ids = list(instance.boards.values_list('id', flat=True))
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            board_ids = getattr(instance, '_cleared_board_ids', []) if action == 'post_clear' else pk_set or []
+            invalidate_board_access([instance.pk])
+            refresh_member_counts(board_ids)
+            bump_board_versions(board_ids)
+            change = 'upsert' if action == 'post_add' else 'delete'
+            record_changes((board_id, 'member', instance.pk, change) for board_id in board_ids)
+            for board_id in board_ids:
+                publish_event(board_id, 'members.changed', users=[instance.pk])
+        return
+    if action == 'pre_clear':
+        instance._cleared_member_ids = list(instance.members.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = getattr(instance, '_cleared_member_ids', []) if action == 'post_clear' else pk_set or []
+        invalidate_board_access(user_ids)
+        refresh_member_counts([instance.pk])
+        bump_board_versions([instance.pk])
+        instance.refresh_from_db(fields=['member_count', 'version'])
+        change = 'upsert' if action == 'post_add' else 'delete'
+        record_changes((instance.pk, 'member', uid, change) for uid in user_ids)
+        publish_event(instance.pk, 'members.changed', users=sorted(user_ids))
+
+@receiver(pre_delete, sender=get_user_model())
+def collect_user_boards(sender, instance, **kwargs):
+    """
+    Deleting a user removes their membership rows by cascade, without m2m
+    signals, so the boards are collected before the delete happens.
+    """
+    instance._member_board_ids = list(instance.boards.values_list('id', flat=True))
+
+@receiver(post_delete, sender=get_user_model())
+def user_deleted(sender, instance, **kwargs):
+    invalidate_board_access([instance.pk])
+    # Boards the user owned are gone by now.
+    board_ids = list(Board.objects.filter(pk__in=getattr(instance, '_member_board_ids', [])).values_list('id', flat=True))
+    refresh_member_counts(board_ids)
+    bump_board_versions(board_ids)
+    record_changes((board_id, 'member', instance.pk, 'delete') for board_id in board_ids)
+    for board_id in board_ids:
+        publish_event(board_id, 'members.changed', users=[instance.pk])
+
+def _deleted_with(origin, *models):
+    """
+    True if the delete was started on one of `models` (instance or queryset),
+    i.e. the counter rows being adjusted are deleted in the same operation.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
+
+def _board_deleted_with(origin, board_id):
+    """
+    True if the board is removed by the same delete (see collect_board_users),
+    so no change rows may point at it.
+    """
+    return board_id in getattr(origin, '_deleted_board_ids', ())
+
+def _task_state(instance):
+    # Read through __dict__ so deferred fields are not loaded one by one.
+    return tuple(instance.__dict__.get(field) for field in ('board_id', 'status', 'priority'))
+
+@receiver(post_init, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    instance._loaded_counter_state = _task_state(instance) if instance.pk else None
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    previous, current = instance._loaded_counter_state, _task_state(instance)
+    if created:
+        apply_task_changes([(*current, 1)])
+    elif previous is not None and previous != current:
+        apply_task_changes([(*previous, -1), (*current, 1)])
+    bump_board_versions([instance.board_id, previous[0] if previous else None])
+    record_change(instance.board_id, 'task', instance.pk)
+    if previous is not None and previous[0] != instance.board_id:
+        record_change(previous[0], 'task', instance.pk, 'delete')
+        publish_event(previous[0], 'task.deleted', id=instance.pk)
+    publish_event(instance.board_id, 'task.created' if created else 'task.updated', id=instance.pk)
+    instance._loaded_counter_state = current
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, Board):
+        return
+    state = instance._loaded_counter_state or _task_state(instance)
+    if _board_deleted_with(origin, state[0]):
+        return
+    apply_task_changes([(*state, -1)])
+    bump_board_versions([state[0]])
+    record_change(state[0], 'task', instance.pk, 'delete')
+    publish_event(state[0], 'task.deleted', id=instance.pk)
+
+def _comment_board_id(instance):
+    if Comment.task.is_cached(instance):
+        return instance.task.board_id
+    return Task.objects.filter(pk=instance.task_id).values_list('board_id', flat=True).first()
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        apply_comment_changes({instance.task_id: 1})
+    bump_versions_for_tasks([instance.task_id])
+    board_id = _comment_board_id(instance)
+    record_change(board_id, 'comment', instance.pk)
+    event_type = 'comment.created' if created else 'comment.updated'
+    publish_event(board_id, event_type, id=instance.pk, task=instance.task_id)
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, Board, Task):
+        return
+    board_id = _comment_board_id(instance)
+    if _board_deleted_with(origin, board_id):
+        return
+    apply_comment_changes({instance.task_id: -1})
+    bump_versions_for_tasks([instance.task_id])
+    record_change(board_id, 'comment', instance.pk, 'delete')
+    publish_event(board_id, 'comment.deleted', id=instance.pk, task=instance.task_id)
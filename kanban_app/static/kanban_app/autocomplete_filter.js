@@ -0,0 +1,15 @@
+'use strict';
+// Reloads the changelist when a value is picked in an AutocompleteFilter
+// (kanban_app/admin.py), keeping the other filters and going back to page 1.
+{
+    const $ = django.jQuery;
+    $(document).on('change', 'select.autocomplete-filter', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete(this.name);
+        params.delete('p');
+        if (this.value) {
+            params.set(this.name, this.value);
+        }
+        window.location.search = params.toString();
+    });
+}
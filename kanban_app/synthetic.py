@@ -0,0 +1,133 @@
+import itertools
+import random
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from kanban_app.counters import recompute_all
+from kanban_app.models import Board, Comment, Task
+
+PASSWORD = 'synthetic-pass'
+BATCH_SIZE = 1000
+
+STATUSES = ['to-do', 'in-progress', 'review', 'done']
+STATUS_WEIGHTS = [4, 2, 1, 3]
+PRIORITIES = ['low', 'medium', 'high']
+PRIORITY_WEIGHTS = [3, 5, 2]
+
+# Words of generated titles, descriptions and comments, drawn Zipf-distributed
+# so text search sees realistic term frequencies (a few very common words).
+VOCABULARY = (
+    'the fix update review deploy test bug login page api error user board task release build '
+    'design copy mobile layout database migration cache latency timeout crash report customer '
+    'invoice payment email notification search filter export import sync backup security token '
+    'password permission admin dashboard chart metric alert queue worker schedule reminder digest '
+    'staging production rollback hotfix refactor cleanup docs onboarding translation accessibility '
+    'performance memory index query pagination upload download image video audio font color theme '
+    'sidebar header footer modal tooltip dropdown checkbox calendar timezone locale currency tax'
+).split()
+
+class ZipfPicker:
+    """
+    Picks items with probability proportional to 1 / rank**skew, so a few items
+    get most of the picks (hot boards, power users) like in real data.
+    """
+    def __init__(self, items, skew, rng):
+        self.items = list(items)
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, len(self.items) + 1)))
+
+    def pick(self):
+        return self.rng.choices(self.items, cum_weights=self.cum_weights)[0]
+
+    def picks(self, count):
+        return self.rng.choices(self.items, cum_weights=self.cum_weights, k=count)
+
+    def sample(self, count):
+        """
+        Up to `count` distinct items, still favouring the top ranks.
+        """
+        count = min(count, len(self.items))
+        if count * 2 >= len(self.items):
+            return set(self.rng.sample(self.items, count))
+        picked = set()
+        while len(picked) < count:
+            picked.add(self.pick())
+        return picked
+
+def generate(users, boards, members_per_board, tasks, comments, skew=1.1, seed=0, prefix='synthetic-', password=PASSWORD):
+    """
+    Creates a synthetic dataset in one transaction and returns the ids of the
+    created users. Writes go through bulk_create, so the stored counters are
+    recomputed at the end instead of being maintained row by row.
+    """
+    rng = random.Random(seed)
+    hasher = User()
+    hasher.set_password(password)
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', first_name='Synthetic',
+                 last_name=f'User {i}', password=hasher.password)
+            for i in range(users)
+        ], batch_size=BATCH_SIZE)
+        user_ids = list(
+            User.objects.filter(username__startswith=prefix).order_by('id').values_list('id', flat=True)
+        )
+        user_picker = ZipfPicker(user_ids, skew, rng)
+
+        Board.objects.bulk_create([
+            Board(title=f'Board {i}', owner_id=user_picker.pick()) for i in range(boards)
+        ], batch_size=BATCH_SIZE)
+        board_rows = list(
+            Board.objects.filter(owner_id__in=user_ids).order_by('id').values_list('id', 'owner_id')
+        )
+        members = {}
+        memberships = []
+        for board_id, owner_id in board_rows:
+            size = max(1, round(members_per_board * rng.paretovariate(2) / 2))
+            members[board_id] = sorted({owner_id} | user_picker.sample(size - 1))
+            memberships.extend(
+                Board.members.through(board_id=board_id, user_id=user_id) for user_id in members[board_id]
+            )
+        Board.members.through.objects.bulk_create(memberships, batch_size=BATCH_SIZE)
+
+        if not members:
+            recompute_all()
+            return user_ids
+        board_picker = ZipfPicker(members, skew, rng)
+        words = ZipfPicker(VOCABULARY, skew, rng)
+        text = lambda low, high: ' '.join(words.picks(rng.randint(low, high)))
+        today = date.today()
+
+        def make_task(i):
+            board_id = board_picker.pick()
+            board_members = members[board_id]
+            return Task(
+                board_id=board_id,
+                title=f'Task {i} {text(1, 5)}',
+                description=text(0, 40),
+                status=rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                priority=rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                assignee_id=rng.choice(board_members) if rng.random() < 0.8 else None,
+                reviewer_id=rng.choice(board_members) if rng.random() < 0.5 else None,
+                due_date=today + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.6 else None,
+            )
+
+        Task.objects.bulk_create((make_task(i) for i in range(tasks)), batch_size=BATCH_SIZE)
+        task_rows = list(
+            Task.objects.filter(board_id__in=members).order_by('id').values_list('id', 'board_id')
+        )
+        if task_rows:
+            task_picker = ZipfPicker(task_rows, skew, rng)
+
+            def make_comment(i):
+                task_id, board_id = task_picker.pick()
+                return Comment(
+                    task_id=task_id,
+                    author_id=rng.choice(members[board_id]),
+                    content=text(2, 60),
+                )
+
+            Comment.objects.bulk_create((make_comment(i) for i in range(comments)), batch_size=BATCH_SIZE)
+
+        recompute_all()
+    return user_ids
@@ -1,3 +1,1590 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+import asyncio
+import base64
+import json
+from datetime import date, timedelta
+import tempfile
+import tracemalloc
+from unittest import mock
+import threading
+from asgiref.sync import async_to_sync, sync_to_async
+from io import StringIO
+from pathlib import Path
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from core import instrumentation
+from kanban_app import access, benchmarks, jobs
+from kanban_app.counters import find_drift, recompute_all
+from kanban_app.api import async_views
+from kanban_app.api.pagination import CommentCursorPagination
+from kanban_app.api.serializers import CommentSerializer, TaskSerializer
+from kanban_app.api.views import BoardDetailView, BoardExportView, TaskDetailView
+from kanban_app.events import get_broker
+from kanban_app.models import Board, BoardChange, Comment, Job, Reminder, Task
+from kanban_app.reminders import due_reminders, due_tasks
+from kanban_app.transfer import BoardImportError, export_board, import_board
+from kanban_app.search import DatabaseSearchBackend, SQLiteSearchBackend, get_search_backend
 
-# Create your tests here.
+User = get_user_model()
+
+class KanbanTestCase(APITestCase):
+    """
+    Shared fixtures: one authenticated user who owns a board.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='pw')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pw')
+        self.client.force_authenticate(self.user)
+
+    def make_board(self, title='Board', members=()):
+        board = Board.objects.create(title=title, owner=self.user)
+        board.members.set([self.user, *members])
+        return board
+
+    def make_task(self, board, **kwargs):
+        data = {'title': 'Task', 'status': 'to-do', 'priority': 'medium'}
+        data.update(kwargs)
+        return Task.objects.create(board=board, **data)
+
+class BoardListQueryTests(KanbanTestCase):
+    def test_counters_are_annotated(self):
+        board = self.make_board(members=[self.other])
+        self.make_task(board, status='to-do', priority='high')
+        self.make_task(board, status='done', priority='high')
+        self.make_task(board, status='to-do', priority='low')
+
+        response = self.client.get(reverse('board-list'))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.data['results'][0]
+        self.assertEqual(data['member_count'], 2)
+        self.assertEqual(data['ticket_count'], 3)
+        self.assertEqual(data['tasks_to_do_count'], 2)
+        self.assertEqual(data['tasks_high_prio_count'], 2)
+
+    def test_query_count_is_constant(self):
+        for i in range(5):
+            board = self.make_board(title=f'Board {i}', members=[self.other])
+            self.make_task(board)
+        self.client.get(reverse('board-list'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('board-list'))
+        self.assertEqual(len(response.data['results']), 5)
+
+        for i in range(20):
+            self.make_board(title=f'More {i}')
+        self.client.get(reverse('board-list'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('board-list'))
+        self.assertEqual(len(response.data['results']), 25)
+
+class BoardDetailQueryTests(KanbanTestCase):
+    def test_tasks_are_included(self):
+        board = self.make_board(members=[self.other])
+        task = self.make_task(board, assignee=self.other, reviewer=self.user)
+        Comment.objects.create(task=task, author=self.other, content='Hi')
+
+        response = self.client.get(reverse('board-detail', args=[board.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['members']), 2)
+        payload = response.data['tasks'][0]
+        self.assertNotIn('board', payload)
+        self.assertEqual(payload['assignee']['email'], 'other@example.com')
+        self.assertEqual(payload['reviewer']['id'], self.user.id)
+        self.assertEqual(payload['comments_count'], 1)
+
+    def test_query_count_does_not_depend_on_task_count(self):
+        board = self.make_board(members=[self.other])
+        url = reverse('board-detail', args=[board.id])
+        for _ in range(3):
+            task = self.make_task(board, assignee=self.other, reviewer=self.user)
+            Comment.objects.create(task=task, author=self.other, content='Hi')
+        self.client.get(url)
+
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+        for _ in range(30):
+            self.make_task(board, assignee=self.user, reviewer=self.other)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['tasks']), 33)
+
+class TaskListQueryTests(KanbanTestCase):
+    def make_assigned_tasks(self, board, count, reviewer=None):
+        for _ in range(count):
+            task = self.make_task(board, assignee=self.user, reviewer=reviewer or self.other)
+            Comment.objects.create(task=task, author=self.other, content='Hi')
+            Comment.objects.create(task=task, author=self.user, content='Hello')
+
+    def test_comments_count_is_annotated(self):
+        board = self.make_board(members=[self.other])
+        self.make_assigned_tasks(board, 1)
+
+        response = self.client.get(reverse('tasks-assigned-to-me'))
+
+        self.assertEqual(response.data['results'][0]['comments_count'], 2)
+        self.assertEqual(response.data['results'][0]['reviewer']['email'], 'other@example.com')
+
+    def test_query_budget_is_fixed(self):
+        board = self.make_board(members=[self.other])
+        self.make_assigned_tasks(board, 2, reviewer=self.user)
+        for name in ['tasks-assigned-to-me', 'tasks-reviewing']:
+            with self.assertNumQueries(1):
+                self.client.get(reverse(name))
+
+        self.make_assigned_tasks(board, 20, reviewer=self.user)
+        for name in ['tasks-assigned-to-me', 'tasks-reviewing']:
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse(name))
+            self.assertEqual(len(response.data['results']), 22)
+
+class MembershipCheckTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.third = User.objects.create_user(username='third', email='third@example.com', password='pw')
+        self.board = self.make_board(members=[self.other, self.third])
+        self.task = self.make_task(self.board)
+        self.client.force_authenticate(self.other)
+
+    def membership_queries(self, queries):
+        return [q for q in queries if 'FROM "kanban_app_board_members"' in q['sql']]
+
+    def test_patch_checks_membership_in_one_query_per_phase(self):
+        url = reverse('task-detail', args=[self.task.id])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(url, {'assignee_id': self.third.id, 'reviewer_id': self.user.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['assignee']['id'], self.third.id)
+        self.assertEqual(len(self.membership_queries(ctx.captured_queries)), 2)
+
+    def test_create_rejects_non_member_assignee(self):
+        outsider = User.objects.create_user(username='out', email='out@example.com', password='pw')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('task-create'), {
+                'board': self.board.id, 'title': 'New', 'status': 'to-do',
+                'priority': 'low', 'assignee_id': outsider.id, 'reviewer_id': self.third.id,
+            })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'User with id {outsider.id} is not a board member.', str(response.data))
+        self.assertEqual(len(self.membership_queries(ctx.captured_queries)), 1)
+
+    def test_non_member_is_denied(self):
+        outsider = User.objects.create_user(username='out', email='out@example.com', password='pw')
+        self.client.force_authenticate(outsider)
+
+        response = self.client.get(f'/api/tasks/{self.task.id}/comments/')
+
+        self.assertEqual(response.status_code, 403)
+
+class BoardAccessCacheTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        access.stats.clear()
+
+    def board_ids(self):
+        return {board['id'] for board in self.client.get(reverse('board-list')).data['results']}
+
+    def test_hits_and_misses_are_counted(self):
+        board = self.make_board()
+
+        self.assertEqual(access.accessible_board_ids(self.user), {board.id})
+        self.assertEqual(access.accessible_board_ids(self.user), {board.id})
+
+        self.assertEqual(access.stats['misses'], 1)
+        self.assertEqual(access.stats['hits'], 1)
+
+    def test_membership_changes_are_not_served_stale(self):
+        board = self.make_board()
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.board_ids(), set())
+
+        board.members.add(self.other)
+        self.assertEqual(self.board_ids(), {board.id})
+
+        board.members.remove(self.other)
+        self.assertEqual(self.board_ids(), set())
+
+        self.other.boards.add(board)
+        self.assertEqual(self.board_ids(), {board.id})
+
+        board.members.clear()
+        self.assertEqual(self.board_ids(), set())
+
+    def test_entries_cached_before_commit_are_dropped(self):
+        board = self.make_board()
+        with self.captureOnCommitCallbacks(execute=True):
+            board.members.add(self.other)
+            # A concurrent request still reading the committed membership.
+            cache.set(access._cache_key(self.other.id), frozenset())
+        self.assertEqual(access.accessible_board_ids(self.other), {board.id})
+
+    def test_owner_change_and_delete_invalidate(self):
+        board = self.make_board()
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.board_ids(), set())
+
+        board.owner = self.other
+        board.save()
+        self.assertEqual(self.board_ids(), {board.id})
+
+        board.delete()
+        self.assertEqual(self.board_ids(), set())
+
+    def test_new_board_is_visible_to_members(self):
+        self.assertEqual(self.board_ids(), set())
+
+        response = self.client.post(reverse('board-list'), {'title': 'New', 'members': [self.other.id]}, format='json')
+        self.client.force_authenticate(self.other)
+
+        self.assertEqual(self.board_ids(), {response.data['id']})
+
+class CursorPaginationTests(KanbanTestCase):
+    def collect_pages(self, url):
+        items, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            items.extend(response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return items, pages
+
+    def test_comments_are_paged_in_creation_order(self):
+        board = self.make_board()
+        task = self.make_task(board)
+        comments = [Comment.objects.create(task=task, author=self.user, content=str(i)) for i in range(7)]
+
+        items, pages = self.collect_pages(f'/api/tasks/{task.id}/comments/?page_size=3')
+
+        self.assertEqual(pages, 3)
+        self.assertEqual([item['id'] for item in items], [comment.id for comment in comments])
+
+    def test_task_lists_are_paged_by_id(self):
+        board = self.make_board()
+        tasks = [self.make_task(board, assignee=self.user) for _ in range(5)]
+
+        items, pages = self.collect_pages(reverse('tasks-assigned-to-me') + '?page_size=2')
+
+        self.assertEqual(pages, 3)
+        self.assertEqual([item['id'] for item in items], [task.id for task in tasks])
+
+    def test_page_query_count_does_not_depend_on_depth(self):
+        board = self.make_board()
+        for _ in range(9):
+            self.make_task(board, assignee=self.user)
+        url = reverse('tasks-assigned-to-me') + '?page_size=3'
+
+        with self.assertNumQueries(1):
+            first = self.client.get(url)
+        third_page = self.client.get(first.data['next']).data['next']
+        with self.assertNumQueries(1):
+            self.client.get(third_page)
+
+    def test_pages_match_drf_cursor_pagination(self):
+        board = self.make_board()
+        task = self.make_task(board)
+        for i in range(7):
+            Comment.objects.create(task=task, author=self.user, content=str(i))
+        queryset = Comment.objects.filter(task=task)
+        factory = APIRequestFactory()
+
+        def walk(pagination_class):
+            pages, url = [], f'/api/tasks/{task.id}/comments/?page_size=3'
+            while url:
+                paginator = pagination_class()
+                request = Request(factory.get(url))
+                page = paginator.paginate_queryset(queryset, request)
+                pages.append(([comment.id for comment in page], paginator.get_previous_link()))
+                url = paginator.get_next_link()
+            return pages
+
+        class DRFPagination(CursorPagination):
+            page_size_query_param = 'page_size'
+            ordering = CommentCursorPagination.ordering
+
+        self.assertEqual(walk(CommentCursorPagination), walk(DRFPagination))
+        self.assertEqual(len(walk(CommentCursorPagination)), 3)
+
+class IndexUsageTests(KanbanTestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan)
+
+    def test_task_filters_use_indexes(self):
+        board = self.make_board()
+        self.assertUsesIndex(Task.objects.filter(board=board, status='to-do'), 'task_board_status_idx')
+        self.assertUsesIndex(Task.objects.filter(board=board, priority='high'), 'task_board_priority_idx')
+        self.assertUsesIndex(Task.objects.filter(assignee=self.user).order_by('id'), 'task_assignee_id_idx')
+        self.assertUsesIndex(Task.objects.filter(reviewer=self.user).order_by('id'), 'task_reviewer_id_idx')
+
+    def test_comment_listing_uses_index(self):
+        task = self.make_task(self.make_board())
+        self.assertUsesIndex(task.comments.order_by('created_at', 'id'), 'comment_task_created_idx')
+
+    def test_email_check_is_case_insensitive(self):
+        response = self.client.get(reverse('email-check'), {'email': 'Other@Example.com'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], self.other.id)
+
+class EmailPickerTests(KanbanTestCase):
+    def test_batch_check_uses_one_query(self):
+        emails = ['Other@Example.com', 'owner@example.com', 'nobody@example.com', 'other@example.com']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('email-check-batch'), {'emails': emails}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['id'] for user in response.data['found']], [self.other.id, self.user.id])
+        self.assertEqual(response.data['missing'], ['nobody@example.com'])
+        self.assertEqual(len([q for q in queries if 'FROM "auth_user"' in q['sql']]), 1)
+
+    def test_batch_check_rejects_too_many_emails(self):
+        with self.settings(KANBAN_EMAIL_CHECK_MAX_EMAILS=2):
+            response = self.client.post(reverse('email-check-batch'), {'emails': ['a@x.io'] * 3}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_prefix_search_is_cached(self):
+        User.objects.create_user(username='otto', email='Otto@example.com', password='pw')
+
+        response = self.client.get(reverse('email-search'), {'q': 'OT'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse('email-search'), {'q': 'oth'})
+        self.assertEqual([user['id'] for user in response.data], [self.other.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('email-search'), {'q': 'OTH'}).data, response.data)
+
+class TaskBulkTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(members=[self.other])
+        self.url = reverse('task-bulk')
+
+    def test_create_update_delete_in_one_request(self):
+        moved = self.make_task(self.board)
+        removed = self.make_task(self.board)
+        payload = {
+            'create': [
+                {'board': self.board.id, 'title': 'A', 'status': 'to-do', 'priority': 'low', 'assignee_id': self.other.id},
+                {'board': self.board.id, 'title': 'B', 'status': 'done', 'priority': 'high'},
+            ],
+            'update': [{'id': moved.id, 'status': 'review', 'reviewer_id': self.other.id}],
+            'delete': [removed.id],
+        }
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['title'] for task in response.data['created']], ['A', 'B'])
+        self.assertEqual(response.data['created'][0]['assignee']['id'], self.other.id)
+        self.assertEqual(response.data['updated'][0]['status'], 'review')
+        self.assertEqual(response.data['deleted'], [removed.id])
+        moved.refresh_from_db()
+        self.assertEqual((moved.status, moved.reviewer_id), ('review', self.other.id))
+        self.assertFalse(Task.objects.filter(id=removed.id).exists())
+
+    def test_invalid_item_rolls_back_everything(self):
+        outsider = User.objects.create_user(username='out', email='out@example.com', password='pw')
+        foreign = Board.objects.create(title='Foreign', owner=outsider)
+        task = self.make_task(self.board)
+        payload = {
+            'create': [{'board': foreign.id, 'title': 'X', 'status': 'to-do', 'priority': 'low'}],
+            'update': [{'id': task.id, 'assignee_id': outsider.id}],
+        }
+
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('board', response.data['create'][0])
+        self.assertIn('assignee_id', response.data['update'][0])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_query_count_does_not_depend_on_item_count(self):
+        tasks = [self.make_task(self.board) for _ in range(3)]
+        self.client.get(reverse('board-list'))
+
+        def payload(items):
+            return {'update': [{'id': task.id, 'status': 'done', 'assignee_id': self.other.id} for task in items]}
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, payload(tasks[:1]), format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(self.url, payload(tasks), format='json')
+
+        self.assertEqual(len(small), len(large))
+
+class CommentBulkTests(KanbanTestCase):
+    def test_bulk_create_across_tasks(self):
+        board = self.make_board()
+        first, second = self.make_task(board), self.make_task(board)
+        payload = {'comments': [
+            {'task': first.id, 'content': 'one'},
+            {'task': second.id, 'content': 'two'},
+            {'task': first.id, 'content': 'three'},
+        ]}
+
+        response = self.client.post(reverse('comment-bulk'), payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([c['content'] for c in response.data], ['one', 'two', 'three'])
+        self.assertEqual(first.comments.count(), 2)
+
+    def test_inaccessible_task_is_rejected(self):
+        outsider = User.objects.create_user(username='out', email='out@example.com', password='pw')
+        foreign = Board.objects.create(title='Foreign', owner=outsider)
+        task = self.make_task(foreign)
+
+        response = self.client.post(reverse('comment-bulk'), {'comments': [{'task': task.id, 'content': 'x'}]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_comment_list_resolves_authors_in_one_query(self):
+        board = self.make_board(members=[self.other])
+        task = self.make_task(board)
+        for author in [self.user, self.other] * 5:
+            Comment.objects.create(task=task, author=author, content='Hi')
+        url = f'/api/tasks/{task.id}/comments/'
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('SELECT "auth_user"')])
+
+class CounterTests(KanbanTestCase):
+    def counters(self, board):
+        board.refresh_from_db()
+        return (board.member_count, board.ticket_count, board.tasks_to_do_count, board.tasks_high_prio_count)
+
+    def test_board_counters_follow_task_changes(self):
+        board = self.make_board(members=[self.other])
+        task = self.make_task(board, status='to-do', priority='high')
+        self.make_task(board, status='done', priority='low')
+        self.assertEqual(self.counters(board), (2, 2, 1, 1))
+
+        task.status = 'done'
+        task.save()
+        self.assertEqual(self.counters(board), (2, 2, 0, 1))
+
+        task.delete()
+        self.assertEqual(self.counters(board), (2, 1, 0, 0))
+
+        board.members.remove(self.other)
+        self.assertEqual(self.counters(board), (1, 1, 0, 0))
+
+    def test_comment_counter_follows_comments(self):
+        task = self.make_task(self.make_board())
+        comment = Comment.objects.create(task=task, author=self.user, content='a')
+        Comment.objects.create(task=task, author=self.user, content='b')
+        task.refresh_from_db()
+        self.assertEqual(task.comments_count, 2)
+
+        comment.delete()
+        task.refresh_from_db()
+        self.assertEqual(task.comments_count, 1)
+
+    def test_saving_a_stale_instance_keeps_counters(self):
+        board = self.make_board()
+        task = self.make_task(board)
+        stale = Task.objects.get(pk=task.pk)
+        Comment.objects.create(task=task, author=self.user, content='a')
+
+        stale.title = 'Renamed'
+        stale.save()
+
+        stale.refresh_from_db()
+        self.assertEqual((stale.title, stale.comments_count), ('Renamed', 1))
+
+    def test_save_keeps_deferred_fields_and_reinserts_deleted_rows(self):
+        task = self.make_task(self.make_board(), description='Keep me')
+        partial = Task.objects.only('id', 'title', 'board').get(pk=task.pk)
+        partial.title = 'Renamed'
+        partial.save()
+        self.assertIn('description', partial.get_deferred_fields())
+        task.refresh_from_db()
+        self.assertEqual((task.title, task.description), ('Renamed', 'Keep me'))
+
+        board = Board.objects.create(title='Gone', owner=self.user)
+        Board.objects.filter(pk=board.pk).delete()
+        board.title = 'Back'
+        board.save()
+        self.assertEqual(Board.objects.get(pk=board.pk).title, 'Back')
+
+    def test_deleting_a_user_updates_member_counts(self):
+        board = self.make_board(members=[self.other])
+        access.accessible_board_ids(self.other)
+        self.other.delete()
+        self.assertEqual(self.counters(board), (1, 0, 0, 0))
+        self.assertEqual(find_drift(), ([], []))
+        self.assertTrue(board.changes.filter(kind='member', action='delete').exists())
+
+    def test_deleting_a_board_owner(self):
+        owned = Board.objects.create(title='Owned', owner=self.other)
+        owned.members.set([self.other])
+        Comment.objects.create(task=self.make_task(owned), author=self.other, content='a')
+        board = self.make_board(members=[self.other])
+        task = self.make_task(board)
+        Comment.objects.create(task=task, author=self.other, content='b')
+        self.other.delete()
+        self.assertFalse(Board.objects.filter(pk=owned.pk).exists())
+        self.assertFalse(BoardChange.objects.filter(board_id=owned.pk).exists())
+        self.assertEqual(self.counters(board), (1, 1, 1, 0))
+        task.refresh_from_db()
+        self.assertEqual(task.comments_count, 0)
+        self.assertTrue(board.changes.filter(kind='comment', action='delete').exists())
+        self.assertEqual(find_drift(), ([], []))
+
+    def test_bulk_endpoints_update_counters(self):
+        board = self.make_board()
+        task = self.make_task(board, status='to-do')
+        self.client.post(reverse('task-bulk'), {
+            'create': [{'board': board.id, 'title': 'B', 'status': 'to-do', 'priority': 'high'}],
+            'update': [{'id': task.id, 'status': 'done'}],
+        }, format='json')
+        self.client.post(reverse('comment-bulk'), {'comments': [{'task': task.id, 'content': 'x'}] * 3}, format='json')
+
+        self.assertEqual(self.counters(board), (1, 2, 1, 1))
+        task.refresh_from_db()
+        self.assertEqual(task.comments_count, 3)
+
+    def test_command_reports_and_fixes_drift(self):
+        board = self.make_board()
+        self.make_task(board)
+        Board.objects.filter(pk=board.pk).update(ticket_count=7)
+        out = StringIO()
+
+        with self.assertRaisesMessage(CommandError, 'Drift found on 1 board(s)') as raised:
+            call_command('recompute_counters', '--check', stdout=out)
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertIn('ticket_count 7 -> 1', out.getvalue())
+
+        call_command('recompute_counters', stdout=StringIO())
+        self.assertEqual(self.counters(board), (1, 1, 1, 0))
+
+class ConditionalRequestTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(members=[self.other])
+        self.url = reverse('board-detail', args=[self.board.id])
+
+    def test_unchanged_board_returns_304_with_one_query(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_any_change_moves_the_etag(self):
+        etags = [self.client.get(self.url)['ETag']]
+        task = self.make_task(self.board)
+        etags.append(self.client.get(self.url)['ETag'])
+        Comment.objects.create(task=task, author=self.user, content='Hi')
+        etags.append(self.client.get(self.url)['ETag'])
+        self.board.members.remove(self.other)
+        etags.append(self.client.get(self.url)['ETag'])
+        self.client.patch(self.url, {'title': 'Renamed'}, format='json')
+        etags.append(self.client.get(self.url)['ETag'])
+
+        self.assertEqual(len(set(etags)), len(etags))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_match_gives_optimistic_concurrency(self):
+        task = self.make_task(self.board)
+        url = reverse('task-detail', args=[task.id])
+        etag = self.client.get(url)['ETag']
+
+        first = self.client.patch(url, {'title': 'Mine'}, format='json', HTTP_IF_MATCH=etag)
+        second = self.client.patch(url, {'title': 'Theirs'}, format='json', HTTP_IF_MATCH=etag)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first['ETag'], etag)
+        self.assertEqual(second.status_code, 412)
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Mine')
+
+    def test_if_match_is_checked_at_write_time(self):
+        task = self.make_task(self.board)
+        url = reverse('task-detail', args=[task.id])
+        etag = self.client.get(url)['ETag']
+        get_object = TaskDetailView.get_object
+
+        def concurrent_write(view):
+            # another client writes with the same ETag after this request loaded the task
+            obj = get_object(view)
+            with mock.patch.object(TaskDetailView, 'get_object', get_object):
+                self.assertEqual(self.client.patch(url, {'title': 'Theirs'}, format='json', HTTP_IF_MATCH=etag).status_code, 200)
+            return obj
+
+        with mock.patch.object(TaskDetailView, 'get_object', concurrent_write):
+            response = self.client.patch(url, {'title': 'Mine'}, format='json', HTTP_IF_MATCH=etag)
+
+        self.assertEqual(response.status_code, 412)
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Theirs')
+        response = self.client.delete(url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+
+    def test_non_member_gets_no_304(self):
+        etag = self.client.get(self.url)['ETag']
+        outsider = User.objects.create_user(username='out', email='out@example.com', password='pw')
+        self.client.force_authenticate(outsider)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 404)
+
+class RecordingBroker:
+    """
+    Stand-in event backend that records published events.
+    """
+    def __init__(self):
+        self.events = []
+
+    def publish(self, board_id, event):
+        self.events.append(event)
+
+@override_settings(KANBAN_EVENT_BACKEND='kanban_app.tests.RecordingBroker')
+class ChangeEventTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.broker = get_broker()
+        self.broker.events.clear()
+
+    def test_model_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            board = self.make_board()
+            task = self.make_task(board)
+            Comment.objects.create(task=task, author=self.user, content='Hi')
+            self.assertEqual(self.broker.events, [])
+            board.members.add(self.other)
+            task.delete()
+
+        self.assertEqual([event['type'] for event in self.broker.events], [
+            'members.changed', 'task.created', 'comment.created', 'members.changed', 'task.deleted',
+        ])
+        self.assertTrue(all(event['board'] == board.id for event in self.broker.events))
+
+    def test_bulk_writes_are_published(self):
+        board = self.make_board()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task-bulk'), {
+                'create': [{'board': board.id, 'title': 'A', 'status': 'to-do', 'priority': 'low'}],
+            }, format='json')
+
+        self.assertEqual([event['type'] for event in self.broker.events], ['task.created'])
+
+class EventStreamTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board()
+        self.url = reverse('board-events', args=[self.board.id])
+        self.token = Token.objects.create(user=self.user)
+
+    async def test_stream_delivers_published_events(self):
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b': connected\n\n')
+
+        event = {'type': 'task.updated', 'board': self.board.id, 'id': 1}
+        threading.Thread(target=get_broker().publish, args=(self.board.id, event)).start()
+        chunk = await asyncio.wait_for(anext(stream), timeout=5)
+
+        self.assertTrue(chunk.startswith(b'event: task.updated\n'))
+
+        # A client disconnect cancels the pending read; the subscription must go away.
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(get_broker().subscriber_count(self.board.id), 0)
+
+    async def test_stream_requires_access(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+        other_token = await Token.objects.acreate(user=self.other)
+        response = await self.async_client.get(self.url, {'token': other_token.key})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_ends_when_access_is_lost(self):
+        await sync_to_async(self.board.members.add)(self.other)
+        other_token = await Token.objects.acreate(user=self.other)
+        response = await self.async_client.get(self.url, {'token': other_token.key})
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b': connected\n\n')
+
+        await sync_to_async(self.board.members.remove)(self.other)
+        get_broker().publish(self.board.id, {'type': 'task.updated', 'board': self.board.id, 'id': 1})
+
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(stream), timeout=5)
+        self.assertEqual(get_broker().subscriber_count(self.board.id), 0)
+
+    def test_query_token_is_only_accepted_by_the_stream(self):
+        request = AsyncRequestFactory().get(reverse('board-list'), {'token': self.token.key})
+        request.auser = sync_to_async(AnonymousUser)  # normally set by AuthenticationMiddleware
+        self.assertEqual(async_to_sync(async_views.board_list)(request).status_code, 401)
+
+class IncrementalSyncTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board()
+        self.kept = self.make_task(self.board, title='Kept')
+        self.removed = self.make_task(self.board, title='Removed')
+        self.url = reverse('board-detail', args=[self.board.id])
+        self.cursor = self.client.get(self.url)['X-Sync-Cursor']
+
+    def sync(self, cursor):
+        return self.client.get(self.url, {'since': cursor})
+
+    def test_only_changes_since_cursor_are_returned(self):
+        self.kept.title = 'Moved'
+        self.kept.status = 'done'
+        self.kept.save()
+        comment = Comment.objects.create(task=self.kept, author=self.user, content='Hi')
+        removed_id = self.removed.id
+        self.removed.delete()
+        self.board.members.add(self.other)
+
+        response = self.sync(self.cursor)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['title'] for task in response.data['tasks']], ['Moved'])
+        self.assertEqual([c['id'] for c in response.data['comments']], [comment.id])
+        self.assertEqual([m['id'] for m in response.data['members']], [self.other.id])
+        self.assertEqual(response.data['deleted']['tasks'], [removed_id])
+        self.assertIsNone(response.data['board'])
+
+        again = self.sync(response.data['cursor'])
+        self.assertEqual(again.data['tasks'], [])
+        self.assertEqual(again.data['cursor'], response.data['cursor'])
+
+    def test_cursor_stays_behind_unsettled_changes(self):
+        self.kept.title = 'Moved'
+        self.kept.save()
+        with override_settings(KANBAN_SYNC_OVERLAP=60):
+            response = self.sync(self.cursor)
+            self.assertEqual([task['title'] for task in response.data['tasks']], ['Moved'])
+            self.assertEqual(str(response.data['cursor']), self.cursor)
+            self.assertLessEqual(int(self.client.get(self.url)['X-Sync-Cursor']), int(self.cursor))
+
+            BoardChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+            settled = self.sync(self.cursor).data['cursor']
+            self.assertGreater(settled, int(self.cursor))
+            self.assertEqual(self.sync(settled).data['tasks'], [])
+
+    def test_removed_member_is_a_tombstone(self):
+        self.board.members.add(self.other)
+        cursor = self.sync(self.cursor).data['cursor']
+        self.board.members.remove(self.other)
+
+        response = self.sync(cursor)
+
+        self.assertEqual(response.data['members'], [])
+        self.assertEqual(response.data['deleted']['members'], [self.other.id])
+
+    def test_compaction_keeps_sync_correct_and_expiry_forces_reload(self):
+        for status_value in ['in-progress', 'review', 'done']:
+            self.kept.status = status_value
+            self.kept.save()
+        before = BoardChange.objects.count()
+
+        call_command('compact_changes', stdout=StringIO())
+
+        self.assertLess(BoardChange.objects.count(), before)
+        response = self.sync(self.cursor)
+        self.assertEqual([task['status'] for task in response.data['tasks']], ['done'])
+
+        call_command('compact_changes', '--retention-days', '-1', stdout=StringIO())
+
+        self.assertEqual(self.sync(self.cursor).status_code, 410)
+
+class AsyncViewTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(members=[self.other])
+        self.task = self.make_task(self.board, assignee=self.user, reviewer=self.other)
+        Comment.objects.create(task=self.task, author=self.other, content='Hi')
+        self.token = Token.objects.create(user=self.user)
+        self.factory = AsyncRequestFactory()
+        self.auth = {'Authorization': f'Token {self.token.key}'}
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def call(self, view, path, *args, data=None, headers=None):
+        request = self.factory.get(path, data, headers={**self.auth, **(headers or {})})
+        return async_to_sync(view)(request, *args)
+
+    def assertSameResponse(self, async_response, sync_response):
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    def test_read_endpoints_match_sync_views(self):
+        cases = [
+            (async_views.board_list, reverse('board-list'), ()),
+            (async_views.board_detail, reverse('board-detail', args=[self.board.id]), (self.board.id,)),
+            (async_views.tasks_assigned_to_me, reverse('tasks-assigned-to-me'), ()),
+            (async_views.tasks_reviewing, reverse('tasks-reviewing'), ()),
+            (async_views.task_comments, f'/api/tasks/{self.task.id}/comments/', (self.task.id,)),
+        ]
+        for view, path, args in cases:
+            with self.subTest(path=path):
+                self.assertSameResponse(self.call(view, path, *args), self.client.get(path))
+
+    def test_board_detail_headers_and_304(self):
+        path = reverse('board-detail', args=[self.board.id])
+        sync_response = self.client.get(path)
+
+        response = self.call(async_views.board_detail, path, self.board.id)
+
+        self.assertEqual(response['ETag'], sync_response['ETag'])
+        self.assertEqual(response['X-Sync-Cursor'], sync_response['X-Sync-Cursor'])
+        not_modified = self.call(
+            async_views.board_detail, path, self.board.id, headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_authentication_follows_drf_settings(self):
+        self.assertEqual(self.call(async_views.board_list, reverse('board-list')).status_code, 200)
+        drf_settings = {**settings.REST_FRAMEWORK, 'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework.authentication.SessionAuthentication']}
+        with override_settings(REST_FRAMEWORK=drf_settings):
+            response = self.call(async_views.board_list, reverse('board-list'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_pagination_cursor_matches_sync_view(self):
+        for i in range(3):
+            self.make_board(title=f'Board {i}')
+        path = reverse('board-list')
+        sync_page = self.client.get(path, {'page_size': 2})
+        next_url = sync_page.data['next']
+
+        response = self.call(async_views.board_list, path, data={'page_size': 2})
+
+        self.assertSameResponse(response, sync_page)
+        self.assertSameResponse(
+            self.call(async_views.board_list, next_url), self.client.get(next_url)
+        )
+
+    def test_errors_match_sync_views(self):
+        outsider_board = Board.objects.create(title='Private', owner=self.other)
+        path = reverse('board-detail', args=[outsider_board.id])
+        self.assertSameResponse(self.call(async_views.board_detail, path, outsider_board.id), self.client.get(path))
+
+        request = self.factory.get(reverse('board-list'))
+        request.auser = sync_to_async(AnonymousUser)  # normally set by AuthenticationMiddleware
+        anonymous = async_to_sync(async_views.board_list)(request)
+        self.client.credentials()
+        self.assertSameResponse(anonymous, self.client.get(reverse('board-list')))
+
+    def test_dispatcher_sends_writes_and_sync_params_to_drf_view(self):
+        view = async_views.read_view(async_views.board_detail, BoardDetailView.as_view(), sync_params=('since',))
+        path = reverse('board-detail', args=[self.board.id])
+        cursor = self.client.get(path)['X-Sync-Cursor']
+
+        response = async_to_sync(view)(self.factory.get(path, {'since': cursor}, headers=self.auth), board_id=self.board.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"deleted"', response.render().content)
+
+        response = async_to_sync(view)(
+            self.factory.patch(path, {'title': 'Renamed'}, content_type='application/json', headers=self.auth),
+            board_id=self.board.id
+        )
+        self.assertEqual(response.status_code, 200)
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.title, 'Renamed')
+
+class InstrumentationTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        instrumentation.store.reset()
+        self.board = self.make_board(members=[self.other])
+        self.make_task(self.board)
+
+    def server_timing(self, response):
+        return dict(
+            (part.split(';')[0].strip(), part) for part in response['Server-Timing'].split(',')
+        )
+
+    def test_server_timing_reports_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('board-detail', args=[self.board.id]))
+
+        timing = self.server_timing(response)
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+        self.assertEqual(set(timing), {'db', 'serialize', 'render', 'total'})
+
+    def test_requests_are_aggregated_per_url_name(self):
+        self.client.get(reverse('board-list'))
+        self.client.get(reverse('board-list'))
+        self.client.get(reverse('tasks-assigned-to-me'))
+
+        self.assertEqual(self.client.get(reverse('request-metrics')).status_code, 403)
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pw')
+        self.client.force_authenticate(admin)
+        routes = {route['name']: route for route in self.client.get(reverse('request-metrics')).data}
+
+        self.assertEqual(routes['board-list']['requests'], 2)
+        self.assertEqual(routes['tasks-assigned-to-me']['requests'], 1)
+        self.assertGreater(routes['board-list']['avg_queries'], 0)
+
+    def test_repeated_sql_shape_is_flagged(self):
+        metrics = instrumentation.RequestMetrics()
+        for ids in (['%s'], ['%s', '%s'], ['%s'] * 3):
+            metrics.add_query(f'SELECT * FROM "auth_user" WHERE "id" IN ({", ".join(ids)})', 0.001)
+        metrics.add_query('SELECT 1', 0.001)
+
+        with self.settings(REQUEST_METRICS_N_PLUS_ONE_THRESHOLD=2):
+            self.assertEqual(metrics.n_plus_one(), [('SELECT * FROM "auth_user" WHERE "id" IN (...)', 3)])
+
+        with self.settings(REQUEST_METRICS_N_PLUS_ONE_THRESHOLD=0), self.assertLogs('kanmind.requests', 'WARNING'):
+            self.client.get(reverse('board-list'))
+
+    async def test_async_requests_are_measured(self):
+        # The test database connection predates the ASGI handler, so hook it explicitly.
+        await sync_to_async(instrumentation.install)()
+        token = await Token.objects.acreate(user=self.user)
+        response = await self.async_client.get(reverse('board-list'), headers={'Authorization': f'Token {token.key}'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+class BenchmarkSuiteTests(KanbanTestCase):
+    def test_generated_data_is_skewed_and_consistent(self):
+        call_command('generate_data', users=30, boards=10, tasks=300, comments=600, seed=1, stdout=StringIO())
+
+        self.assertEqual(User.objects.filter(username__startswith='synthetic-').count(), 30)
+        self.assertEqual(Task.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 600)
+        self.assertEqual(find_drift(), ([], []))
+        ticket_counts = sorted(Board.objects.values_list('ticket_count', flat=True), reverse=True)
+        self.assertGreater(ticket_counts[0], 3 * ticket_counts[len(ticket_counts) // 2])
+
+    def test_every_url_has_a_scenario(self):
+        self.assertEqual(benchmarks.route_names() - {route for route, _, _ in benchmarks.SCENARIOS}, set())
+
+    @override_settings(ALLOWED_HOSTS=['localhost'])
+    def test_results_are_written_and_compared_with_baseline(self):
+        call_command('generate_data', users=5, boards=2, tasks=10, comments=10, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            output, baseline = Path(directory, 'results.json'), Path(directory, 'baseline.json')
+            options = {'only': 'board-list', 'iterations': 3, 'output': str(output), 'baseline': str(baseline)}
+            call_command('run_benchmarks', update_baseline=True, stdout=StringIO(), **options)
+
+            results = json.loads(output.read_text())['results']
+            self.assertEqual(set(results), {'board-list GET', 'board-list POST'})
+            self.assertEqual(results['board-list GET']['queries'], 1)
+
+            stored = json.loads(baseline.read_text())
+            stored['results']['board-list GET']['queries'] = 0
+            baseline.write_text(json.dumps(stored))
+            with self.assertRaisesMessage(CommandError, 'regression'):
+                call_command('run_benchmarks', stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_compare_ignores_noise_on_fast_requests(self):
+        base = {'a': {'p95_ms': 1.0, 'queries': 2, 'peak_kb': 100}}
+        self.assertEqual(benchmarks.compare({'a': {'p95_ms': 2.5, 'queries': 2, 'peak_kb': 110}}, base), [])
+        self.assertEqual(len(benchmarks.compare({'a': {'p95_ms': 9.0, 'queries': 3, 'peak_kb': 200}}, base)), 3)
+
+@override_settings(KANBAN_STREAM_CHUNK_SIZE=3)
+class StreamingListTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(members=[self.other])
+        self.task = self.make_task(self.board, assignee=self.user, reviewer=self.other)
+
+    def add_comments(self, count, content='Grüße\u2028"quoted"'):
+        Comment.objects.bulk_create(Comment(task=self.task, author=self.other, content=content) for _ in range(count))
+
+    def rendered(self, data):
+        return JSONRenderer().render(data)
+
+    def test_streamed_tasks_are_byte_identical(self):
+        for i in range(6):
+            self.make_task(self.board, title=f'Task {i}', assignee=self.user)
+        expected = self.rendered(TaskSerializer(Task.objects.filter(assignee=self.user).order_by('id'), many=True).data)
+
+        response = self.client.get(reverse('tasks-assigned-to-me'), {'stream': '1'})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), expected)
+        empty = self.client.get(reverse('tasks-reviewing'), {'stream': 'true'})
+        self.assertEqual(b''.join(empty.streaming_content), b'[]')
+
+    def test_streamed_comments_are_byte_identical_sync_and_async(self):
+        self.add_comments(7)
+        comments = self.task.comments.select_related('author').order_by('created_at', 'id')
+        expected = self.rendered(CommentSerializer(comments, many=True).data)
+        path = f'/api/tasks/{self.task.id}/comments/'
+
+        response = self.client.get(path, {'stream': '1'})
+        self.assertEqual(b''.join(response.streaming_content), expected)
+
+        token = Token.objects.create(user=self.user)
+        request = AsyncRequestFactory().get(path, {'stream': '1'}, headers={'Authorization': f'Token {token.key}'})
+
+        async def read():
+            response = await async_views.task_comments(request, self.task.id)
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(async_to_sync(read)(), expected)
+
+    @override_settings(KANBAN_STREAM_CHUNK_SIZE=100)
+    def test_peak_memory_does_not_grow_with_rows(self):
+        path = f'/api/tasks/{self.task.id}/comments/'
+
+        def peak():
+            response = self.client.get(path, {'stream': '1'})
+            tracemalloc.start()
+            try:
+                for _ in response.streaming_content:
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        self.add_comments(300, content='x' * 200)
+        small = peak()
+        self.add_comments(2400, content='x' * 200)
+        self.assertLess(peak(), 2 * small)
+
+class SearchTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board()
+        self.task = self.make_task(self.board, title='Fix login timeout', description='Users see a <b>timeout</b> after login.')
+        Comment.objects.create(task=self.task, author=self.user, content='The timeout comes from the session cache.')
+        other_board = Board.objects.create(title='Private', owner=self.other)
+        other_board.members.set([self.other])
+        self.make_task(other_board, title='Timeout on a private board')
+        # Enough other rows for "timeout" to have a positive bm25 idf.
+        for i in range(10):
+            self.make_task(self.board, title=f'Unrelated {i}')
+
+    def search(self, **params):
+        response = self.client.get(reverse('search'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def test_ranked_results_with_snippets_on_own_boards_only(self):
+        results = self.search(q='timeout')
+
+        self.assertEqual([(hit['kind'], hit['board']) for hit in results], [('task', self.board.id), ('comment', self.board.id)])
+        task_hit, comment_hit = results
+        self.assertEqual(task_hit['title'], 'Fix login <mark>timeout</mark>')
+        self.assertIn('&lt;b&gt;<mark>timeout</mark>&lt;/b&gt;', task_hit['snippet'])
+        self.assertEqual(comment_hit['title'], 'Fix login timeout')
+        self.assertGreater(task_hit['score'], comment_hit['score'])
+        self.assertEqual([hit['kind'] for hit in self.search(q='timeout', kind='comment')], ['comment'])
+
+    def test_last_word_matches_as_prefix_and_operators_are_ignored(self):
+        self.assertEqual(len(self.search(q='sess')), 1)
+        self.assertEqual(len(self.search(q='"cache" (sess')), 1)
+        self.assertEqual(self.search(q='login nothere'), [])
+        self.assertEqual(self.client.get(reverse('search'), {'q': '*"'}).status_code, 400)
+
+    def test_index_follows_writes(self):
+        self.task.title = 'Renamed'
+        self.task.description = ''
+        self.task.save()
+        Comment.objects.filter(task=self.task).update(content='Unrelated')
+        self.assertEqual(self.search(q='timeout'), [])
+
+        Task.objects.bulk_create([Task(board=self.board, title='Bulk timeout', status='to-do', priority='low')])
+        recompute_all()
+        self.assertEqual(len(self.search(q='timeout')), 1)
+        Task.objects.filter(board=self.board).delete()
+        self.assertEqual(self.search(q='timeout'), [])
+        self.assertEqual(self.search(q='unrelated'), [])
+
+    def test_boards_filtered_outside_the_index_above_scope_limit(self):
+        with override_settings(KANBAN_SEARCH_SCOPE_MAX_BOARDS=0):
+            self.assertEqual(len(self.search(q='timeout')), 2)
+
+    def test_rebuild_and_fallback_backend(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM kanban_search')
+        self.assertEqual(self.search(q='timeout'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('13 rows', out.getvalue())
+        self.assertEqual(len(self.search(q='timeout')), 2)
+
+        fts = SQLiteSearchBackend().search(['timeout'], {self.board.id})
+        orm = DatabaseSearchBackend().search(['timeout'], {self.board.id})
+        self.assertEqual({(hit['kind'], hit['id']) for hit in orm}, {(hit['kind'], hit['id']) for hit in fts})
+        with override_settings(KANBAN_SEARCH_BACKEND='kanban_app.search.DatabaseSearchBackend'):
+            self.assertEqual(len(self.search(q='timeout')), 2)
+
+    def test_fallback_backend_merges_kinds_newest_first(self):
+        comment = Comment.objects.get(task=self.task)
+        later = Comment.objects.create(task=self.task, author=self.user, content='Another timeout report.')
+        Task.objects.filter(pk=self.task.pk).update(updated_at=comment.updated_at + timedelta(seconds=1))
+        Comment.objects.filter(pk=later.pk).update(updated_at=comment.updated_at + timedelta(seconds=2))
+
+        hits = DatabaseSearchBackend().search(['timeout'], {self.board.id})
+        self.assertEqual([(hit['kind'], hit['id']) for hit in hits], [('comment', later.id), ('task', self.task.id), ('comment', comment.id)])
+        page = DatabaseSearchBackend().search(['timeout'], {self.board.id}, limit=1, offset=1)
+        self.assertEqual([(hit['kind'], hit['id']) for hit in page], [('task', self.task.id)])
+
+    def test_default_backend_follows_the_database(self):
+        self.assertFalse(hasattr(settings, 'KANBAN_SEARCH_BACKEND'))
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertIsInstance(get_search_backend(), DatabaseSearchBackend)
+
+class TaskQueryTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(members=[self.other])
+        self.second = self.make_board(title='Second')
+        today = timezone.localdate()
+        self.overdue = self.make_task(self.board, status='to-do', priority='high', assignee=self.user, due_date=today - timedelta(days=3))
+        self.done_late = self.make_task(self.board, status='done', priority='low', assignee=self.user, due_date=today - timedelta(days=3))
+        self.later = self.make_task(self.board, status='review', priority='medium', reviewer=self.user, due_date=today + timedelta(days=30))
+        self.undated = self.make_task(self.second, status='to-do', priority='medium', assignee=self.other)
+        hidden = Board.objects.create(title='Hidden', owner=self.other)
+        self.make_task(hidden, status='to-do', priority='high')
+
+    def query(self, **params):
+        response = self.client.get(reverse('task-query'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, data):
+        return [task['id'] for task in data['results']]
+
+    def test_filters_across_accessible_boards(self):
+        self.assertEqual(self.ids(self.query()), [self.overdue.id, self.done_late.id, self.later.id, self.undated.id])
+        self.assertEqual(self.ids(self.query(status='to-do')), [self.overdue.id, self.undated.id])
+        self.assertEqual(self.ids(self.query(board=self.second.id)), [self.undated.id])
+        self.assertEqual(self.ids(self.query(assignee='me')), [self.overdue.id, self.done_late.id])
+        self.assertEqual(self.ids(self.query(assignee='none')), [self.later.id])
+        self.assertEqual(self.ids(self.query(reviewer=self.user.id)), [self.later.id])
+        self.assertEqual(self.ids(self.query(due='overdue')), [self.overdue.id])
+        self.assertEqual(self.ids(self.query(due='none')), [self.undated.id])
+        self.assertEqual(self.ids(self.query(due_after=timezone.localdate().isoformat())), [self.later.id])
+
+    def test_due_filters_use_the_configured_time_zone(self):
+        with mock.patch('django.utils.timezone.localdate', return_value=self.later.due_date + timedelta(days=1)):
+            self.assertEqual(self.ids(self.query(due='overdue')), [self.overdue.id, self.later.id])
+
+    def test_facets_ignore_their_own_filter(self):
+        data = self.query(status='to-do', priority='medium')
+
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['facets']['status'], {'to-do': 1, 'in-progress': 0, 'review': 1, 'done': 0})
+        self.assertEqual(data['facets']['priority'], {'low': 0, 'medium': 1, 'high': 1})
+
+    def test_sorting_and_keyset_pages(self):
+        for _ in range(5):
+            self.make_task(self.board, priority='medium')
+        expected = list(
+            Task.objects.filter(board__in=[self.board, self.second])
+            .order_by('-priority', '-id').values_list('id', flat=True)
+        )
+        rank = {'high': 0, 'medium': 1, 'low': 2}
+        expected.sort(key=lambda task_id: (rank[Task.objects.get(pk=task_id).priority], -task_id))
+
+        seen, data = [], self.query(ordering='-priority', page_size=2)
+        while True:
+            seen += self.ids(data)
+            if not data['next']:
+                break
+            data = self.client.get(data['next']).json()
+        self.assertEqual(seen, expected)
+
+        by_due = self.ids(self.query(ordering='due_date'))
+        self.assertEqual(by_due[:2], sorted([self.overdue.id, self.done_late.id]))
+        self.assertEqual(by_due[2], self.later.id)
+        self.assertEqual(by_due[3], self.undated.id)
+
+    def test_invalid_parameters(self):
+        for params in ({'status': 'later'}, {'ordering': 'title'}, {'due': 'soon'}, {'due_after': 'x'}, {'assignee': 'bob'}):
+            response = self.client.get(reverse('task-query'), params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
+
+    def test_tampered_cursor_is_not_found(self):
+        for ordering, position in (('priority', 'abc|x'), ('due_date', 'zz|1'), ('id', '1|x'), ('-updated_at', 'now|1')):
+            cursor = base64.b64encode(urlencode({'p': position}).encode()).decode()
+            response = self.client.get(reverse('task-query'), {'ordering': ordering, 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, (ordering, position))
+        response = self.client.get(reverse('board-list'), {'cursor': base64.b64encode(b'p=abc').decode()})
+        self.assertEqual(response.status_code, 404)
+
+    def test_constant_queries_and_indexed_filters(self):
+        self.query()
+        with self.assertNumQueries(2):
+            self.query(status='to-do', priority='high', due='this-week', ordering='-due_date')
+        board_ids = [self.board.id, self.second.id]
+        plan = Task.objects.filter(board_id__in=board_ids, due_date__lt=timezone.localdate()).explain()
+        self.assertIn('USING INDEX task_board_due_idx', plan)
+        plan = Task.objects.filter(board_id__in=board_ids, status__in=['to-do']).explain()
+        self.assertIn('USING INDEX task_board_status_idx', plan)
+
+class BackgroundJobTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(members=[self.other])
+        self.today = date.today()
+        self.overdue = self.make_task(self.board, assignee=self.user, reviewer=self.other, due_date=self.today - timedelta(days=1))
+        self.soon = self.make_task(self.board, assignee=self.other, due_date=self.today + timedelta(days=1))
+        self.make_task(self.board, status='done', assignee=self.user, due_date=self.today - timedelta(days=1))
+        self.make_task(self.board, assignee=self.user, due_date=self.today + timedelta(days=10))
+        self.make_task(self.board, due_date=self.today)
+
+    def reminders(self):
+        return set(Reminder.objects.values_list('user__username', 'task_id', 'kind'))
+
+    def test_due_reminders_are_written_in_bulk_and_idempotent(self):
+        with self.assertNumQueries(6):
+            result = due_reminders(self.today.isoformat())
+
+        expected = {
+            ('owner', self.overdue.id, 'overdue'),
+            ('other', self.overdue.id, 'overdue'),
+            ('other', self.soon.id, 'due-soon'),
+        }
+        self.assertEqual(self.reminders(), expected)
+        self.assertEqual(result['tasks'], 2)
+        self.assertEqual(due_reminders(self.today.isoformat())['reminders'], 3)
+        self.assertEqual(Reminder.objects.count(), 3)
+        self.assertIn('USING INDEX task_open_due_idx', due_tasks(self.today).explain())
+
+    def test_users_without_board_access_get_no_reminders(self):
+        due_reminders(self.today.isoformat())
+        self.board.members.remove(self.other)
+        Reminder.objects.all().delete()
+
+        with override_settings(KANBAN_REMINDER_BATCH_SIZE=1):
+            result = due_reminders(self.today.isoformat())
+
+        self.assertEqual(result['tasks'], 2)
+        self.assertEqual(self.reminders(), {('owner', self.overdue.id, 'overdue')})
+
+    def test_reminder_list_hides_boards_the_user_left(self):
+        due_reminders(self.today.isoformat())
+        self.client.force_authenticate(self.other)
+        self.assertEqual(len(self.client.get(reverse('reminder-list')).data['results']), 2)
+        self.board.members.remove(self.other)
+        self.assertEqual(self.client.get(reverse('reminder-list')).data['results'], [])
+
+    def test_daily_jobs_are_scheduled_once_per_day(self):
+        self.assertEqual(jobs.schedule_daily(self.today), 2)
+        self.assertEqual(jobs.schedule_daily(self.today), 0)
+
+        ran = jobs.run_pending()
+
+        self.assertEqual(sorted(job.name for job in ran), ['compact-changes', 'due-reminders'])
+        self.assertTrue(all(job.status == Job.DONE and job.duration_ms is not None for job in ran))
+        self.assertEqual(jobs.run_pending(), [])
+        self.assertEqual(Reminder.objects.count(), 3)
+        stats = {row['name']: row for row in jobs.job_stats()}
+        self.assertEqual(stats['due-reminders']['done'], 1)
+
+    def test_failed_jobs_are_retried_then_marked_failed(self):
+        calls = []
+
+        @jobs.register('test-failing')
+        def failing():
+            calls.append(1)
+            raise RuntimeError('boom')
+
+        try:
+            job, _ = jobs.enqueue('test-failing')
+            with override_settings(KANBAN_JOB_MAX_ATTEMPTS=2), self.assertLogs('kanmind.jobs', 'ERROR'):
+                job = jobs.run_job(jobs.claim())
+                self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+                self.assertIsNone(jobs.claim())
+                Job.objects.filter(pk=job.pk).update(run_at=job.created_at)
+                job = jobs.run_job(jobs.claim())
+            self.assertEqual((job.status, job.error), (Job.FAILED, 'RuntimeError: boom'))
+            self.assertEqual(len(calls), 2)
+        finally:
+            jobs._registry.pop('test-failing')
+
+    def test_claim_is_exclusive_and_stale_jobs_are_requeued(self):
+        job, _ = jobs.enqueue('compact-changes')
+        claimed = jobs.claim()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertIsNone(jobs.claim())
+
+        Job.objects.filter(pk=job.pk).update(started_at=claimed.started_at - timedelta(hours=2))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(jobs.claim().pk, job.pk)
+
+    def test_reminder_list_and_job_metrics(self):
+        due_reminders(self.today.isoformat())
+
+        response = self.client.get(reverse('reminder-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(item['kind'], item['task']['id']) for item in response.data['results']], [('overdue', self.overdue.id)])
+        self.assertEqual(self.client.get(reverse('job-metrics')).status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('job-metrics')).status_code, 200)
+
+class BoardTransferTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = self.make_board(title='Roadmap', members=[self.other])
+        self.task = self.make_task(self.board, title='Ship', description='Grüße', assignee=self.other, due_date=date(2026, 1, 31))
+        self.make_task(self.board, title='Plan', status='done', priority='high', reviewer=self.user)
+        for i in range(5):
+            Comment.objects.create(task=self.task, author=self.other if i % 2 else self.user, content=f'Comment {i}')
+
+    def export(self, board=None):
+        return b''.join(export_board(board or self.board))
+
+    def snapshot(self, board):
+        tasks = [
+            (task.title, task.description, task.status, task.priority, task.assignee_id, task.reviewer_id, task.due_date,
+             list(task.comments.order_by('created_at', 'id').values_list('author_id', 'content')))
+            for task in board.tasks.order_by('id')
+        ]
+        return board.title, board.owner_id, sorted(board.members.values_list('id', flat=True)), tasks
+
+    @override_settings(KANBAN_TRANSFER_BATCH_SIZE=2)
+    def test_round_trip_with_new_ids(self):
+        data = self.export()
+        self.assertEqual(len(data.splitlines()), 1 + 2 + 1 + 2 + 2 + 5)
+
+        board, stats = import_board(data.splitlines(keepends=True))
+
+        self.assertNotEqual(board.id, self.board.id)
+        self.assertEqual(self.snapshot(board), self.snapshot(self.board))
+        self.assertEqual(stats, {'members': 2, 'tasks': 2, 'comments': 5})
+        self.assertEqual(find_drift(), ([], []))
+        self.assertIn(board.id, access.accessible_board_ids(self.other))
+
+    def test_missing_users_are_created_or_rejected(self):
+        data = self.export()
+        lines = [line.replace(b'other@example.com', b'new@example.com') for line in data.splitlines(keepends=True)]
+
+        with self.assertRaisesMessage(BoardImportError, 'unknown users: new@example.com'):
+            import_board(lines, missing_users='reject')
+        self.assertEqual(Board.objects.count(), 1)
+
+        board, stats = import_board(lines)
+        new_user = User.objects.get(email='new@example.com')
+        self.assertFalse(new_user.is_active or new_user.has_usable_password())
+        self.assertEqual(new_user.username, 'new@example.com')
+        self.assertEqual(stats['users_created'], 1)
+        self.assertIn(new_user.id, board.members.values_list('id', flat=True))
+
+    def test_invalid_files_write_nothing(self):
+        lines = self.export().splitlines(keepends=True)
+        for broken in ([lines[1], *lines], [*lines, lines[4]], [*lines[:-1], b'{"type": "comment", "task": 0}\n'], [b'nope\n']):
+            with self.assertRaises(BoardImportError):
+                import_board(broken)
+        self.assertEqual(Board.objects.count(), 1)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_users_added_during_the_export_get_user_lines(self):
+        lines = export_board(self.board)
+        head = [next(lines) for _ in range(6)]
+        late = User.objects.create_user(username='late', email='late@example.com', password='pw')
+        Task.objects.filter(pk=self.task.pk).update(reviewer=late)
+        Comment.objects.create(task=self.task, author=late, content='Late')
+        data = b''.join([*head, *lines])
+
+        late.delete()
+        board, stats = import_board(data.splitlines(keepends=True))
+
+        self.assertEqual(stats['users_created'], 1)
+        self.assertEqual(board.tasks.get(title='Ship').reviewer.email, 'late@example.com')
+        self.assertEqual(board.tasks.get(title='Ship').comments.last().content, 'Late')
+
+    def test_asgi_export_streams_asynchronously(self):
+        token = Token.objects.create(user=self.user)
+        request = AsyncRequestFactory().get(f'/api/boards/{self.board.id}/export/', headers={'Authorization': f'Token {token.key}'})
+        response = BoardExportView.as_view()(request, board_id=self.board.id)
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(async_to_sync(read)(), self.export())
+
+    def test_malformed_lines_are_rejected_with_400(self):
+        lines = [json.loads(line) for line in self.export().splitlines()]
+
+        def changed(index, **changes):
+            data = [dict(line) for line in lines]
+            data[index].update(changes)
+            for key in [key for key, value in changes.items() if value is ...]:
+                del data[index][key]
+            return ''.join(json.dumps(line) + '\n' for line in data).encode()
+
+        for body in (
+            changed(3, title=...),
+            changed(3, title=None),
+            changed(3, title='x' * 51),
+            changed(6, ref=...),
+            changed(6, due_date='soon'),
+            changed(6, title=['list']),
+            changed(6, assignee='7'),
+            changed(8, content=None),
+            b'[1, 2]\n',
+        ):
+            with self.subTest(body=body[-80:]):
+                response = self.client.post(reverse('board-import'), body, content_type='application/x-ndjson')
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn('Line', response.data['error'])
+        self.assertEqual(Board.objects.count(), 1)
+
+    @override_settings(KANBAN_TRANSFER_BATCH_SIZE=50)
+    def test_export_and_import_memory_do_not_grow_with_comments(self):
+        def peak(run):
+            tracemalloc.start()
+            try:
+                run()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        def round_trip():
+            with tempfile.TemporaryFile() as file:
+                for line in export_board(self.board):
+                    file.write(line)
+                file.seek(0)
+                import_board(file)
+
+        Comment.objects.bulk_create(Comment(task=self.task, author=self.user, content='x' * 200) for _ in range(300))
+        small = peak(round_trip)
+        Comment.objects.bulk_create(Comment(task=self.task, author=self.user, content='x' * 200) for _ in range(2400))
+        self.assertLess(peak(round_trip), 2 * small)
+
+    def test_api_export_and_import(self):
+        response = self.client.get(reverse('board-export', args=[self.board.id]))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        data = b''.join(response.streaming_content)
+        self.assertEqual(data, self.export())
+
+        response = self.client.post(reverse('board-import'), data, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201, response.content)
+        board = Board.objects.get(pk=response.data['id'])
+        self.assertEqual(board.owner, self.user)
+        self.assertEqual(board.tasks.count(), 2)
+
+        response = self.client.post(reverse('board-import'), b'{"type": "user"}\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        hidden = Board.objects.create(title='Hidden', owner=self.other)
+        self.assertEqual(self.client.get(reverse('board-export', args=[hidden.id])).status_code, 404)
+
+class AdminChangelistTests(KanbanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pw')
+        self.client.force_login(self.admin)
+        self.board = self.make_board(title='Roadmap', members=[self.other])
+        self.task = self.make_task(self.board, title='Deploy pipeline', assignee=self.other)
+        Comment.objects.create(task=self.task, author=self.other, content='Needs a rollback plan')
+        Comment.objects.create(task=self.task, author=self.user, content='Looks good')
+
+    def changelist(self, model, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'admin:kanban_app_{model}_changelist'), params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('e', response.wsgi_request.GET)
+        return response, len(queries)
+
+    def add_rows(self, count):
+        users = User.objects.bulk_create(User(username=f'user{i}', email=f'user{i}@example.com') for i in range(count))
+        boards = Board.objects.bulk_create(Board(title=f'Board {i}', owner=user) for i, user in enumerate(users))
+        tasks = Task.objects.bulk_create(
+            Task(board=board, title=f'Task {i}', status='to-do', priority='low', assignee=user, reviewer=self.other)
+            for i, (board, user) in enumerate(zip(boards, users))
+        )
+        Comment.objects.bulk_create(Comment(task=task, author=task.assignee, content='Needs a rollback') for task in tasks)
+        recompute_all()
+
+    def test_query_budget_does_not_grow_with_rows(self):
+        cases = [
+            ('board', {}),
+            ('board', {'owner__id__exact': self.user.id}),
+            ('board', {'q': 'road'}),
+            ('task', {}),
+            ('task', {'board__id__exact': self.board.id, 'status__exact': 'to-do'}),
+            ('task', {'q': 'deploy'}),
+            ('task', {'due_date__isnull': 'True'}),
+            ('comment', {}),
+            ('comment', {'author__id__exact': self.other.id}),
+            ('comment', {'q': 'rollback'}),
+        ]
+        self.changelist('board')
+        before = [self.changelist(*case)[1] for case in cases]
+        self.add_rows(40)
+        after = [self.changelist(*case)[1] for case in cases]
+
+        self.assertEqual(after, before)
+        for (model, params), count in zip(cases, after):
+            self.assertLessEqual(count, 6, (model, params))
+
+    def test_autocomplete_filter_reads_only_the_selected_object(self):
+        self.add_rows(5)
+        response, _ = self.changelist('task')
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(response, 'kanban_app/autocomplete_filter.js')
+        self.assertNotContains(response, f'?board__id__exact={self.board.id}"')
+
+        response, _ = self.changelist('task', {'board__id__exact': self.board.id})
+        self.assertContains(response, f'<option value="{self.board.id}" selected>Roadmap</option>', html=True)
+        self.assertEqual(list(response.context['cl'].result_list), [self.task])
+
+        url = reverse('admin:autocomplete')
+        response = self.client.get(url, {'app_label': 'kanban_app', 'model_name': 'comment', 'field_name': 'author', 'term': 'other'})
+        self.assertEqual([item['id'] for item in response.json()['results']], [str(self.other.id)])
+
+    def test_unfiltered_count_is_estimated_on_large_tables(self):
+        self.make_task(self.board, title='Gone').delete()
+        self.make_task(self.board, title='Kept')
+        response, _ = self.changelist('task')
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+        with override_settings(KANBAN_ADMIN_EXACT_COUNT_LIMIT=0):
+            response, _ = self.changelist('task')
+            self.assertEqual(response.context['cl'].result_count, Task.objects.order_by('-id').first().id)
+            self.assertIsNone(response.context['cl'].full_result_count)
+            response, _ = self.changelist('task', {'status__exact': 'to-do'})
+            self.assertEqual(response.context['cl'].result_count, 2)
+
+    def test_search_uses_the_index_and_email_prefixes(self):
+        for path in ('kanban_app.search.SQLiteSearchBackend', 'kanban_app.search.DatabaseSearchBackend'):
+            with self.subTest(path), override_settings(KANBAN_SEARCH_BACKEND=path):
+                response, _ = self.changelist('comment', {'q': 'rollb'})
+                self.assertEqual([comment.content for comment in response.context['cl'].result_list], ['Needs a rollback plan'])
+                response, _ = self.changelist('comment', {'q': 'Owner@Ex'})
+                self.assertEqual([comment.content for comment in response.context['cl'].result_list], ['Looks good'])
+                response, _ = self.changelist('task', {'q': 'other@'})
+                self.assertEqual(list(response.context['cl'].result_list), [self.task])
+                response, _ = self.changelist('task', {'q': 'deploy pipe'})
+                self.assertEqual(list(response.context['cl'].result_list), [self.task])
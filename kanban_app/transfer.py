@@ -0,0 +1,325 @@
+"""
+Board export and import as NDJSON, one JSON object per line:
+
+    {"type": "header", "format": "kanmind-board", "version": 1}
+    {"type": "user", "ref": 7, "email": ..., "username": ..., "first_name": ..., "last_name": ...}
+    {"type": "board", "title": ..., "owner": 7}
+    {"type": "member", "user": 7}
+    {"type": "task", "ref": 12, "title": ..., "assignee": 7, "reviewer": null, ...}
+    {"type": "comment", "task": 12, "author": 7, "content": ..., "created_at": ...}
+
+Lines come in this order, except that user lines may appear anywhere after
+the header as long as they precede the lines referring to them. `ref`s are
+ids of the exporting database; the import maps users by email
+(username for users without one) and gives tasks and comments new ids.
+Both directions hold one chunk of rows in memory at a time, so boards with
+millions of comments can be moved. Timestamps are set anew on import;
+comments are written in their original order, so they list the same.
+"""
+import json
+from collections import Counter
+from itertools import islice
+from asgiref.sync import sync_to_async
+from datetime import date
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from auth_app.emails import normalize_email, users_by_emails
+from kanban_app.counters import apply_comment_changes, apply_task_changes
+from kanban_app.models import Board, Comment, Task
+
+User = get_user_model()
+
+FORMAT = 'kanmind-board'
+VERSION = 1
+SECTIONS = ('header', 'user', 'board', 'member', 'task', 'comment')
+TASK_FIELDS = ('title', 'description', 'status', 'priority', 'due_date')
+STATUSES = {value for value, _ in Task._meta.get_field('status').choices}
+PRIORITIES = {value for value, _ in Task._meta.get_field('priority').choices}
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+# Keys of each line type: (type, max length, required). Checked before any
+# model instance is built, so bad values never reach the database.
+SCHEMAS = {
+    'header': {'format': (str, None, True), 'version': (int, None, True)},
+    'user': {
+        'ref': (int, None, True),
+        'email': (str, _max_length(User, 'email'), False),
+        'username': (str, _max_length(User, 'username'), True),
+        'first_name': (str, _max_length(User, 'first_name'), False),
+        'last_name': (str, _max_length(User, 'last_name'), False),
+    },
+    'board': {'title': (str, _max_length(Board, 'title'), True), 'owner': (int, None, True)},
+    'member': {'user': (int, None, True)},
+    'task': {
+        'ref': (int, None, True),
+        'title': (str, _max_length(Task, 'title'), True),
+        'description': (str, None, False),
+        'status': (str, None, True),
+        'priority': (str, None, True),
+        'due_date': (str, None, False),
+        'assignee': (int, None, False),
+        'reviewer': (int, None, False),
+    },
+    'comment': {'task': (int, None, True), 'author': (int, None, True), 'content': (str, None, True)},
+}
+
+class BoardImportError(ValueError):
+    pass
+
+def _batch_size():
+    return getattr(settings, 'KANBAN_TRANSFER_BATCH_SIZE', 2000)
+
+def _line(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode() + b'\n'
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _user_lines(user_ids):
+    users = User.objects.filter(id__in=user_ids).order_by('id').values_list('id', 'email', 'username', 'first_name', 'last_name')
+    for ref, email, username, first_name, last_name in users:
+        yield _line({'type': 'user', 'ref': ref, 'email': email, 'username': username, 'first_name': first_name, 'last_name': last_name})
+
+def export_board(board):
+    """
+    Yields the board as NDJSON lines (bytes). Tasks and comments are read
+    with `.iterator()`, so memory use does not depend on the board size.
+
+    User lines are written just before the first chunk that refers to the
+    user. Assignees and comment authors added while the export runs thus
+    still get their user line, without holding a transaction open.
+    """
+    chunk_size = _batch_size()
+    member_ids = sorted(board.members.values_list('id', flat=True))
+    seen = {board.owner_id, *member_ids}
+
+    yield _line({'type': 'header', 'format': FORMAT, 'version': VERSION})
+    yield from _user_lines(seen)
+    yield _line({'type': 'board', 'title': board.title, 'owner': board.owner_id})
+    for user_id in member_ids:
+        yield _line({'type': 'member', 'user': user_id})
+
+    task_rows = Task.objects.filter(board=board).order_by('id').values_list('id', 'assignee_id', 'reviewer_id', *TASK_FIELDS)
+    for chunk in _chunks(task_rows.iterator(chunk_size=chunk_size), chunk_size):
+        new_users = {user_id for _, assignee, reviewer, *_ in chunk for user_id in (assignee, reviewer)} - seen - {None}
+        seen |= new_users
+        yield from _user_lines(new_users)
+        for ref, assignee, reviewer, *values in chunk:
+            yield _line({'type': 'task', 'ref': ref, 'assignee': assignee, 'reviewer': reviewer, **dict(zip(TASK_FIELDS, values))})
+
+    comment_rows = (
+        Comment.objects.filter(task__board=board)
+        .order_by('task_id', 'created_at', 'id')
+        .values_list('task_id', 'author_id', 'content', 'created_at')
+    )
+    for chunk in _chunks(comment_rows.iterator(chunk_size=chunk_size), chunk_size):
+        new_users = {author for _, author, _, _ in chunk} - seen
+        seen |= new_users
+        yield from _user_lines(new_users)
+        for task, author, content, created_at in chunk:
+            yield _line({'type': 'comment', 'task': task, 'author': author, 'content': content, 'created_at': created_at})
+
+async def aexport_board(board):
+    """
+    Async variant of `export_board` for ASGI, where a sync iterator would be
+    read completely into memory before the first byte is sent. The sync
+    generator is advanced one chunk at a time in the thread that owns its
+    database cursor.
+    """
+    lines = export_board(board)
+    read = sync_to_async(lambda: b''.join(islice(lines, _batch_size())), thread_sensitive=True)
+    try:
+        while chunk := await read():
+            yield chunk
+    finally:
+        await sync_to_async(lines.close, thread_sensitive=True)()
+
+class BoardImporter:
+    """
+    Reads NDJSON lines in section order (user lines may come late) and
+    writes them with chunked `bulk_create`s. The caller wraps `run` in a transaction.
+
+    `owner` overrides the owner from the file. Users missing in this database
+    are created (inactive, without password) with `missing_users='create'`
+    and rejected with `missing_users='reject'`.
+    """
+    def __init__(self, owner=None, missing_users='create'):
+        self.owner = owner
+        self.missing_users = missing_users
+        self.batch_size = _batch_size()
+        self.board = None
+        self.users = {}
+        self.tasks = {}
+        self.pending = []
+        self.section = 0
+        self.stage = 0
+        self.line_number = 0
+        self.stats = Counter()
+
+    def error(self, message):
+        return BoardImportError(f"Line {self.line_number}: {message}")
+
+    def run(self, lines):
+        for raw in lines:
+            self.line_number += 1
+            if not raw.strip():
+                raise self.error("empty line.")
+            try:
+                item = json.loads(raw)
+                section = SECTIONS.index(item['type'])
+            except (ValueError, TypeError, KeyError):
+                raise self.error("not a board export line.")
+            self.validate(item)
+            if (self.line_number == 1) != (section == 0):
+                raise self.error("the file must start with a single header line.")
+            if section < self.stage and item['type'] != 'user':
+                raise self.error(f"{item['type']} lines must come before {SECTIONS[self.stage]} lines.")
+            if item['type'] != 'user':
+                self.stage = section
+            if section != self.section or len(self.pending) >= self.batch_size:
+                self.flush()
+                self.section = section
+            self.pending.append(item)
+        self.flush()
+        if self.board is None:
+            raise self.error("no board in the file.")
+        return self.board
+
+    def validate(self, item):
+        kind = item['type']
+        for key, (expected, max_length, required) in SCHEMAS[kind].items():
+            value = item.get(key)
+            if value is None:
+                if required:
+                    raise self.error(f"{kind} line without {key}.")
+                continue
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise self.error(f"{key} of a {kind} line must be a {'string' if expected is str else 'number'}.")
+            if expected is str and required and not value.strip():
+                raise self.error(f"{key} of a {kind} line must not be empty.")
+            if max_length is not None and len(value) > max_length:
+                raise self.error(f"{key} of a {kind} line is longer than {max_length} characters.")
+        if kind == 'task' and item.get('due_date') is not None:
+            try:
+                item['due_date'] = date.fromisoformat(item['due_date'])
+            except ValueError:
+                raise self.error("due_date of a task line must be a date (YYYY-MM-DD).")
+
+    def flush(self):
+        if not self.pending:
+            return
+        section = SECTIONS[self.section]
+        try:
+            getattr(self, f'write_{section}s')(self.pending)
+        except BoardImportError:
+            raise
+        except (KeyError, TypeError, ValueError, ValidationError, DatabaseError) as exc:
+            raise self.error(f"invalid {section} data ({exc}).") from exc
+        self.pending = []
+
+    def user(self, ref):
+        if ref is None:
+            return None
+        try:
+            return self.users[ref]
+        except KeyError:
+            raise self.error(f"unknown user ref {ref}.")
+
+    def write_headers(self, items):
+        header = items[0]
+        if header.get('format') != FORMAT or header.get('version') != VERSION:
+            raise self.error(f"expected a {FORMAT} version {VERSION} export.")
+
+    def write_users(self, items):
+        by_email = {normalize_email(item.get('email')): item for item in items if normalize_email(item.get('email'))}
+        by_username = {item['username']: item for item in items if not normalize_email(item.get('email'))}
+        for user in users_by_emails(by_email).only('id', 'email'):
+            self.users[by_email.pop(normalize_email(user.email))['ref']] = user.id
+        for user in User.objects.filter(username__in=by_username).only('id', 'username'):
+            self.users[by_username.pop(user.username)['ref']] = user.id
+        missing = [*by_email.values(), *by_username.values()]
+        if not missing:
+            return
+        if self.missing_users != 'create':
+            raise self.error("unknown users: " + ', '.join(item.get('email') or item['username'] for item in missing))
+        taken = set(User.objects.filter(username__in=[item['username'] for item in missing]).values_list('username', flat=True))
+        new_users = []
+        for item in missing:
+            user = User(
+                username=item['email'] if item['username'] in taken else item['username'],
+                email=normalize_email(item.get('email')),
+                first_name=item.get('first_name', ''),
+                last_name=item.get('last_name', ''),
+                is_active=False,
+            )
+            user.set_unusable_password()
+            new_users.append(user)
+        for item, user in zip(missing, User.objects.bulk_create(new_users)):
+            self.users[item['ref']] = user.id
+        self.stats['users_created'] += len(new_users)
+
+    def write_boards(self, items):
+        if len(items) != 1 or self.board is not None:
+            raise self.error("a file holds exactly one board.")
+        owner_id = self.owner.id if self.owner is not None else self.user(items[0]['owner'])
+        self.board = Board.objects.create(title=items[0]['title'], owner_id=owner_id)
+        self.board.members.add(owner_id)
+        self.stats['members'] = self.board.member_count
+
+    def write_members(self, items):
+        if self.board is None:
+            raise self.error("member lines need a board line first.")
+        member_ids = {self.user(item['user']) for item in items}
+        # members.add sends m2m_changed, which updates access caches and member counts
+        self.board.members.add(*member_ids)
+        self.stats['members'] = self.board.member_count
+
+    def write_tasks(self, items):
+        if self.board is None:
+            raise self.error("task lines need a board line first.")
+        tasks = []
+        for item in items:
+            if item.get('status') not in STATUSES or item.get('priority') not in PRIORITIES:
+                raise self.error(f"task {item.get('ref')} has an invalid status or priority.")
+            tasks.append(Task(
+                board=self.board,
+                assignee_id=self.user(item.get('assignee')),
+                reviewer_id=self.user(item.get('reviewer')),
+                **{field: item.get(field) for field in TASK_FIELDS},
+            ))
+            tasks[-1].description = tasks[-1].description or ''
+        created = Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+        for item, task in zip(items, created):
+            self.tasks[item['ref']] = task.id
+        # bulk_create sends no signals, so the board counters are updated here
+        apply_task_changes((self.board.id, task.status, task.priority, 1) for task in created)
+        self.stats['tasks'] += len(created)
+
+    def write_comments(self, items):
+        comments = []
+        for item in items:
+            try:
+                task_id = self.tasks[item['task']]
+            except KeyError:
+                raise self.error(f"comment on unknown task ref {item.get('task')}.")
+            comments.append(Comment(task_id=task_id, author_id=self.user(item['author']), content=item['content']))
+        Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+        apply_comment_changes(Counter(comment.task_id for comment in comments))
+        self.stats['comments'] += len(comments)
+
+def import_board(lines, owner=None, missing_users='create'):
+    """
+    Imports a board export as a new board in one transaction. Returns
+    `(board, stats)`; raises BoardImportError (and writes nothing) on bad input.
+    """
+    importer = BoardImporter(owner=owner, missing_users=missing_users)
+    with transaction.atomic():
+        board = importer.run(lines)
+    return board, dict(importer.stats)
@@ -0,0 +1,18 @@
+from django.db.models import F
+from kanban_app.models import Board, Task
+
+def bump_board_versions(board_ids):
+    """
+    Increments the version of the given boards. Any change to a board, its
+    members, tasks or comments bumps it, so it can serve as the board's ETag.
+    """
+    board_ids = {board_id for board_id in board_ids if board_id is not None}
+    if board_ids:
+        Board.objects.filter(pk__in=board_ids).update(version=F('version') + 1)
+
+def bump_versions_for_tasks(task_ids):
+    """
+    Increments the version of the boards the given tasks belong to.
+    """
+    board_ids = Task.objects.filter(pk__in=set(task_ids)).values('board_id')
+    Board.objects.filter(pk__in=board_ids).update(version=F('version') + 1)